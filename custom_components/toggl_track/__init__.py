@@ -3,28 +3,74 @@
 from __future__ import annotations
 
 from datetime import timedelta
+from functools import partial
 import logging
 
 from lib_toggl.client import Toggl
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, STARTUP_MESSAGE
+from .alerts import AlertThresholds
+from .const import (
+    CONF_EDIT_COALESCE_WINDOW,
+    CONF_HEDGE_REQUESTS,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_REQUEST_TIMEOUT,
+    CONF_RULES,
+    CONF_TEAM_ACTIVITY,
+    DEFAULT_IDLE_SCAN_INTERVAL_SECONDS,
+    DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    DOMAIN,
+    RECONCILE_INTERVAL_SECONDS,
+    SIGNAL_ALERTS_UPDATED,
+    SIGNAL_OPTIONS_UPDATED,
+    STARTUP_MESSAGE,
+    STATISTICS_REFRESH_SECONDS,
+    SUMMARY_REFRESH_SECONDS,
+)
 from .coordinator import TogglTrackCoordinator
-from .services import async_register_services
+from .reconcile import Reconciler
+from .rules import RULE_SCHEMA, async_setup_rules
+from .schedule import ActiveHours
+from .services import async_register_services, async_unload_services
+from .websocket_api import async_setup as async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
 
-# For now, only define sensor platform
-PLATFORMS: list[str] = ["sensor"]
+PLATFORMS: list[str] = ["binary_sensor", "calendar", "sensor"]
+
+# Everything else is set up through the UI; rules are the only thing that lives in YAML
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(CONF_RULES, default=[]): vol.All(
+                    cv.ensure_list, [RULE_SCHEMA]
+                )
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
 
 
-async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the integration."""
     _LOGGER.info(STARTUP_MESSAGE)
+    # Commands look up whichever config entry tracks the workspace they're asked about
+    async_setup_websocket_api(hass)
+    # Same for rules
+    if rules := config.get(DOMAIN, {}).get(CONF_RULES):
+        async_setup_rules(hass, rules)
     return True
 
 
@@ -38,6 +84,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     api_key = entry.data[CONF_API_KEY]
     scan_interval = entry.data.get(CONF_SCAN_INTERVAL)
+    # 0 means don't poll at all outside of active hours
+    idle_scan_interval = entry.data.get(
+        CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL_SECONDS
+    )
     api_client = Toggl(api_key)
 
     coordinator = TogglTrackCoordinator(
@@ -46,7 +96,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # Polling interval. Will only be polled if there are subscribers.
         update_interval=timedelta(seconds=scan_interval),
         api=api_client,
+        active_hours=ActiveHours.from_config(entry.data),
+        idle_interval=timedelta(seconds=idle_scan_interval)
+        if idle_scan_interval
+        else None,
+        team_activity=entry.data.get(CONF_TEAM_ACTIVITY, False),
+        request_timeout=timedelta(
+            seconds=entry.data.get(
+                CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT_SECONDS
+            )
+        ),
+        hedge_requests=entry.data.get(CONF_HEDGE_REQUESTS, False),
+        edit_coalesce_window=entry.data.get(CONF_EDIT_COALESCE_WINDOW, 0),
     )
+    # Workers need to be up before the first refresh; they're torn down in coordinator.async_shutdown()
+    coordinator.dispatcher.async_start()
 
     # Get initial data from API
     await coordinator.async_config_entry_first_refresh()
@@ -56,12 +120,64 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # Before the platforms so the binary sensors have a state to start with; off unless set in the options
+    entry.async_on_unload(
+        coordinator.alerts.async_start(
+            AlertThresholds.from_options(entry.options),
+            ActiveHours.from_config(entry.data),
+            SIGNAL_ALERTS_UPDATED.format(entry.entry_id),
+        )
+    )
+
     # Init sensor
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # Add services
     async_register_services(hass, coordinator)
 
+    # Workspace/project selection changes are applied in place; see async_update_options
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    # Summary reports are slow moving; fetch once now and then check the cache on a slow timer
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh_summaries(), "toggl_track_summaries"
+    )
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            coordinator.async_refresh_summaries,
+            timedelta(seconds=SUMMARY_REFRESH_SECONDS),
+        )
+    )
+
+    # Catch edits/deletions made outside of HA; first run waits a full interval so startup isn't any busier
+    reconciler = Reconciler(hass, coordinator)
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            reconciler.async_run,
+            timedelta(seconds=RECONCILE_INTERVAL_SECONDS),
+        )
+    )
+
+    # Long-term statistics need the recorder; it's an after dependency so it may not be there
+    if "recorder" in hass.config.components:
+        # pylint: disable=import-outside-toplevel
+        from .statistics import async_import_statistics
+
+        entry.async_create_background_task(
+            hass,
+            async_import_statistics(hass, coordinator),
+            "toggl_track_statistics",
+        )
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass,
+                partial(async_import_statistics, hass, coordinator),
+                timedelta(seconds=STATISTICS_REFRESH_SECONDS),
+            )
+        )
+
     return True
 
 
@@ -75,15 +191,43 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        # The coordinator is shut down once this returns; don't leave services pointing at it
+        async_unload_services(hass)
 
     return unload_ok
 
 
 async def async_update_options(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-    """Update options."""
-    # TODO: fetch workspace list again and do the user flow again?
-    _LOGGER.debug("Reloading. Currently nothing to do here")
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Apply workspace/project selection changes without reloading.
+
+    Platforms add/remove entities to match (see entity.py), the devices of workspaces that are no longer
+        tracked are removed and the next poll picks up any new workspaces.
+    """
+    if (coordinator := hass.data.get(DOMAIN, {}).get(config_entry.entry_id)) is None:
+        return
+    _LOGGER.debug("Options updated; syncing entities")
+    coordinator.alerts.async_set_thresholds(
+        AlertThresholds.from_options(config_entry.options)
+    )
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(config_entry.entry_id))
+
+    tracked = {
+        f"{config_entry.entry_id}_{w}" for w in coordinator.tracked_workspace_ids
+    }
+    registry = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if not any(
+            domain == DOMAIN and identifier in tracked
+            for domain, identifier in device.identifiers
+        ):
+            registry.async_update_device(
+                device.id, remove_config_entry_id=config_entry.entry_id
+            )
+
+    await coordinator.async_request_refresh()
+    config_entry.async_create_background_task(
+        hass, coordinator.async_refresh_summaries(), "toggl_track_summaries"
+    )
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
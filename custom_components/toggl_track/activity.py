@@ -0,0 +1,77 @@
+"""Running time entries for every member of a workspace.
+
+The `/me/time_entries/current` endpoint that lib-toggl wraps only knows about the API key owner's timer.
+Team/admin setups can have several timers running in the same workspace at once; the workspace
+dashboard endpoint lists recent activity for everybody, including anything still running.
+See: https://engineering.toggl.com/docs/api/dashboard
+"""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+import logging
+from typing import Any
+
+from aiohttp.client_exceptions import ClientResponseError
+from lib_toggl.client import Toggl
+from lib_toggl.const import BASE
+from lib_toggl.time_entries import TimeEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+# Free plans / non-admin members can't see the dashboard
+UNSUPPORTED_STATUSES = {
+    HTTPStatus.PAYMENT_REQUIRED,
+    HTTPStatus.FORBIDDEN,
+    HTTPStatus.NOT_FOUND,
+}
+
+
+# pylint: disable=invalid-name
+def ACTIVITY_ENDPOINT(workspace_id: int) -> str:
+    """Return the all-activity dashboard endpoint for a workspace."""
+    return f"{BASE}/workspaces/{workspace_id}/dashboard/all_activity"
+
+
+class ActivityUnsupportedError(Exception):
+    """Workspace dashboard is not available for this account/plan."""
+
+
+def _parse_activity(
+    workspace_id: int, payload: list[dict[str, Any]]
+) -> list[TimeEntry]:
+    """Turn dashboard activity into TimeEntry objects, keeping only running entries."""
+    running = []
+    for activity in payload or []:
+        # Same convention as time entries; negative duration means still running
+        if activity.get("stop") is not None or (activity.get("duration") or 0) >= 0:
+            continue
+        running.append(
+            TimeEntry(
+                id=activity.get("time_entry_id") or activity.get("id"),
+                workspace_id=workspace_id,
+                project_id=activity.get("project_id"),
+                user_id=activity.get("user_id"),
+                description=activity.get("description"),
+                start=activity.get("start"),
+                duration=activity.get("duration"),
+                tag_ids=activity.get("tag_ids"),
+            )
+        )
+    return running
+
+
+async def async_fetch_running(api: Toggl, workspace_id: int) -> list[TimeEntry]:
+    """Return every running time entry in the workspace.
+
+    Raises ActivityUnsupportedError if the account can't see the workspace dashboard.
+    """
+    try:
+        payload = await api.do_get_request(ACTIVITY_ENDPOINT(workspace_id))
+    except ClientResponseError as err:
+        if err.status in UNSUPPORTED_STATUSES:
+            raise ActivityUnsupportedError(
+                f"Workspace {workspace_id} activity not available: {err.status}"
+            ) from err
+        raise
+    return _parse_activity(workspace_id, payload)
@@ -0,0 +1,343 @@
+"""Overtime, idle and daily target alerts worked out from what the coordinator already knows.
+
+Everything needed is in the running entries snapshot and the time entries cached for today, so rather than
+re-checking every minute the exact time the next alert could change is worked out and a one-shot timer is
+set for it. The timer is moved every time the snapshot changes (start/stop from HA, a poll ...etc).
+
+The only requests made are to fetch today's entries again when that's needed to get idle and daily target
+right: at startup and when a poll shows that an entry was stopped outside of HA. Until that's done, those
+two alerts are left as they were rather than worked out from entries that are known to be out of date.
+
+Each tracked workspace is checked on its own and only the API key owner's entries count.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import StrEnum
+import logging
+from typing import TYPE_CHECKING, Any
+
+from lib_toggl.time_entries import TimeEntry
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_ALERT,
+    ATTR_TIME_ENTRY_ID,
+    ATTR_TRACKED_HOURS,
+    ATTR_WORKSPACE_ID,
+    CONF_DAILY_TARGET_HOURS,
+    CONF_IDLE_MINUTES,
+    CONF_OVERTIME_MINUTES,
+    EVENT_ALERT,
+)
+from .history import entry_span
+from .schedule import ActiveHours
+
+if TYPE_CHECKING:
+    # Coordinator owns the evaluator
+    from .coordinator import TogglTrackCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AlertKind(StrEnum):
+    """Things to be alerted about."""
+
+    OVERTIME = "overtime"
+    IDLE = "idle"
+    DAILY_TARGET = "daily_target"
+
+
+@dataclass(frozen=True)
+class AlertThresholds:
+    """None turns an alert off."""
+
+    overtime: timedelta | None = None
+    idle: timedelta | None = None
+    daily_target: timedelta | None = None
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any]) -> AlertThresholds:
+        """Build from config entry options; missing or 0 means off."""
+        overtime = options.get(CONF_OVERTIME_MINUTES, 0)
+        idle = options.get(CONF_IDLE_MINUTES, 0)
+        target = options.get(CONF_DAILY_TARGET_HOURS, 0)
+        return cls(
+            overtime=timedelta(minutes=overtime) if overtime else None,
+            idle=timedelta(minutes=idle) if idle else None,
+            daily_target=timedelta(hours=target) if target else None,
+        )
+
+    @property
+    def enabled(self) -> list[AlertKind]:
+        """Alerts that are turned on."""
+        return [kind for kind in AlertKind if getattr(self, kind) is not None]
+
+
+@dataclass(frozen=True)
+class AlertState:
+    """Whether an alert is on and when that could next change by itself, if ever."""
+
+    on: bool
+    next_check: datetime | None = None
+
+
+def tracked_today(
+    entries: list[TimeEntry], running: TimeEntry | None, now: datetime
+) -> timedelta:
+    """Time tracked since the start of the local day; only the part of each entry that falls today counts."""
+    day_start = dt_util.start_of_local_day(now)
+    tracked = timedelta()
+    for te in [*entries, running] if running is not None else entries:
+        start, end = entry_span(te, now)
+        if end > day_start:
+            tracked += min(end, now) - max(start, day_start)
+    return tracked
+
+
+def evaluate(
+    thresholds: AlertThresholds,
+    active_hours: ActiveHours | None,
+    entries: list[TimeEntry],
+    running: TimeEntry | None,
+    now: datetime,
+) -> dict[AlertKind, AlertState]:
+    """Work out every enabled alert for one workspace.
+
+    `entries` are today's completed entries and `running` is the API key owner's running entry, if any.
+    `now` has to be in the local time zone; that's what active hours are in.
+    """
+    day_start = dt_util.start_of_local_day(now)
+    day_end = dt_util.start_of_local_day(day_start + timedelta(days=1, hours=1))
+    states: dict[AlertKind, AlertState] = {}
+
+    if (overtime := thresholds.overtime) is not None:
+        if running is None or running.start is None:
+            # Starting an entry is a snapshot change; nothing to wait for
+            states[AlertKind.OVERTIME] = AlertState(False)
+        elif now >= (at := running.start + overtime):
+            states[AlertKind.OVERTIME] = AlertState(True)
+        else:
+            states[AlertKind.OVERTIME] = AlertState(False, at)
+
+    if (target := thresholds.daily_target) is not None:
+        tracked = tracked_today(entries, running, now)
+        if tracked >= target:
+            # Back to 0 at midnight
+            states[AlertKind.DAILY_TARGET] = AlertState(True, day_end)
+        elif running is not None:
+            states[AlertKind.DAILY_TARGET] = AlertState(False, now + target - tracked)
+        else:
+            states[AlertKind.DAILY_TARGET] = AlertState(False)
+
+    if (idle := thresholds.idle) is not None:
+        states[AlertKind.IDLE] = _evaluate_idle(
+            idle, active_hours, entries, running, now, day_start, day_end
+        )
+    return states
+
+
+def _evaluate_idle(
+    idle: timedelta,
+    active_hours: ActiveHours | None,
+    entries: list[TimeEntry],
+    running: TimeEntry | None,
+    now: datetime,
+    day_start: datetime,
+    day_end: datetime,
+) -> AlertState:
+    """Idle time only counts from the later of the start of active hours (or the day) and the last stop."""
+    if running is not None:
+        return AlertState(False)
+    window = (day_start, day_end)
+    if (
+        active_hours is not None
+        and not active_hours.always_active
+        and (window := active_hours.current_window(now)) is None
+    ):
+        return AlertState(False, active_hours.next_start(now))
+    since = max(
+        [window[0]] + [end for _, end in (entry_span(te, now) for te in entries)]
+    )
+    if now >= since + idle:
+        return AlertState(True, window[1])
+    # If active hours are over before that, this turns into an out of hours check then
+    return AlertState(False, min(since + idle, window[1]))
+
+
+class AlertEvaluator:
+    """Keeps every workspace's alerts up to date and fires an event when one turns on."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: TogglTrackCoordinator) -> None:
+        """Nothing is evaluated until `async_start()`."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.thresholds = AlertThresholds()
+        self._active_hours: ActiveHours | None = None
+        self._signal: str | None = None
+        # (workspace ID, kind) -> on; missing until first evaluated
+        self._states: dict[tuple[int, AlertKind], bool] = {}
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._unsub_listener: CALLBACK_TYPE | None = None
+        # Cached entries from here on can't be trusted for idle/daily target until fetched again
+        self._stale_since: datetime | None = None
+        # Bumped by every invalidation; one that lands mid-fetch means fetching again
+        self._stale_generation = 0
+        self._refetch: asyncio.Task | None = None
+
+    @callback
+    def async_start(
+        self,
+        thresholds: AlertThresholds,
+        active_hours: ActiveHours | None,
+        signal: str,
+    ) -> CALLBACK_TYPE:
+        """Evaluate now and after every coordinator update; `signal` is sent whenever anything changes.
+
+        Returns a callback that stops everything.
+        """
+        self.thresholds = thresholds
+        self._active_hours = active_hours
+        self._signal = signal
+        # Nothing from today may have been fetched yet; costs nothing if it has
+        self._stale_since = dt_util.as_utc(dt_util.start_of_local_day())
+        self._unsub_listener = self.coordinator.async_add_listener(self._async_evaluate)
+        self._async_evaluate()
+        return self.async_stop
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the timer and stop listening."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._unsub_listener is not None:
+            self._unsub_listener()
+            self._unsub_listener = None
+        if self._refetch is not None:
+            self._refetch.cancel()
+            self._refetch = None
+
+    @callback
+    def async_history_invalidated(self, since: datetime) -> None:
+        """An entry that started at `since` was stopped outside of HA; the cache doesn't know when."""
+        if self._stale_since is None or since < self._stale_since:
+            self._stale_since = since
+        self._stale_generation += 1
+
+    async def _async_refetch(self, since: datetime) -> None:
+        """Fetch today's entries (and the stopped one, if it started before today) again, then re-evaluate."""
+        generation = self._stale_generation
+        start = min(since, dt_util.as_utc(dt_util.start_of_local_day()))
+        try:
+            # Every last bit; a short gap could be exactly the entry that was stopped
+            await self.coordinator.async_get_history(
+                start, dt_util.utcnow(), exact=True
+            )
+        # pylint: disable=broad-except
+        except Exception as err:  # noqa: BLE001
+            # Still stale; tried again on the next coordinator update
+            _LOGGER.debug("Unable to fetch today's time entries for alerts: %s", err)
+        else:
+            if self._stale_generation == generation:
+                self._stale_since = None
+        finally:
+            self._refetch = None
+        self._async_evaluate()
+
+    @callback
+    def async_set_thresholds(self, thresholds: AlertThresholds) -> None:
+        """Options changed; alerts that were turned off are forgotten."""
+        self.thresholds = thresholds
+        enabled = set(thresholds.enabled)
+        self._states = {k: v for k, v in self._states.items() if k[1] in enabled}
+        self._async_evaluate()
+
+    def is_on(self, workspace_id: int, kind: AlertKind) -> bool | None:
+        """Current state, or None if it hasn't been evaluated yet."""
+        return self._states.get((workspace_id, kind))
+
+    @callback
+    def _async_evaluate(self, _now: Any = None) -> None:
+        """Re-evaluate every workspace and set the timer for the earliest next check."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self.thresholds.enabled:
+            return
+
+        now = dt_util.now()
+        day_start = dt_util.as_utc(dt_util.start_of_local_day(now))
+        next_check: datetime | None = None
+        changed = False
+        stale = self._stale_since is not None and (
+            AlertKind.IDLE in self.thresholds.enabled
+            or AlertKind.DAILY_TARGET in self.thresholds.enabled
+        )
+        if stale and self._refetch is None:
+            self._refetch = self.hass.async_create_background_task(
+                self._async_refetch(self._stale_since), "toggl_track_alerts_refetch"
+            )
+        for workspace_id in self.coordinator.tracked_workspace_ids:
+            running = self.coordinator.own_entry(workspace_id)
+            # Cached entries that still look like they're running have been stopped outside of HA
+            entries = [
+                te
+                for te in self.coordinator.history.entries(
+                    day_start, dt_util.as_utc(now), now, workspace_id
+                )
+                if te.stop is not None or (te.duration is not None and te.duration >= 0)
+            ]
+            for kind, state in evaluate(
+                self.thresholds, self._active_hours, entries, running, now
+            ).items():
+                if stale and kind in (AlertKind.IDLE, AlertKind.DAILY_TARGET):
+                    # Re-evaluated once today's entries have been fetched again
+                    continue
+                if state.next_check is not None and (
+                    next_check is None or state.next_check < next_check
+                ):
+                    next_check = state.next_check
+                previous = self._states.get((workspace_id, kind))
+                if previous == state.on:
+                    continue
+                self._states[(workspace_id, kind)] = state.on
+                changed = True
+                # Not on the first evaluation; a restart shouldn't repeat alerts that already went off
+                if state.on and previous is not None:
+                    self._fire(workspace_id, kind, entries, running, now)
+
+        if next_check is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass, self._async_evaluate, dt_util.as_utc(next_check)
+            )
+        if changed and self._signal is not None:
+            async_dispatcher_send(self.hass, self._signal)
+
+    def _fire(
+        self,
+        workspace_id: int,
+        kind: AlertKind,
+        entries: list[TimeEntry],
+        running: TimeEntry | None,
+        now: datetime,
+    ) -> None:
+        _LOGGER.debug("Alert '%s' is on for workspace %s", kind, workspace_id)
+        self.hass.bus.async_fire(
+            EVENT_ALERT,
+            {
+                ATTR_WORKSPACE_ID: workspace_id,
+                ATTR_ALERT: str(kind),
+                ATTR_TIME_ENTRY_ID: running.id if running is not None else None,
+                ATTR_TRACKED_HOURS: round(
+                    tracked_today(entries, running, now).total_seconds() / 3600, 2
+                ),
+            },
+        )
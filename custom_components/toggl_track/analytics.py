@@ -0,0 +1,381 @@
+"""Grouped totals over the time entries in the history cache.
+
+Report style questions (hours per project per week, which tags get used together, how much of it was
+billable ... etc) are answered locally rather than with one Reports API request per question. The cached
+entries are kept as flat columns of numbers so a year of history is a handful of arrays instead of
+thousands of pydantic objects. With NumPy installed the grouping is done with a single sort over those
+columns; without it the same columns are walked once in plain Python.
+
+Like the Reports API, the whole of an entry counts towards the bucket (day/week/month) that it started in.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from enum import StrEnum
+from itertools import combinations
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from lib_toggl.time_entries import TimeEntry
+
+from homeassistant.util import dt as dt_util
+
+from .history import TimeEntryHistory
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# No project / no tag; Toggl IDs are never 0
+_NONE = 0
+
+# (history generation, columns); rebuilt on the first report after the history changes
+_COLUMNS: WeakKeyDictionary[TimeEntryHistory, tuple[int, EntryColumns]] = (
+    WeakKeyDictionary()
+)
+
+
+class ReportGroup(StrEnum):
+    """What a computed report can be grouped by; any combination, at most one bucket and one tag grouping."""
+
+    WORKSPACE = "workspace"
+    PROJECT = "project"
+    TAG = "tag"
+    # Every pair of tags used on the same entry
+    TAG_PAIR = "tag_pair"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+BUCKETS = (ReportGroup.DAY, ReportGroup.WEEK, ReportGroup.MONTH)
+TAG_GROUPS = (ReportGroup.TAG, ReportGroup.TAG_PAIR)
+
+
+class EntryColumns:
+    """Time entries as parallel arrays; row `i` of every column is the same entry.
+
+    Tags are many-to-one so they're kept in their own pair of columns (entry row, tag ID), as are the
+        pairs of tags used together on an entry.
+    """
+
+    def __init__(self, entries: Iterable[TimeEntry]) -> None:
+        """Entries without a start are skipped."""
+        self.start = array("d")
+        # -1 while running
+        self.duration = array("d")
+        self.workspace = array("q")
+        self.project = array("q")
+        self.billable = array("d")
+        self.tag_row = array("q")
+        self.tag = array("q")
+        self.pair_row = array("q")
+        self.pair_first = array("q")
+        self.pair_second = array("q")
+        self.tag_names: dict[int, str] = {}
+
+        for te in entries:
+            if te.start is None:
+                continue
+            row = len(self.start)
+            self.start.append(te.start.timestamp())
+            if te.stop is not None:
+                self.duration.append((te.stop - te.start).total_seconds())
+            else:
+                self.duration.append(
+                    te.duration if te.duration is not None and te.duration >= 0 else -1
+                )
+            self.workspace.append(te.workspace_id)
+            self.project.append(te.project_id or _NONE)
+            self.billable.append(1.0 if te.billable else 0.0)
+            tag_ids = sorted(set(te.tag_ids or []))
+            for tag_id in tag_ids:
+                self.tag_row.append(row)
+                self.tag.append(tag_id)
+            for first, second in combinations(tag_ids, 2):
+                self.pair_row.append(row)
+                self.pair_first.append(first)
+                self.pair_second.append(second)
+            # Same note as in sensor.py; tags and tag IDs are assumed to line up
+            for tag_id, tag in zip(te.tag_ids or [], te.tags or [], strict=False):
+                self.tag_names[tag_id] = tag
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self.start)
+
+
+def history_columns(history: TimeEntryHistory) -> EntryColumns:
+    """Return every entry in `history` as columns."""
+    cached = _COLUMNS.get(history)
+    if cached is None or cached[0] != history.generation:
+        cached = _COLUMNS[history] = (history.generation, EntryColumns(history))
+    return cached[1]
+
+
+@dataclass
+class ComputedReport:
+    """Totals per group; `rows` are ordered by their group values."""
+
+    start: datetime
+    end: datetime
+    group_by: list[ReportGroup]
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    # Which implementation did the grouping
+    backend: str = "array"
+
+    @property
+    def total_seconds(self) -> int:
+        """Sum over all rows; tag groupings count an entry once per tag (or pair) so this can be more than was tracked."""
+        return sum(r["seconds"] for r in self.rows)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Render for service call responses."""
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "group_by": [str(g) for g in self.group_by],
+            "total_seconds": self.total_seconds,
+            "rows": self.rows,
+            "backend": self.backend,
+        }
+
+
+def bucket_starts(bucket: ReportGroup, start: datetime, end: datetime) -> list[date]:
+    """Return the first day of every local day/week/month that `start` to `end` touches."""
+    first = dt_util.as_local(start).date()
+    last = dt_util.as_local(end).date()
+    if bucket is ReportGroup.WEEK:
+        first -= timedelta(days=first.weekday())
+    elif bucket is ReportGroup.MONTH:
+        first = first.replace(day=1)
+    days = []
+    day = first
+    while day <= last:
+        days.append(day)
+        if bucket is ReportGroup.DAY:
+            day += timedelta(days=1)
+        elif bucket is ReportGroup.WEEK:
+            day += timedelta(days=7)
+        else:
+            day = (day + timedelta(days=32)).replace(day=1)
+    return days
+
+
+def _timestamp(day: date) -> float:
+    """Local midnight at the start of `day`, as a UNIX timestamp."""
+    return datetime.combine(day, time(), dt_util.DEFAULT_TIME_ZONE).timestamp()
+
+
+def compute_report(
+    columns: EntryColumns,
+    start: datetime,
+    end: datetime,
+    now: datetime,
+    workspace_ids: Sequence[int],
+    group_by: Sequence[ReportGroup],
+) -> ComputedReport:
+    """Total seconds, billable seconds and entry count per group for entries that started between `start` and `end`.
+
+    Running entries count up to `now`.
+    """
+    buckets = [g for g in group_by if g in BUCKETS]
+    tags = [g for g in group_by if g in TAG_GROUPS]
+    if len(buckets) > 1 or len(tags) > 1 or len(set(group_by)) != len(group_by):
+        raise ValueError(f"Can't group by {', '.join(group_by)}")
+    bucket_days = bucket_starts(buckets[0], start, end) if buckets else []
+
+    aggregate = _aggregate_numpy if np is not None else _aggregate_python
+    totals = aggregate(
+        columns,
+        start.timestamp(),
+        end.timestamp(),
+        now.timestamp(),
+        list(workspace_ids),
+        list(group_by),
+        [_timestamp(d) for d in bucket_days],
+    )
+
+    rows = []
+    for key, (seconds, billable_seconds, count) in sorted(totals.items()):
+        row: dict[str, Any] = {}
+        for group, value in zip(group_by, key, strict=True):
+            if group is ReportGroup.WORKSPACE:
+                row["workspace_id"] = value
+            elif group is ReportGroup.PROJECT:
+                row["project_id"] = value or None
+            elif group is ReportGroup.TAG:
+                row["tag_id"] = value or None
+                row["tag"] = columns.tag_names.get(value)
+            elif group is ReportGroup.TAG_PAIR:
+                row["tag_ids"] = list(value)
+                row["tags"] = [columns.tag_names.get(v) for v in value]
+            else:
+                row[str(group)] = bucket_days[value].isoformat()
+        row["seconds"] = round(seconds)
+        row["billable_seconds"] = round(billable_seconds)
+        row["entries"] = count
+        rows.append(row)
+    # Share of the total and billable ratio are what utilisation figures are made of
+    total = sum(r["seconds"] for r in rows)
+    for row in rows:
+        row["share"] = round(row["seconds"] / total, 4) if total else 0.0
+        row["billable_ratio"] = (
+            round(row["billable_seconds"] / row["seconds"], 4)
+            if row["seconds"]
+            else 0.0
+        )
+    return ComputedReport(
+        start=start,
+        end=end,
+        group_by=list(group_by),
+        rows=rows,
+        backend="numpy" if np is not None else "array",
+    )
+
+
+def _aggregate_numpy(
+    columns: EntryColumns,
+    start: float,
+    end: float,
+    now: float,
+    workspace_ids: list[int],
+    group_by: list[ReportGroup],
+    bucket_starts_ts: list[float],
+) -> dict[tuple, tuple[float, float, int]]:
+    """Group with a single sort over the selected rows."""
+    # Views over the same memory; nothing is copied until rows are selected
+    starts = np.frombuffer(columns.start, dtype=np.float64)
+    durations = np.frombuffer(columns.duration, dtype=np.float64)
+    workspaces = np.frombuffer(columns.workspace, dtype=np.int64)
+
+    selected = (starts >= start) & (starts < end) & np.isin(workspaces, workspace_ids)
+    rows = np.flatnonzero(selected)
+    keys: list[Any] = []
+
+    # Tags fan rows out; one row per (entry, tag) or (entry, pair of tags)
+    if ReportGroup.TAG in group_by:
+        tag_rows = np.frombuffer(columns.tag_row, dtype=np.int64)
+        tag_ids = np.frombuffer(columns.tag, dtype=np.int64)
+        tagged = selected[tag_rows]
+        untagged = rows[np.bincount(tag_rows, minlength=len(starts))[rows] == 0]
+        rows = np.concatenate([tag_rows[tagged], untagged])
+        tag_key = np.concatenate(
+            [tag_ids[tagged], np.full(len(untagged), _NONE, dtype=np.int64)]
+        )
+    elif ReportGroup.TAG_PAIR in group_by:
+        pair_rows = np.frombuffer(columns.pair_row, dtype=np.int64)
+        paired = selected[pair_rows]
+        rows = pair_rows[paired]
+        pair_key = (
+            np.frombuffer(columns.pair_first, dtype=np.int64)[paired],
+            np.frombuffer(columns.pair_second, dtype=np.int64)[paired],
+        )
+
+    for group in group_by:
+        if group is ReportGroup.WORKSPACE:
+            keys.append(workspaces[rows])
+        elif group is ReportGroup.PROJECT:
+            keys.append(np.frombuffer(columns.project, dtype=np.int64)[rows])
+        elif group is ReportGroup.TAG:
+            keys.append(tag_key)
+        elif group is ReportGroup.TAG_PAIR:
+            keys.extend(pair_key)
+        else:
+            keys.append(
+                np.searchsorted(bucket_starts_ts, starts[rows], side="right") - 1
+            )
+
+    if not len(rows):
+        return {}
+    seconds = durations[rows]
+    seconds = np.where(seconds < 0, np.maximum(now - starts[rows], 0), seconds)
+    billable = seconds * np.frombuffer(columns.billable, dtype=np.float64)[rows]
+    if not keys:
+        return {(): (float(seconds.sum()), float(billable.sum()), len(rows))}
+
+    unique, inverse = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    sums = np.bincount(inverse, weights=seconds, minlength=len(unique))
+    billable_sums = np.bincount(inverse, weights=billable, minlength=len(unique))
+    counts = np.bincount(inverse, minlength=len(unique))
+    return {
+        _key(group_by, [int(v) for v in unique[i]]): (
+            float(sums[i]),
+            float(billable_sums[i]),
+            int(counts[i]),
+        )
+        for i in range(len(unique))
+    }
+
+
+def _aggregate_python(
+    columns: EntryColumns,
+    start: float,
+    end: float,
+    now: float,
+    workspace_ids: list[int],
+    group_by: list[ReportGroup],
+    bucket_starts_ts: list[float],
+) -> dict[tuple, tuple[float, float, int]]:
+    """Same as _aggregate_numpy, one pass over the columns."""
+    wanted = set(workspace_ids)
+    # (entry row, tag key) for every row a tag grouping fans out to
+    fan_out: dict[int, list[Any]] = {}
+    if ReportGroup.TAG in group_by:
+        for row, tag_id in zip(columns.tag_row, columns.tag, strict=True):
+            fan_out.setdefault(row, []).append(tag_id)
+    elif ReportGroup.TAG_PAIR in group_by:
+        for row, first, second in zip(
+            columns.pair_row, columns.pair_first, columns.pair_second, strict=True
+        ):
+            fan_out.setdefault(row, []).append((first, second))
+
+    totals: dict[tuple, list[float]] = {}
+    for row, te_start in enumerate(columns.start):
+        if not start <= te_start < end or columns.workspace[row] not in wanted:
+            continue
+        seconds = columns.duration[row]
+        if seconds < 0:
+            seconds = max(now - te_start, 0)
+        if ReportGroup.TAG in group_by:
+            tag_keys = fan_out.get(row) or [_NONE]
+        elif ReportGroup.TAG_PAIR in group_by:
+            if not (tag_keys := fan_out.get(row, [])):
+                continue
+        else:
+            tag_keys = [None]
+        for tag_key in tag_keys:
+            key: list[Any] = []
+            for group in group_by:
+                if group is ReportGroup.WORKSPACE:
+                    key.append(columns.workspace[row])
+                elif group is ReportGroup.PROJECT:
+                    key.append(columns.project[row])
+                elif group in TAG_GROUPS:
+                    key.extend(tag_key if isinstance(tag_key, tuple) else [tag_key])
+                else:
+                    key.append(bisect_right(bucket_starts_ts, te_start) - 1)
+            total = totals.setdefault(_key(group_by, key), [0.0, 0.0, 0])
+            total[0] += seconds
+            total[1] += seconds * columns.billable[row]
+            total[2] += 1
+    return {k: (v[0], v[1], int(v[2])) for k, v in totals.items()}
+
+
+def _key(group_by: list[ReportGroup], values: list[int]) -> tuple:
+    """One value per group; a tag pair's two IDs are folded back into a tuple."""
+    key: list[Any] = []
+    values = list(values)
+    for group in group_by:
+        if group is ReportGroup.TAG_PAIR:
+            key.append((values.pop(0), values.pop(0)))
+        else:
+            key.append(values.pop(0))
+    return tuple(key)
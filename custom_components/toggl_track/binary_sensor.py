@@ -0,0 +1,100 @@
+"""Platform for binary_sensor integration; one per alert that's turned on, in each workspace."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .alerts import AlertKind, AlertThresholds
+from .const import CONF_WORKSPACES, DOMAIN, SIGNAL_ALERTS_UPDATED
+from .coordinator import TogglTrackCoordinator
+from .entity import TogglTrackWorkspaceEntity, async_sync_entities
+
+_LOGGER = logging.getLogger(__name__)
+
+# Alerts are named after what they mean, not the option that turns them on
+ALERT_NAMES = {
+    AlertKind.OVERTIME: "overtime",
+    AlertKind.IDLE: "idle",
+    AlertKind.DAILY_TARGET: "daily target reached",
+}
+ALERT_ICONS = {
+    AlertKind.OVERTIME: "mdi:timer-alert-outline",
+    AlertKind.IDLE: "mdi:timer-pause-outline",
+    AlertKind.DAILY_TARGET: "mdi:flag-checkered",
+}
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add binary sensors for passed config_entry in HA."""
+    coordinator: TogglTrackCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    _acct = await coordinator.async_get_account()
+
+    def _build() -> list[BinarySensorEntity]:
+        """Alerts turned on in the options, for the workspaces currently tracked."""
+        enabled = AlertThresholds.from_options(config_entry.options).enabled
+        return [
+            TogglTrackAlertBinarySensorEntity(
+                coordinator,
+                config_entry.entry_id,
+                _acct.id,
+                int(workspace_id),
+                workspace_name,
+                kind,
+            )
+            for workspace_id, workspace_name in config_entry.options[
+                CONF_WORKSPACES
+            ].items()
+            for kind in enabled
+        ]
+
+    # Turning an alert on/off in the options adds/removes its sensors in place; see entity.py
+    async_sync_entities(hass, config_entry, async_add_entities, _build)
+
+
+class TogglTrackAlertBinarySensorEntity(TogglTrackWorkspaceEntity, BinarySensorEntity):
+    """On while the alert is; see alerts.py for when that is.
+
+    State comes from the coordinator's alert evaluator which also catches thresholds being crossed in
+        between polls, so this listens for that as well as for coordinator updates.
+    """
+
+    def __init__(
+        self,
+        coordinator: TogglTrackCoordinator,
+        config_entry_id: str,
+        account_id: int,
+        workspace_id: int,
+        workspace_name: str,
+        kind: AlertKind,
+    ) -> None:
+        """Pass coordinator to CoordinatorEntity and store some UUIDs."""
+        super().__init__(coordinator, config_entry_id, workspace_id, workspace_name)
+        self._kind = kind
+        self._signal = SIGNAL_ALERTS_UPDATED.format(config_entry_id)
+        self._attr_name = f"{workspace_name} {ALERT_NAMES[kind]}"
+        self._attr_unique_id = (
+            f"{config_entry_id}_{account_id}_{workspace_id}_{kind}_alert"
+        )
+        self._attr_icon = ALERT_ICONS[kind]
+
+    async def async_added_to_hass(self) -> None:
+        """Also update whenever the evaluator says something changed."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self._signal, self.async_write_ha_state)
+        )
+
+    @property
+    def is_on(self) -> bool | None:
+        """Unknown until the alert has been evaluated for this workspace."""
+        return self.coordinator.alerts.is_on(self._workspace_id, self._kind)
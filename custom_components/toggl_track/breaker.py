@@ -0,0 +1,147 @@
+"""Circuit breaker for the Toggl Track API.
+
+When the API is struggling (5xx, 429 or repeated timeouts) there is no point in asking it again at the
+normal poll interval. The breaker opens, reads are skipped for a cooldown that honours `Retry-After`,
+then a single half-open probe decides whether to close again or back off further.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
+from http import HTTPStatus
+import logging
+from typing import Any
+
+from aiohttp.client_exceptions import ClientResponseError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BreakerState(StrEnum):
+    """Classic three state breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while the breaker is open."""
+
+
+def is_trip_error(err: ClientResponseError) -> bool:
+    """Indicate if a response means the API is overloaded/down rather than the request being wrong."""
+    return (
+        err.status == HTTPStatus.TOO_MANY_REQUESTS
+        or err.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+
+def retry_after_from_error(err: ClientResponseError, now: datetime) -> float | None:
+    """Return the number of seconds the server asked us to wait, if it said."""
+    if not err.headers or (value := err.headers.get("Retry-After")) is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    # May also be an HTTP date
+    try:
+        return max((parsedate_to_datetime(value) - now).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        _LOGGER.debug("Unable to parse Retry-After: %s", value)
+    return None
+
+
+class CircuitBreaker:
+    """Tracks consecutive failures and decides when requests may be made."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        cooldown: timedelta,
+        max_cooldown: timedelta,
+    ) -> None:
+        """Open after `failure_threshold` failures; cooldown doubles each time a probe fails."""
+        self._failure_threshold = failure_threshold
+        self._base_cooldown = cooldown
+        self._max_cooldown = max_cooldown
+
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._cooldown = cooldown
+        self._open_until: datetime | None = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> BreakerState:
+        """Current state."""
+        return self._state
+
+    def allow_request(self, now: datetime) -> bool:
+        """Indicate if a request may be made now.
+
+        Once the cooldown has passed, exactly one request is let through as the half-open probe.
+        """
+        if self._state is BreakerState.CLOSED:
+            return True
+        if self._state is BreakerState.OPEN:
+            if self._open_until is not None and now < self._open_until:
+                return False
+            _LOGGER.debug("Cooldown over; letting a probe request through")
+            self._state = BreakerState.HALF_OPEN
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        """API answered; close the breaker."""
+        if self._state is not BreakerState.CLOSED:
+            _LOGGER.info("Toggl Track API is responding again; closing circuit breaker")
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._cooldown = self._base_cooldown
+        self._open_until = None
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """The probe ended without an answer either way (cancelled ...etc); let the next request probe instead."""
+        self._probe_in_flight = False
+
+    def record_failure(
+        self, now: datetime, retry_after: float | None = None, trip: bool = False
+    ) -> None:
+        """API failed. Opens the breaker if the failure is severe, repeated or a failed probe."""
+        self._failures += 1
+        self._probe_in_flight = False
+        half_open = self._state is BreakerState.HALF_OPEN
+        if not (trip or half_open or self._failures >= self._failure_threshold):
+            return
+
+        if half_open:
+            # Probe failed; back off harder
+            self._cooldown = min(self._cooldown * 2, self._max_cooldown)
+        wait = self._cooldown
+        if retry_after is not None:
+            wait = max(wait, timedelta(seconds=retry_after))
+        self._open_until = now + wait
+        if self._state is not BreakerState.OPEN:
+            _LOGGER.warning(
+                "Toggl Track API failing (%s in a row); pausing requests until %s",
+                self._failures,
+                self._open_until,
+            )
+        self._state = BreakerState.OPEN
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Snapshot of breaker state; used by diagnostics."""
+        return {
+            "state": str(self._state),
+            "consecutive_failures": self._failures,
+            "cooldown_seconds": self._cooldown.total_seconds(),
+            "open_until": self._open_until.isoformat() if self._open_until else None,
+        }
@@ -0,0 +1,140 @@
+"""Platform for calendar integration; one calendar of time entries per workspace."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+
+from aiohttp.client_exceptions import ClientResponseError
+from lib_toggl.time_entries import TimeEntry
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .breaker import CircuitOpenError
+from .const import CONF_WORKSPACES, DOMAIN
+from .coordinator import TogglTrackCoordinator
+from .dispatcher import DispatcherShutdownError, Priority
+from .entity import TogglTrackWorkspaceEntity, async_sync_entities
+from .history import entry_span
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add a calendar for each workspace in the passed config_entry."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    _acct = await coordinator.async_get_account()
+
+    def _build() -> list[TogglTrackCalendarEntity]:
+        return [
+            TogglTrackCalendarEntity(
+                coordinator,
+                config_entry.entry_id,
+                _acct.id,
+                # See note in sensor.py; read back as a string
+                int(workspace_id),
+                workspace_name,
+            )
+            for workspace_id, workspace_name in config_entry.options[
+                CONF_WORKSPACES
+            ].items()
+        ]
+
+    # Same as the sensors; follows options changes without a reload
+    async_sync_entities(hass, config_entry, async_add_entities, _build)
+
+
+def _to_event(te: TimeEntry, now: datetime) -> CalendarEvent:
+    """Render a time entry as a calendar event; running entries end now."""
+    start, end = entry_span(te, now)
+    description = None
+    if te.tags:
+        description = "Tags: " + ", ".join(te.tags)
+    return CalendarEvent(
+        start=start,
+        # Calendar won't accept an event that ends when it starts
+        end=max(end, start + timedelta(seconds=1)),
+        summary=te.description or "(no description)",
+        description=description,
+        uid=str(te.id),
+    )
+
+
+class TogglTrackCalendarEntity(TogglTrackWorkspaceEntity, CalendarEntity):
+    """Time entries in a workspace as calendar events.
+
+    Range queries are answered from the coordinator's time entry history; only parts of the range that
+        haven't been fetched yet cost a request so a dashboard re-rendering the same week is free.
+    The running entry comes from the regular poll.
+    """
+
+    _attr_icon = "mdi:calendar-clock"
+
+    def __init__(
+        self,
+        coordinator: TogglTrackCoordinator,
+        config_entry_id: str,
+        account_id: int,
+        workspace_id: int,
+        workspace_name: str,
+    ) -> None:
+        """Pass coordinator to CoordinatorEntity and store some UUIDs."""
+        super().__init__(coordinator, config_entry_id, workspace_id, workspace_name)
+        self._account_id = account_id
+        self._attr_name = f"{workspace_name}"
+        self._attr_unique_id = f"{config_entry_id}_{account_id}_{workspace_id}_calendar"
+
+    def _own_running(self) -> list[TimeEntry]:
+        """Running entries that belong to the API key owner; history only has their entries."""
+        return [
+            te
+            for te in self.coordinator.running_entries(self._workspace_id)
+            if te.user_id in (None, self._account_id) and te.start is not None
+        ]
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the running time entry, if any."""
+        if running := self._own_running():
+            # Nobody knows when it'll stop; as far as HA is concerned, it runs at least until the next poll
+            return _to_event(
+                running[0],
+                dt_util.utcnow() + (self.coordinator.update_interval or timedelta(0)),
+            )
+        return None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return time entries between `start_date` and `end_date`."""
+        try:
+            # Somebody is looking at this so it goes ahead of background reads
+            entries = await self.coordinator.async_get_history(
+                start_date, end_date, self._workspace_id, priority=Priority.REFRESH
+            )
+        except (
+            ClientResponseError,
+            CircuitOpenError,
+            DispatcherShutdownError,
+            TimeoutError,
+        ) as err:
+            raise HomeAssistantError(f"Error fetching time entries: {err}") from err
+
+        now = dt_util.utcnow()
+        by_id = {te.id: te for te in entries}
+        for te in self._own_running():
+            te_start, te_end = entry_span(te, now)
+            if te_start < end_date and te_end > start_date:
+                by_id[te.id] = te
+        return [
+            _to_event(te, now) for te in sorted(by_id.values(), key=lambda te: te.start)
+        ]
@@ -0,0 +1,109 @@
+"""Workspaces and projects to pick from in the config and options flows.
+
+Organisations can have hundreds of workspaces and thousands of projects; listing all of them in one form
+is slow to load and impossible to use. Both are offered a page at a time, filtered by a search string.
+Toggl returns every workspace in one response so those are paged locally. Projects are searched and
+paged server side and each page is cached for a while so moving back and forth between pages is free.
+See: https://engineering.toggl.com/docs/api/projects
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import logging
+
+from lib_toggl.client import Toggl
+from lib_toggl.const import BASE
+from lib_toggl.workspace import Workspace
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# pylint: disable=invalid-name
+def PROJECTS_ENDPOINT(workspace_id: int) -> str:
+    """Return the projects endpoint for a workspace."""
+    return f"{BASE}/workspaces/{workspace_id}/projects"
+
+
+@dataclass
+class CatalogPage:
+    """One page of choices; ID (as a string, same as the config entry options) to name."""
+
+    items: dict[str, str] = field(default_factory=dict)
+    page: int = 1
+    has_more: bool = False
+
+
+def page_workspaces(
+    workspaces: list[Workspace], search: str, page: int, size: int
+) -> CatalogPage:
+    """Return one page of the workspaces whose name contains `search`, sorted by name."""
+    needle = search.strip().casefold()
+    matches = sorted(
+        (w for w in workspaces if needle in (w.name or "").casefold()),
+        key=lambda w: (w.name or "").casefold(),
+    )
+    start = (page - 1) * size
+    return CatalogPage(
+        items={str(w.id): w.name for w in matches[start : start + size]},
+        page=page,
+        has_more=start + size < len(matches),
+    )
+
+
+async def async_fetch_projects(
+    api: Toggl, workspace_id: int, search: str, page: int, size: int
+) -> CatalogPage:
+    """Fetch one page of a workspace's active projects whose name contains `search`."""
+    params = {
+        "active": "true",
+        "sort_field": "name",
+        "page": page,
+        "per_page": size,
+    }
+    if search.strip():
+        params["name"] = search.strip()
+    _LOGGER.debug("Fetching projects for workspace %s: %s", workspace_id, params)
+    payload = await api.do_get_request(PROJECTS_ENDPOINT(workspace_id), data=params)
+    projects = payload or []
+    return CatalogPage(
+        items={str(p["id"]): p.get("name") or str(p["id"]) for p in projects},
+        page=page,
+        # No total in the response; a full page probably means there's another one
+        has_more=len(projects) >= size,
+    )
+
+
+class CatalogCache:
+    """Pages of projects keyed by workspace, search and page number."""
+
+    def __init__(self, max_age: timedelta) -> None:
+        """Pages older than `max_age` are fetched again."""
+        self._max_age = max_age
+        self._pages: dict[tuple[int, str, int], tuple[CatalogPage, datetime]] = {}
+
+    def get(
+        self, workspace_id: int, search: str, page: int, now: datetime
+    ) -> CatalogPage | None:
+        """Return a cached page if it's not too old."""
+        cached = self._pages.get((workspace_id, search.strip().casefold(), page))
+        if cached is None or now - cached[1] > self._max_age:
+            return None
+        return cached[0]
+
+    def put(
+        self,
+        workspace_id: int,
+        search: str,
+        catalog_page: CatalogPage,
+        now: datetime,
+    ) -> None:
+        """Cache a page; anything too old is dropped at the same time."""
+        self._pages = {
+            k: v for k, v in self._pages.items() if now - v[1] <= self._max_age
+        }
+        self._pages[(workspace_id, search.strip().casefold(), catalog_page.page)] = (
+            catalog_page,
+            now,
+        )
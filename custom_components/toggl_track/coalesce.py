@@ -0,0 +1,113 @@
+"""Coalesce rapid successive edits to the same time entry into a single write.
+
+Automations tend to edit the same entry several times in quick succession (set the description, then add
+a tag, then another ...). Each edit is a few round trips with lib-toggl and bursts of them are a reliable
+way to get a 429 on the lower tier plans. Edits to the same time entry that arrive within the window are
+merged, in the order they arrived, and written once. Every caller gets the merged result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import logging
+from typing import Any, Generic, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class _PendingEdit:
+    """Changes for one time entry that are waiting for the window to close."""
+
+    changes: dict[str, Any]
+    first_at: float
+    timer: asyncio.TimerHandle
+    waiters: list[asyncio.Future] = field(default_factory=list)
+
+
+class EditCoalescer(Generic[_T]):
+    """Debounce edits per time entry ID and flush the merged changes once things go quiet."""
+
+    def __init__(
+        self,
+        window: float,
+        max_delay: float,
+        flush: Callable[[int, dict[str, Any]], Awaitable[_T]],
+    ) -> None:
+        """Flush `window` seconds after the last edit but never more than `max_delay` after the first."""
+        self._window = window
+        self._max_delay = max_delay
+        self._flush = flush
+        self._pending: dict[int, _PendingEdit] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def async_edit(self, time_entry_id: int, changes: dict[str, Any]) -> _T:
+        """Queue `changes` for the time entry and wait for the merged write to finish."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if (pending := self._pending.get(time_entry_id)) is None:
+            pending = self._pending[time_entry_id] = _PendingEdit(
+                changes={},
+                first_at=now,
+                timer=loop.call_later(self._window, self._async_flush, time_entry_id),
+            )
+        else:
+            # Debounce, but don't let a steady trickle of edits hold the write back forever
+            pending.timer.cancel()
+            delay = min(self._window, pending.first_at + self._max_delay - now)
+            pending.timer = loop.call_later(
+                max(delay, 0), self._async_flush, time_entry_id
+            )
+            _LOGGER.debug(
+                "Coalescing edit to time entry %s with %s earlier edit(s)",
+                time_entry_id,
+                len(pending.waiters),
+            )
+
+        # Later edits win where they conflict with earlier ones
+        pending.changes.update(changes)
+        waiter = loop.create_future()
+        pending.waiters.append(waiter)
+        return await waiter
+
+    def _async_flush(self, time_entry_id: int) -> None:
+        """Window closed; write whatever has been merged so far."""
+        if (pending := self._pending.pop(time_entry_id, None)) is None:
+            return
+        pending.timer.cancel()
+        task = asyncio.get_running_loop().create_task(
+            self._async_write(time_entry_id, pending),
+            name=f"toggl_track_edit_{time_entry_id}",
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_write(self, time_entry_id: int, pending: _PendingEdit) -> None:
+        """Do the write and hand the outcome to everybody that asked for part of it."""
+        try:
+            result = await self._flush(time_entry_id, pending.changes)
+        except asyncio.CancelledError:
+            for waiter in pending.waiters:
+                waiter.cancel()
+            raise
+        # pylint: disable=broad-except
+        except Exception as err:  # noqa: BLE001
+            for waiter in pending.waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+            return
+        for waiter in pending.waiters:
+            # Caller may have given up waiting; the write still happened
+            if not waiter.done():
+                waiter.set_result(result)
+
+    async def async_flush_all(self) -> None:
+        """Write everything that's pending now rather than waiting; used on unload."""
+        for time_entry_id in list(self._pending):
+            self._async_flush(time_entry_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,5 +1,6 @@
 """implements graphical configuration flow for setting up Toggl Track integration."""
 
+from datetime import timedelta
 from http import HTTPStatus
 import logging
 from typing import Any
@@ -7,30 +8,73 @@ from typing import Any
 from aiohttp.client_exceptions import ClientResponseError
 from lib_toggl.account import Account
 from lib_toggl.client import Toggl
+from lib_toggl.workspace import Workspace
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
+from homeassistant.const import ATTR_NAME, CONF_API_KEY, CONF_SCAN_INTERVAL
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.selector import (
+    BooleanSelector,
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
     TextSelector,
     TextSelectorConfig,
     TextSelectorType,
+    TimeSelector,
 )
 
+from .catalog import CatalogPage, page_workspaces
 from .const import (
+    ATTR_WORKSPACE_ID,
+    CATALOG_MAX_AGE_SECONDS,
+    CATALOG_PAGE_SIZE,
+    CONF_ACTIVE_DAYS,
+    CONF_ACTIVE_END,
+    CONF_ACTIVE_START,
+    CONF_ALERTS,
+    CONF_DAILY_TARGET_HOURS,
+    CONF_EDIT_COALESCE_WINDOW,
+    CONF_HEDGE_REQUESTS,
+    CONF_IDLE_MINUTES,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_OVERTIME_MINUTES,
+    CONF_PAGE,
+    CONF_PROJECTS,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SEARCH,
+    CONF_TEAM_ACTIVITY,
     CONF_WORKSPACES,
+    DEFAULT_IDLE_SCAN_INTERVAL_SECONDS,
     DEFAULT_POLL_INTERVAL_SECONDS,
+    DEFAULT_REQUEST_TIMEOUT_SECONDS,
     DOMAIN,
+    MAX_ALERT_MINUTES,
+    MAX_DAILY_TARGET_HOURS,
+    MAX_EDIT_COALESCE_WINDOW_SECONDS,
+    MAX_IDLE_SCAN_INTERVAL_SECONDS,
     MAX_POLL_INTERVAL_SECONDS,
+    MAX_REQUEST_TIMEOUT_SECONDS,
     MIN_POLL_INTERVAL_SECONDS,
+    MIN_REQUEST_TIMEOUT_SECONDS,
     TOGGL_TRACK_PROFILE_URL,
+    WEEKDAYS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 _poll_range = vol.Range(min=MIN_POLL_INTERVAL_SECONDS, max=MAX_POLL_INTERVAL_SECONDS)
+# 0 pauses polling outside of active hours entirely
+_idle_poll_range = vol.Any(
+    0, vol.Range(min=MIN_POLL_INTERVAL_SECONDS, max=MAX_IDLE_SCAN_INTERVAL_SECONDS)
+)
+_request_timeout_range = vol.Range(
+    min=MIN_REQUEST_TIMEOUT_SECONDS, max=MAX_REQUEST_TIMEOUT_SECONDS
+)
 
 # Toggl does support a few different auth mechanisms but for now, API key is all that's supported here
 AUTH_SCHEMA = vol.Schema(
@@ -52,6 +96,66 @@ AUTH_SCHEMA = vol.Schema(
 )
 
 
+def _paged_schema(
+    key: str,
+    catalog_page: CatalogPage,
+    selected: dict[str, str],
+    search: str,
+    extra: dict[Any, Any] | None = None,
+) -> tuple[vol.Schema, dict[str, str]]:
+    """Return the form for one page of choices and everything it shows.
+
+    Whatever is already selected is always shown, on top of the page, so it can be unticked from any page.
+    """
+    shown = {**selected, **catalog_page.items}
+    schema = vol.Schema(
+        {
+            **(extra or {}),
+            vol.Optional(CONF_SEARCH, default=search): str,
+            vol.Required(CONF_PAGE, default=catalog_page.page): vol.All(
+                vol.Coerce(int), vol.Range(min=1)
+            ),
+            vol.Optional(
+                key, default=[k for k in shown if k in selected]
+            ): cv.multi_select(shown),
+        }
+    )
+    return schema, shown
+
+
+def _apply_ticks(
+    selected: dict[str, Any],
+    shown: dict[str, str],
+    ticked: list[str],
+    value: Any = None,
+) -> None:
+    """Update `selected` with what was (un)ticked out of what the form showed.
+
+    Selected items are stored as their name unless `value` says otherwise.
+    """
+    for key, name in shown.items():
+        if key in ticked:
+            selected.setdefault(key, name if value is None else value(key, name))
+        else:
+            selected.pop(key, None)
+
+
+def _navigate(
+    user_input: dict[str, Any], search: str, page: int
+) -> tuple[str, int] | None:
+    """Return the search and page to show next, or None if the user didn't ask for a different page.
+
+    A new search starts back at page 1.
+    """
+    new_search = user_input.get(CONF_SEARCH, "")
+    new_page = int(user_input.get(CONF_PAGE, page))
+    if new_search != search:
+        return new_search, 1
+    if new_page != page:
+        return search, new_page
+    return None
+
+
 class TogglTrackConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Toggl Track."""
 
@@ -70,7 +174,20 @@ class TogglTrackConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._scan_interval: int = None
 
         self._acct_details: Account = None
-        self._workspaces: dict[str, int] = None
+        self._workspaces: list[Workspace] = None
+        # Workspace selection form; see _paged_schema()
+        self._selected: dict[str, str] = {}
+        self._shown: dict[str, str] = {}
+        self._search = ""
+        self._page = 1
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Workspace and project selection after setup."""
+        return TogglTrackOptionsFlow()
 
     async def async_step_reconfigure(
         self, user_input: dict[str, Any] | None = None
@@ -89,9 +206,10 @@ class TogglTrackConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Fortunately, we don't have to modify the value of the scan interval in the coordinator, it's updated / persisted on async_update_reload_and_abort()
         ##
         # TODO: assert/check?
-        _entry_id = self._get_reconfigure_entry().entry_id
-        _coordinator = self.hass.data[DOMAIN][_entry_id]
-        self._scan_interval = _coordinator.update_interval.total_seconds()
+        _entry = self._get_reconfigure_entry()
+        _coordinator = self.hass.data[DOMAIN][_entry.entry_id]
+        # Outside of active hours, update_interval is stretched so use the configured value
+        self._scan_interval = _coordinator.scan_interval.total_seconds()
         _LOGGER.debug("Scan interval: %s", self._scan_interval)
 
         SCAN_INTERVAL_SCHEMA = vol.Schema(
@@ -102,6 +220,58 @@ class TogglTrackConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     default=self._scan_interval,
                     description="Toggl Track Polling interval",
                 ): vol.All(vol.Coerce(int), _poll_range),
+                # Active hours; by default every day, all day which is the same as no schedule at all
+                vol.Required(
+                    CONF_ACTIVE_DAYS,
+                    default=_entry.data.get(CONF_ACTIVE_DAYS, WEEKDAYS),
+                ): SelectSelector(
+                    SelectSelectorConfig(
+                        options=WEEKDAYS,
+                        multiple=True,
+                        translation_key=CONF_ACTIVE_DAYS,
+                    )
+                ),
+                vol.Required(
+                    CONF_ACTIVE_START,
+                    default=_entry.data.get(CONF_ACTIVE_START, "00:00:00"),
+                ): TimeSelector(),
+                vol.Required(
+                    CONF_ACTIVE_END,
+                    default=_entry.data.get(CONF_ACTIVE_END, "00:00:00"),
+                ): TimeSelector(),
+                vol.Required(
+                    CONF_IDLE_SCAN_INTERVAL,
+                    default=_entry.data.get(
+                        CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL_SECONDS
+                    ),
+                    description="Toggl Track Polling interval outside of active hours",
+                ): vol.All(vol.Coerce(int), _idle_poll_range),
+                # Premium/team feature; off by default as it costs a request per workspace per poll
+                vol.Required(
+                    CONF_TEAM_ACTIVITY,
+                    default=_entry.data.get(CONF_TEAM_ACTIVITY, False),
+                ): BooleanSelector(),
+                vol.Required(
+                    CONF_REQUEST_TIMEOUT,
+                    default=_entry.data.get(
+                        CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT_SECONDS
+                    ),
+                    description="Deadline for each Toggl Track read, including retries",
+                ): vol.All(vol.Coerce(int), _request_timeout_range),
+                # Off by default; a hedged request counts against the rate limit like any other
+                vol.Required(
+                    CONF_HEDGE_REQUESTS,
+                    default=_entry.data.get(CONF_HEDGE_REQUESTS, False),
+                ): BooleanSelector(),
+                # 0 writes every edit straight away
+                vol.Required(
+                    CONF_EDIT_COALESCE_WINDOW,
+                    default=_entry.data.get(CONF_EDIT_COALESCE_WINDOW, 0),
+                    description="Merge edits to the same time entry made within this many seconds",
+                ): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0, max=MAX_EDIT_COALESCE_WINDOW_SECONDS),
+                ),
             }
         )
 
@@ -202,42 +372,245 @@ class TogglTrackConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_workspaces(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Do option flow for selecting workspaces to track."""
+        """Do option flow for selecting workspaces to track.
+
+        Shown a page at a time; changing the search or page shows that page, submitting without changing
+            either creates the entry. Ticks are kept while moving between pages.
+        """
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            _apply_ticks(
+                self._selected, self._shown, user_input.get(CONF_WORKSPACES, [])
+            )
+            if (view := _navigate(user_input, self._search, self._page)) is not None:
+                self._search, self._page = view
+            elif not self._selected:
+                errors["base"] = "no_workspaces"
+            else:
+                _LOGGER.debug("User input received. Creating entry")
+                return self.async_create_entry(
+                    title=f"Toggl Track: {self._acct_details.email}",
+                    data={
+                        CONF_API_KEY: self._api_key,
+                        CONF_SCAN_INTERVAL: self._scan_interval,
+                    },
+                    # Store only the selected workspace id/names
+                    # I don't know if workspaces can be renamed. I am assuming that the ID will never
+                    #   change so long as the workspace exists.
+                    # Store the name just to save a few API calls later; if the name can change, it likely
+                    #   does not change often.
+                    options={CONF_WORKSPACES: self._selected},
+                )
 
         # the multi_select helper is PICKY about the format of the dict
         # Can not do int -> str map between workspace ID and name
         # Must do str -> str map between workspace ID and name
         ##
-        _ws_dict = {str(w.id): w.name for w in self._workspaces}
+        catalog_page = page_workspaces(
+            self._workspaces, self._search, self._page, CATALOG_PAGE_SIZE
+        )
+        schema, self._shown = _paged_schema(
+            CONF_WORKSPACES, catalog_page, self._selected, self._search
+        )
+        return self.async_show_form(
+            step_id="workspaces",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"page": str(catalog_page.page)},
+        )
 
-        if not user_input:
-            _LOGGER.debug(
-                "No user workspace selections. Getting workspaces for selection"
+
+class TogglTrackOptionsFlow(config_entries.OptionsFlow):
+    """Change which workspaces are tracked and which projects get a sensor of their own.
+
+    Same paging as the workspace step of the config flow. Saving adds/removes entities in place; nothing is
+        reloaded. See async_update_options() in __init__.py
+    """
+
+    def __init__(self) -> None:
+        """Selections are copied from the entry the first time each step is shown."""
+        self._workspaces: dict[str, str] | None = None
+        # Project ID -> {"name": ..., "workspace_id": ...}
+        self._projects: dict[str, dict[str, Any]] | None = None
+        self._shown: dict[str, str] = {}
+        self._search = ""
+        self._page = 1
+        self._workspace_id: str | None = None
+
+    @property
+    def _entry(self) -> config_entries.ConfigEntry:
+        """Options flows are keyed by the ID of the entry they belong to."""
+        return self.hass.config_entries.async_get_entry(self.handler)
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Pick what to change."""
+        return self.async_show_menu(
+            step_id="init", menu_options=[CONF_WORKSPACES, CONF_PROJECTS, CONF_ALERTS]
+        )
+
+    def _async_save(self) -> FlowResult:
+        """Store the selections; projects in workspaces that are no longer tracked are dropped."""
+        options = dict(self._entry.options)
+        if self._workspaces is not None:
+            options[CONF_WORKSPACES] = self._workspaces
+        workspaces = options[CONF_WORKSPACES]
+        projects = (
+            self._projects
+            if self._projects is not None
+            else options.get(CONF_PROJECTS, {})
+        )
+        options[CONF_PROJECTS] = {
+            k: v for k, v in projects.items() if str(v[ATTR_WORKSPACE_ID]) in workspaces
+        }
+        return self.async_create_entry(title="", data=options)
+
+    async def async_step_workspaces(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Pick the workspaces to track."""
+        if self._workspaces is None:
+            self._workspaces = dict(self._entry.options.get(CONF_WORKSPACES, {}))
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            _apply_ticks(
+                self._workspaces, self._shown, user_input.get(CONF_WORKSPACES, [])
             )
-            _ws_schema = vol.Schema(
-                {
-                    vol.Required(CONF_WORKSPACES): cv.multi_select(_ws_dict),
-                }
+            if (view := _navigate(user_input, self._search, self._page)) is not None:
+                self._search, self._page = view
+            elif not self._workspaces:
+                errors["base"] = "no_workspaces"
+            else:
+                return self._async_save()
+
+        coordinator = self.hass.data[DOMAIN][self.handler]
+        try:
+            # Picks up workspaces created since setup
+            workspaces = await coordinator.async_get_workspaces(
+                max_age=timedelta(seconds=CATALOG_MAX_AGE_SECONDS)
+            )
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Unable to fetch workspaces: %s", err)
+            errors["base"] = "cannot_connect"
+            workspaces = []
+
+        catalog_page = page_workspaces(
+            workspaces, self._search, self._page, CATALOG_PAGE_SIZE
+        )
+        schema, self._shown = _paged_schema(
+            CONF_WORKSPACES, catalog_page, self._workspaces, self._search
+        )
+        return self.async_show_form(
+            step_id="workspaces",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"page": str(catalog_page.page)},
+        )
+
+    async def async_step_projects(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Pick the projects, one workspace at a time, that get a sensor."""
+        workspaces: dict[str, str] = self._entry.options.get(CONF_WORKSPACES, {})
+        if self._projects is None:
+            self._projects = dict(self._entry.options.get(CONF_PROJECTS, {}))
+        if self._workspace_id not in workspaces:
+            self._workspace_id = next(iter(workspaces))
+
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            workspace_id = self._workspace_id
+            _apply_ticks(
+                self._projects,
+                self._shown,
+                user_input.get(CONF_PROJECTS, []),
+                lambda _, name: {ATTR_NAME: name, ATTR_WORKSPACE_ID: int(workspace_id)},
+            )
+            view = _navigate(user_input, self._search, self._page)
+            if (new_workspace := user_input.get(ATTR_WORKSPACE_ID)) not in (
+                None,
+                self._workspace_id,
+            ):
+                self._workspace_id = new_workspace
+                view = (user_input.get(CONF_SEARCH, ""), 1)
+            if view is None:
+                return self._async_save()
+            self._search, self._page = view
+
+        coordinator = self.hass.data[DOMAIN][self.handler]
+        try:
+            catalog_page = await coordinator.async_get_projects(
+                int(self._workspace_id), self._search, self._page
             )
-            return self.async_show_form(step_id="workspaces", data_schema=_ws_schema)
-
-        _LOGGER.debug("User input received. Creating entry")
-        return self.async_create_entry(
-            title=f"Toggl Track: {self._acct_details.email}",
-            data={
-                CONF_API_KEY: self._api_key,
-                CONF_SCAN_INTERVAL: self._scan_interval,
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Unable to fetch projects: %s", err)
+            errors["base"] = "cannot_connect"
+            catalog_page = CatalogPage(page=self._page)
+
+        # Only this workspace's projects are shown; the ones picked in other workspaces are kept as they are
+        selected = {
+            k: v[ATTR_NAME]
+            for k, v in self._projects.items()
+            if str(v[ATTR_WORKSPACE_ID]) == self._workspace_id
+        }
+        schema, self._shown = _paged_schema(
+            CONF_PROJECTS,
+            catalog_page,
+            selected,
+            self._search,
+            extra={
+                vol.Required(
+                    ATTR_WORKSPACE_ID, default=self._workspace_id
+                ): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=k, label=v)
+                            for k, v in workspaces.items()
+                        ],
+                        mode=SelectSelectorMode.DROPDOWN,
+                    )
+                )
             },
-            # From _ws_dict, store only the selected workspace id/names
-            # I don't know if workspaces can be renamed. I am assuming that the ID will never
-            #   change so long as the workspace exists.
-            # Store the name just to save a few API calls later; if the name can change, it likely
-            #   does not change often.
-            options={
-                CONF_WORKSPACES: {
-                    k: v
-                    for k, v in _ws_dict.items()
-                    if k in user_input[CONF_WORKSPACES]
+        )
+        return self.async_show_form(
+            step_id="projects",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"page": str(catalog_page.page)},
+        )
+
+    async def async_step_alerts(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set the alert thresholds; 0 turns an alert off."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title="", data={**self._entry.options, **user_input}
+            )
+
+        options = self._entry.options
+        _alert_minutes = vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=MAX_ALERT_MINUTES)
+        )
+        return self.async_show_form(
+            step_id="alerts",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_OVERTIME_MINUTES,
+                        default=options.get(CONF_OVERTIME_MINUTES, 0),
+                    ): _alert_minutes,
+                    vol.Required(
+                        CONF_IDLE_MINUTES, default=options.get(CONF_IDLE_MINUTES, 0)
+                    ): _alert_minutes,
+                    vol.Required(
+                        CONF_DAILY_TARGET_HOURS,
+                        default=options.get(CONF_DAILY_TARGET_HOURS, 0),
+                    ): vol.All(
+                        vol.Coerce(float),
+                        vol.Range(min=0, max=MAX_DAILY_TARGET_HOURS),
+                    ),
                 }
-            },
+            ),
         )
@@ -18,6 +18,8 @@ If you have any issues with this you need to open an issue here:
 """
 
 CONF_WORKSPACES = "workspaces"
+# Optional; projects that get a sensor of their own. Project ID -> {"name": ..., "workspace_id": ...}
+CONF_PROJECTS = "projects"
 TOGGL_TRACK_PROFILE_URL = "https://track.toggl.com/profile"
 
 # As is tradition with Toggl, I can find a few different but equally vague references to the polling interval.
@@ -29,6 +31,139 @@ MAX_POLL_INTERVAL_SECONDS = 600
 # Default assume free user, so 120 seconds between polls
 DEFAULT_POLL_INTERVAL_SECONDS = 120
 
+# Optional weekly schedule. Outside of the active window, poll every CONF_IDLE_SCAN_INTERVAL seconds
+#   or not at all if that is 0. Any service call wakes polling back up for ACTIVITY_WAKE_SECONDS.
+CONF_ACTIVE_DAYS = "active_days"
+CONF_ACTIVE_START = "active_start"
+CONF_ACTIVE_END = "active_end"
+CONF_IDLE_SCAN_INTERVAL = "idle_scan_interval"
+# Order matters; index is the value of datetime.weekday()
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+DEFAULT_IDLE_SCAN_INTERVAL_SECONDS = 3600
+MAX_IDLE_SCAN_INTERVAL_SECONDS = 86400
+ACTIVITY_WAKE_SECONDS = 3600
+
+# Summary reports (server side aggregated totals) are cached until the period rolls over, a local write
+#   invalidates them or they're older than SUMMARY_MAX_AGE_SECONDS. Cache is checked every SUMMARY_REFRESH_SECONDS
+#   so most checks don't cost a request.
+SUMMARY_REFRESH_SECONDS = 900
+SUMMARY_MAX_AGE_SECONDS = 6 * 3600
+
+# Past time entries are cached by the time range they were fetched for. Ranges older than HISTORY_MAX_AGE_SECONDS
+#   are fetched again so that edits made outside of HA eventually show up.
+HISTORY_MAX_AGE_SECONDS = 6 * 3600
+HISTORY_MIN_GAP_SECONDS = 900
+# Tracked hours per workspace/project/tag are imported as long-term statistics once an hour.
+# On first run, this many days are backfilled.
+STATISTICS_REFRESH_SECONDS = 3600
+STATISTICS_BACKFILL_DAYS = 30
+
+# Edits and deletions made outside of HA are found by comparing seconds tracked per project per day, for the last
+#   RECONCILE_DAYS completed days, with the Reports API. Only days that differ are fetched again.
+# Each run makes at most RECONCILE_MAX_REQUESTS requests; whatever doesn't fit is picked up by the next run.
+RECONCILE_INTERVAL_SECONDS = 3600
+RECONCILE_DAYS = 14
+RECONCILE_MAX_REQUESTS = 6
+EVENT_TIME_ENTRY_CHANGED = f"{DOMAIN}_time_entry_changed"
+
+# Largest page of time entries a single websocket history query returns
+WS_QUERY_MAX_PAGE_SIZE = 500
+
+# Workspaces and projects are offered a page at a time in the config/options flows; see catalog.py
+# Workspaces are fetched again and project pages are cached for CATALOG_MAX_AGE_SECONDS.
+CATALOG_PAGE_SIZE = 25
+CATALOG_MAX_AGE_SECONDS = 600
+# Options form fields
+CONF_SEARCH = "search"
+CONF_PAGE = "page"
+# Sent, with the config entry ID, when options change; platforms add/remove entities to match
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+
+# Optional alerts, per workspace; see alerts.py. 0 turns each one off.
+# Overtime: the running entry has been going for this long. Idle: nothing running for this long, only counting
+#   active hours if there's a schedule. Daily target: this much tracked today, running entry included.
+CONF_ALERTS = "alerts"
+CONF_OVERTIME_MINUTES = "overtime_minutes"
+CONF_IDLE_MINUTES = "idle_minutes"
+CONF_DAILY_TARGET_HOURS = "daily_target_hours"
+MAX_ALERT_MINUTES = 24 * 60
+MAX_DAILY_TARGET_HOURS = 24
+# Fired when an alert turns on; platforms are told about every change with SIGNAL_ALERTS_UPDATED
+EVENT_ALERT = f"{DOMAIN}_alert"
+SIGNAL_ALERTS_UPDATED = f"{DOMAIN}_alerts_updated_{{}}"
+
+# When enabled, each poll also fetches every tracked workspace's dashboard so that timers other
+#   members have running show up. Costs one extra request per workspace per poll.
+CONF_TEAM_ACTIVITY = "team_activity"
+
+# Circuit breaker; opens after BREAKER_FAILURE_THRESHOLD failures in a row or on the first 5XX/429.
+# Cooldown doubles every time the half-open probe fails, up to BREAKER_MAX_COOLDOWN_SECONDS. Retry-After wins if longer.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 60
+BREAKER_MAX_COOLDOWN_SECONDS = 1800
+# While the API is failing, entities keep showing the last good data (flagged as stale) for this long
+STALE_MAX_AGE_SECONDS = 3600
+
+# Every request has a deadline. Reads default to CONF_REQUEST_TIMEOUT, writes to WRITE_DEADLINE_SECONDS and anything
+#   in REQUEST_DEADLINE_SECONDS (keyed by the name of the function making the request) gets its own.
+# Reads are idempotent so transient failures are retried, with jittered backoff, within the same deadline.
+CONF_REQUEST_TIMEOUT = "request_timeout"
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 10
+MIN_REQUEST_TIMEOUT_SECONDS = 3
+MAX_REQUEST_TIMEOUT_SECONDS = 60
+WRITE_DEADLINE_SECONDS = 20
+REQUEST_DEADLINE_SECONDS = {
+    # Reports API aggregates server side and is noticeably slower than everything else
+    "async_fetch_summary": 30,
+    "async_fetch_daily_totals": 30,
+}
+READ_RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 0.5
+RETRY_MAX_BACKOFF_SECONDS = 4
+# Optional; if a read is still outstanding after the p95 latency seen for that kind of request, send it again.
+# Costs the occasional extra request against the rate limit. Needs HEDGE_MIN_SAMPLES before it kicks in.
+CONF_HEDGE_REQUESTS = "hedge_requests"
+HEDGE_LATENCY_WINDOW = 100
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_SECONDS = 0.25
+
+# Optional; edits to the same time entry that arrive within this many seconds of each other are merged into one write.
+# 0 disables. A steady stream of edits is still written at least every EDIT_COALESCE_MAX_DELAY_SECONDS.
+CONF_EDIT_COALESCE_WINDOW = "edit_coalesce_window"
+MAX_EDIT_COALESCE_WINDOW_SECONDS = 5
+EDIT_COALESCE_MAX_DELAY_SECONDS = 15
+
+# Optional YAML; rules that start/stop time entries based on the state of other entities. See rules.py
+# A state has to hold for on_for/off_for before anything is written. A write that fails is retried after
+#   RULE_RETRY_SECONDS unless the state changes again first.
+CONF_RULES = "rules"
+CONF_ON_FOR = "on_for"
+CONF_OFF_FOR = "off_for"
+DEFAULT_RULE_ON_FOR_SECONDS = 60
+DEFAULT_RULE_OFF_FOR_SECONDS = 300
+RULE_RETRY_SECONDS = 60
+RULE_CREATED_WITH = "ha-toggl-track-rules"
+
+# On demand profiling; see profiler.py. A profile stops once it has seen the cycles/service calls asked for or
+#   after the timeout, whichever is first. Reports are written to the config directory.
+PROFILE_DEFAULT_CYCLES = 1
+PROFILE_MAX_CYCLES = 20
+PROFILE_MAX_SERVICE_CALLS = 100
+PROFILE_DEFAULT_TIMEOUT_SECONDS = 900
+PROFILE_MAX_TIMEOUT_SECONDS = 3600
+# Functions with the most cumulative time, when cProfile is on
+PROFILE_TOP_FUNCTIONS = 25
+
+# Recording API traffic for replay later; see traffic.py. Recordings are written to the config directory.
+TRAFFIC_DEFAULT_SECONDS = 600
+TRAFFIC_MAX_SECONDS = 6 * 3600
+
+# All API calls go through a small pool of workers.
+# Reads (poll, workspaces, history ... etc) share DISPATCHER_READ_WORKERS and are done in priority order.
+# Writes (service calls) get their own worker(s) so they never wait behind a slow read.
+DISPATCHER_READ_WORKERS = 2
+DISPATCHER_WRITE_WORKERS = 1
+
 ## Internals; Time Entry / Workspace ...etc Attributes
 
 # Time Entries have quite a few attributes, not all of which are useful for HA
@@ -37,6 +172,8 @@ DEFAULT_POLL_INTERVAL_SECONDS = 120
 # Toggl API is inconsistent; depending on which endpoint, time entry ID is either just "id" or "time_entry_id"
 ATTR_ID = "id"
 ATTR_TIME_ENTRY_ID = "time_entry_id"
+# Service response when more than one time entry was stopped/edited
+ATTR_TIME_ENTRIES = "time_entries"
 
 ATTR_DESCRIPTION = "description"
 ATTR_WORKSPACE_ID = "workspace_id"
@@ -52,10 +189,37 @@ ATTR_TAG_IDS = "tag_ids"
 ATTR_AT = "at"
 ATTR_USER_ID = "user_id"
 ATTR_CREATED_WITH = "created_with"
+# Everybody's running entries in a workspace when team activity is enabled
+ATTR_RUNNING_ENTRIES = "running_entries"
+# Set when the API is failing and the last good data is being shown
+ATTR_STALE = "stale"
+
+# Summary reports
+ATTR_PERIOD = "period"
+ATTR_GROUPING = "grouping"
+ATTR_PERIOD_START = "period_start"
+ATTR_PERIOD_END = "period_end"
+ATTR_BILLABLE_HOURS = "billable_hours"
+ATTR_PROJECT_HOURS = "project_hours"
+# Computed reports; start is ATTR_START
+ATTR_END = "end"
+ATTR_GROUP_BY = "group_by"
+# Alerts
+ATTR_ALERT = "alert"
+ATTR_TRACKED_HOURS = "tracked_hours"
+# Profiling
+ATTR_CYCLES = "cycles"
+ATTR_SERVICE_CALLS = "service_calls"
+ATTR_CPROFILE = "cprofile"
+ATTR_TIMEOUT = "timeout"
 
 ## Internals; HA Services
 
 SERVICE_NEW_TIME_ENTRY = "new_time_entry"
 SERVICE_STOP_TIME_ENTRY = "stop_time_entry"
 SERVICE_EDIT_TIME_ENTRY = "edit_time_entry"
+SERVICE_GET_SUMMARY = "get_summary"
+SERVICE_COMPUTE_REPORT = "compute_report"
+SERVICE_PROFILE = "profile"
+SERVICE_RECORD_TRAFFIC = "record_traffic"
 SERVICE_WORKSPACE_ID_ENTITY_ID = "workspace_id_entity_id"
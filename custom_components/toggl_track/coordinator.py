@@ -1,20 +1,88 @@
 """DataUpdateCoordinator for the Toggl Track API/component."""
 
-import asyncio.timeouts as async_timeout
-from datetime import timedelta
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from datetime import datetime, timedelta
+from functools import partial
 import logging
+from typing import Any, TypeVar
 
+from aiohttp.client_exceptions import ClientError, ClientResponseError
+from lib_toggl.account import Account
 from lib_toggl.client import Toggl
 from lib_toggl.time_entries import TimeEntry
 from lib_toggl.workspace import Workspace
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .activity import ActivityUnsupportedError, async_fetch_running
+from .alerts import AlertEvaluator
+from .breaker import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_trip_error,
+    retry_after_from_error,
+)
+from .catalog import CatalogCache, CatalogPage, async_fetch_projects
+from .coalesce import EditCoalescer
+from .const import (
+    ACTIVITY_WAKE_SECONDS,
+    ATTR_ID,
+    BREAKER_COOLDOWN_SECONDS,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_COOLDOWN_SECONDS,
+    CATALOG_MAX_AGE_SECONDS,
+    CATALOG_PAGE_SIZE,
+    CONF_WORKSPACES,
+    DISPATCHER_READ_WORKERS,
+    DISPATCHER_WRITE_WORKERS,
+    DOMAIN,
+    EDIT_COALESCE_MAX_DELAY_SECONDS,
+    HEDGE_LATENCY_WINDOW,
+    HEDGE_MIN_DELAY_SECONDS,
+    HEDGE_MIN_SAMPLES,
+    HISTORY_MAX_AGE_SECONDS,
+    HISTORY_MIN_GAP_SECONDS,
+    MIN_POLL_INTERVAL_SECONDS,
+    READ_RETRY_ATTEMPTS,
+    REQUEST_DEADLINE_SECONDS,
+    RETRY_BACKOFF_SECONDS,
+    RETRY_MAX_BACKOFF_SECONDS,
+    STALE_MAX_AGE_SECONDS,
+    SUMMARY_MAX_AGE_SECONDS,
+    WRITE_DEADLINE_SECONDS,
+)
+from .dispatcher import Priority, TogglTrackDispatcher
+from .history import TimeEntryHistory
+from .profiler import SPAN_API, SPAN_FAN_OUT, SPAN_POLL, Profiler
+from .reports import (
+    SummaryCache,
+    SummaryGrouping,
+    SummaryPeriod,
+    SummaryReport,
+    async_fetch_summary,
+)
+from .retry import LatencyTracker, RequestPolicy, async_call
+from .schedule import ActiveHours
+from .traffic import TrafficRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Running time entries keyed by workspace ID. The API key owner's own entry, if any, is always first.
+RunningEntries = dict[int, list[TimeEntry]]
+
 
-class TogglTrackCoordinator(DataUpdateCoordinator):
+def _is_running(te: TimeEntry) -> bool:
+    """Toggl convention; running entries have no stop and a negative duration."""
+    return te.stop is None and (te.duration is None or te.duration < 0)
+
+
+class TogglTrackCoordinator(DataUpdateCoordinator[RunningEntries]):
     """Coordinator for updating time entry data from Toggl Track."""
 
     def __init__(
@@ -23,41 +91,605 @@ class TogglTrackCoordinator(DataUpdateCoordinator):
         logger: logging.Logger,
         update_interval: timedelta,
         api: Toggl,
+        active_hours: ActiveHours | None = None,
+        idle_interval: timedelta | None = None,
+        team_activity: bool = False,
+        request_timeout: timedelta = timedelta(seconds=10),
+        hedge_requests: bool = False,
+        edit_coalesce_window: float = 0,
     ) -> None:
-        """Initialize the Toggl Track coordinator."""
+        """Initialize the Toggl Track coordinator.
+
+        Outside of `active_hours`, poll every `idle_interval` or not at all if that is None.
+        With `team_activity`, each poll also asks every tracked workspace for everybody's running entries.
+        Reads that don't have their own deadline get `request_timeout`; see retry.py.
+        Edits to the same time entry within `edit_coalesce_window` seconds are merged; see coalesce.py.
+        """
         super().__init__(
             hass, logger, name="Toggl Track", update_interval=update_interval
         )
         self.api = api
+        # The interval the user asked for; update_interval drifts from this outside of active hours
+        self.scan_interval = update_interval
+        self._active_hours = active_hours
+        self._idle_interval = idle_interval
+        self._awake_until = None
+        self._team_activity = team_activity
+        # Workspaces where the dashboard turned out to be unavailable; don't keep asking
+        self._activity_unsupported: set[int] = set()
         self._workspaces = None
+        self._workspaces_fetched_at: datetime | None = None
+        self._account = None
+        # Entity unique ID -> workspace ID; see entity.py
+        self._workspace_by_unique_id: dict[str, int] = {}
         # Not yet implemented, but will be next
         self._tags = None
 
-    async def _async_update_data(self) -> TimeEntry:
-        """Fetch Currently running TimeEntry from Toggl Track.
+        # Every API call goes through here; see dispatcher.py
+        self.dispatcher = TogglTrackDispatcher(
+            self.name,
+            max_concurrency=DISPATCHER_READ_WORKERS,
+            write_concurrency=DISPATCHER_WRITE_WORKERS,
+        )
+        # Project pages for the options flow; see catalog.py
+        self.catalog = CatalogCache(max_age=timedelta(seconds=CATALOG_MAX_AGE_SECONDS))
+        # Server side aggregated totals; see reports.py
+        self.summaries = SummaryCache(
+            max_age=timedelta(seconds=SUMMARY_MAX_AGE_SECONDS)
+        )
+
+        # Past entries for statistics ... etc; see history.py
+        self.history = TimeEntryHistory(
+            max_age=timedelta(seconds=HISTORY_MAX_AGE_SECONDS),
+            min_gap=timedelta(seconds=HISTORY_MIN_GAP_SECONDS),
+        )
+
+        # Stop hammering an API that's already struggling; see breaker.py
+        self.breaker = CircuitBreaker(
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            cooldown=timedelta(seconds=BREAKER_COOLDOWN_SECONDS),
+            max_cooldown=timedelta(seconds=BREAKER_MAX_COOLDOWN_SECONDS),
+        )
+        # Per request deadlines, retries and optional hedging; see retry.py
+        self._request_timeout = request_timeout
+        self._hedge_requests = hedge_requests
+        self.latency = LatencyTracker(
+            window=HEDGE_LATENCY_WINDOW, min_samples=HEDGE_MIN_SAMPLES
+        )
+
+        # When polling fails, entities keep the last good data but are flagged as stale
+        self.stale = False
+        self._last_good_update = None
+
+        self._edits: EditCoalescer[TimeEntry | None] | None = None
+        if edit_coalesce_window > 0:
+            self._edits = EditCoalescer(
+                window=edit_coalesce_window,
+                max_delay=EDIT_COALESCE_MAX_DELAY_SECONDS,
+                flush=self._async_write_edit,
+            )
+
+        # Bumped every time a write completes. A poll that was in flight while a write landed
+        #   may carry a pre-write view of the world so its result is discarded.
+        self._write_generation = 0
+        # Reads that more than one caller is waiting on; see _async_shared()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        # Idle unless the profile service is running; see profiler.py
+        self.profiler = Profiler()
+        # Only set while the record_traffic service is running; see traffic.py
+        self.recorder: TrafficRecorder | None = None
+        # Overtime/idle/daily target; started from async_setup_entry() if any are turned on
+        self.alerts = AlertEvaluator(hass, self)
+
+    async def async_submit(
+        self,
+        priority: Priority,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Run an API call through the dispatcher at the given priority.
+
+        Background reads are refused while the circuit breaker isn't closed. Writes always go through
+            since the user explicitly asked for them; their outcome still feeds the breaker.
+        The poll does its own breaker check as it's what probes the API when the breaker is half open.
+        """
+        if (
+            priority is Priority.BACKGROUND
+            and self.breaker.state is not BreakerState.CLOSED
+        ):
+            raise CircuitOpenError("Toggl Track API circuit breaker is open")
+        op = getattr(func, "__name__", repr(func))
+        try:
+            # Retries/hedges happen inside the job so they count against the same worker pool
+            #   and are cancelled along with it on unload
+            with self.profiler.span(f"{SPAN_API}{op}"):
+                result = await self.dispatcher.async_submit(
+                    priority,
+                    async_call,
+                    op,
+                    partial(func, *args, **kwargs),
+                    self._request_policy(priority, op),
+                    self.latency,
+                    HEDGE_MIN_DELAY_SECONDS,
+                    name=op,
+                )
+        except ClientResponseError as err:
+            if is_trip_error(err):
+                self.breaker.record_failure(
+                    dt_util.utcnow(),
+                    retry_after_from_error(err, dt_util.utcnow()),
+                    trip=True,
+                )
+            else:
+                # API is up, it just didn't like this particular request
+                self.breaker.record_success()
+            raise
+        except asyncio.CancelledError:
+            # Caller went away (cancelled service call, lost hedge, shutdown ...etc); says nothing about the API
+            raise
+        except (ClientError, TimeoutError):
+            self.breaker.record_failure(dt_util.utcnow())
+            raise
+        self.breaker.record_success()
+        if priority is Priority.WRITE:
+            self._write_generation += 1
+            # Totals no longer add up
+            self.summaries.invalidate()
+        return result
+
+    async def _async_shared(
+        self, key: Hashable, factory: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Make one request for everybody that asks for `key` while it's in flight.
+
+        Several dashboards opening the same week at the same time is one request, not several.
+        A caller giving up only affects that caller; the request carries on for the rest.
+        """
+        if (task := self._inflight.get(key)) is None:
+            task = self._inflight[key] = self.hass.async_create_task(
+                factory(), name=f"toggl_track_shared_{key}"
+            )
+
+            def _done(task: asyncio.Task) -> None:
+                self._inflight.pop(key, None)
+                # Everybody may have given up; don't log "exception was never retrieved"
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    def _request_policy(self, priority: Priority, op: str) -> RequestPolicy:
+        """Pick the deadline, retries and hedging for a request.
+
+        Everything that isn't a write is a read and safe to repeat.
+        """
+        if priority is Priority.WRITE:
+            # Create isn't idempotent; never retry or hedge a write
+            return RequestPolicy(
+                deadline=REQUEST_DEADLINE_SECONDS.get(op, WRITE_DEADLINE_SECONDS)
+            )
+        return RequestPolicy(
+            deadline=REQUEST_DEADLINE_SECONDS.get(
+                op, self._request_timeout.total_seconds()
+            ),
+            attempts=READ_RETRY_ATTEMPTS,
+            hedge=self._hedge_requests,
+            backoff=RETRY_BACKOFF_SECONDS,
+            max_backoff=RETRY_MAX_BACKOFF_SECONDS,
+        )
+
+    @property
+    def tracked_workspace_ids(self) -> list[int]:
+        """IDs of the workspaces the user selected during config flow."""
+        if self.config_entry is None:
+            return []
+        # Stored as str -> str; see config flow
+        return [int(w) for w in self.config_entry.options.get(CONF_WORKSPACES, {})]
+
+    def running_entries(self, workspace_id: int) -> list[TimeEntry]:
+        """Return every known running entry in a workspace; own entry first."""
+        if self.data is None:
+            return []
+        return self.data.get(workspace_id, [])
+
+    def current_entry(self, workspace_id: int) -> TimeEntry | None:
+        """Return the entry a workspace sensor should show; own entry if running."""
+        if entries := self.running_entries(workspace_id):
+            return entries[0]
+        return None
+
+    def own_entry(self, workspace_id: int) -> TimeEntry | None:
+        """Return the API key owner's running entry in a workspace, never somebody else's."""
+        if self._account is None:
+            # Without team activity, everything in the snapshot is the API key owner's
+            return None if self._team_activity else self.current_entry(workspace_id)
+        for te in self.running_entries(workspace_id):
+            if te.user_id in (None, self._account.id):
+                return te
+        return None
+
+    @callback
+    def async_register_workspace_entity(
+        self, unique_id: str, workspace_id: int
+    ) -> CALLBACK_TYPE:
+        """Record which workspace an entity belongs to; returns a callback to forget it again."""
+        self._workspace_by_unique_id[unique_id] = workspace_id
+
+        @callback
+        def _unregister() -> None:
+            self._workspace_by_unique_id.pop(unique_id, None)
+
+        return _unregister
+
+    def workspace_for_unique_id(self, unique_id: str) -> int | None:
+        """Return the workspace an entity of this integration belongs to."""
+        return self._workspace_by_unique_id.get(unique_id)
+
+    @callback
+    def async_apply_time_entry(self, te: TimeEntry) -> None:
+        """Fold the result of a create/stop/edit into the running entries and notify listeners.
+
+        Saves waiting for the next poll to see the change.
+        """
+        data: RunningEntries = {
+            workspace_id: [e for e in entries if e.id != te.id]
+            for workspace_id, entries in (self.data or {}).items()
+        }
+        if _is_running(te):
+            # Anything the API key owner starts is their own entry so it goes first
+            data.setdefault(te.workspace_id, []).insert(0, te)
+        self.history.upsert(te)
+        self.async_set_updated_data(data)
+
+    async def async_edit_time_entry(self, changes: dict[str, Any]) -> TimeEntry | None:
+        """Edit a time entry; `changes` must include the time entry ID.
+
+        If coalescing is enabled, this may wait a little for other edits to the same entry and then return
+            the result of writing all of them at once.
+        """
+        if self._edits is None:
+            return await self._async_write_edit(changes[ATTR_ID], changes)
+        return await self._edits.async_edit(changes[ATTR_ID], changes)
+
+    async def _async_write_edit(
+        self, _time_entry_id: int, changes: dict[str, Any]
+    ) -> TimeEntry | None:
+        """Write an edit and fold the result straight into the running entries."""
+        edited_te = await self.async_submit(
+            Priority.WRITE, self.api.edit_time_entry, TimeEntry(**changes)
+        )
+        # Server returns the updated Time Entry so we can update the entity state directly / immediately
+        if edited_te is not None:
+            self.async_apply_time_entry(edited_te)
+        return edited_te
+
+    async def _async_fetch_team_running(self, workspace_id: int) -> list[TimeEntry]:
+        """Return everybody's running entries in the workspace, or [] if we can't see them."""
+        if workspace_id in self._activity_unsupported:
+            return []
+        try:
+            return await self.async_submit(
+                Priority.REFRESH, async_fetch_running, self.api, workspace_id
+            )
+        except ActivityUnsupportedError as err:
+            _LOGGER.info("%s; only the API key owner's entry will be shown", err)
+            self._activity_unsupported.add(workspace_id)
+            return []
+
+    async def _async_update_data(self) -> RunningEntries:
+        """Fetch running TimeEntries from Toggl Track.
 
         The value returned here will be what's accessible via the `data` property of the coordinator obj.
         """
+        if self.recorder is not None:
+            self.recorder.note_poll()
+        with self.profiler.span(SPAN_POLL):
+            data = await self._async_poll()
+        self.profiler.cycle_done()
+        return data
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners; timed as one span when profiling."""
+        with self.profiler.span(SPAN_FAN_OUT):
+            super().async_update_listeners()
+
+    async def _async_poll(self) -> RunningEntries:
+        """Ask for the running entries; see _async_update_data()."""
+        # Whatever happens next, coordinator uses update_interval to schedule the next poll
+        self._apply_schedule()
+
+        generation = self._write_generation
+        workspace_ids = self.tracked_workspace_ids if self._team_activity else []
+        probing = False
         try:
-            # Fail if we can't get a response within 10 seconds
-            async with async_timeout.timeout(10):
-                return await self.api.get_current_time_entry()
-        except Exception as err:
+            if not self.breaker.allow_request(dt_util.utcnow()):
+                raise CircuitOpenError("Toggl Track API circuit breaker is open")
+            probing = self.breaker.state is BreakerState.HALF_OPEN
+            # All requests for a poll go out together rather than one after the other.
+            # Each has its own deadline; see async_submit()
+            current, *team = await asyncio.gather(
+                self.async_submit(Priority.REFRESH, self.api.get_current_time_entry),
+                *[self._async_fetch_team_running(w) for w in workspace_ids],
+            )
+        except Exception as err:  # noqa: BLE001
+            if probing and self.breaker.state is BreakerState.HALF_OPEN:
+                # async_submit() only records API errors; a probe that failed any other way (bad payload
+                #   ...etc) still failed, otherwise the breaker would be stuck half open
+                self.breaker.record_failure(dt_util.utcnow())
+            return self._serve_stale(err)
+        finally:
+            if probing:
+                # No-op once an outcome was recorded; only matters if the poll was cancelled
+                self.breaker.release_probe()
+
+        self.stale = False
+        self._last_good_update = dt_util.utcnow()
+
+        if generation != self._write_generation:
+            _LOGGER.debug("A write completed while polling; keeping post-write data")
+            return self.data
+
+        data: RunningEntries = {}
+        if current is not None:
+            data[current.workspace_id] = [current]
+        for workspace_id, entries in zip(workspace_ids, team, strict=True):
+            own = data.setdefault(workspace_id, [])
+            own_ids = {e.id for e in own}
+            own.extend(e for e in entries if e.id not in own_ids)
+        self._invalidate_stopped(data)
+        return data
+
+    def _invalidate_stopped(self, data: RunningEntries) -> None:
+        """Entries that stopped outside of HA need to be refetched to learn when they stopped."""
+        running = {e.id for entries in data.values() for e in entries}
+        stopped = [
+            e.start
+            for entries in (self.data or {}).values()
+            for e in entries
+            if e.id not in running and e.start is not None
+        ]
+        if stopped:
+            self.history.invalidate(min(stopped))
+            self.alerts.async_history_invalidated(min(stopped))
+
+    def _serve_stale(self, err: Exception) -> RunningEntries:
+        """Keep serving the last good data rather than making every entity unavailable.
+
+        Only for so long, though; if the API has been down for ages, the data is too old to be useful.
+        """
+        if (
+            self.data is None
+            or self._last_good_update is None
+            or dt_util.utcnow() - self._last_good_update
+            > timedelta(seconds=STALE_MAX_AGE_SECONDS)
+        ):
             raise UpdateFailed(f"Error communicating with API: {err}") from err
 
-    async def async_get_workspaces(self) -> list[Workspace]:
+        if not self.stale:
+            _LOGGER.warning(
+                "Error communicating with API, serving data from %s: %s",
+                self._last_good_update,
+                err,
+            )
+        self.stale = True
+        return self.data
+
+    def _apply_schedule(self) -> None:
+        """Pick the interval until the next poll based on the active hours schedule."""
+        if self._active_hours is None:
+            return
+
+        now = dt_util.now()
+        if self._active_hours.is_active(now) or (
+            self._awake_until is not None and now < self._awake_until
+        ):
+            self.update_interval = self.scan_interval
+            return
+
+        # Outside of the window; sleep until it opens unless a slow poll is wanted before then
+        interval = None
+        if (next_start := self._active_hours.next_start(now)) is not None:
+            interval = next_start - now
+        if self._idle_interval is not None:
+            interval = min(interval or self._idle_interval, self._idle_interval)
+        if interval is None:
+            # No active days at all and polling paused; check back once in a while anyway
+            interval = timedelta(days=1)
+
+        interval = max(interval, timedelta(seconds=MIN_POLL_INTERVAL_SECONDS))
+        if interval != self.update_interval:
+            _LOGGER.debug("Outside of active hours; next poll in %s", interval)
+        self.update_interval = interval
+
+    @callback
+    def async_note_activity(self) -> None:
+        """Go back to polling at the normal rate for a while.
+
+        Called on every service call so that a user doing something outside of active hours
+            gets the same responsiveness they would during them.
+        """
+        if self._active_hours is None:
+            return
+        self._awake_until = dt_util.now() + timedelta(seconds=ACTIVITY_WAKE_SECONDS)
+        if self.update_interval != self.scan_interval:
+            _LOGGER.debug("Activity outside of active hours; resuming normal polling")
+            self.update_interval = self.scan_interval
+            if self._listeners:
+                self._schedule_refresh()
+
+    async def async_get_history(
+        self,
+        start: datetime,
+        end: datetime,
+        workspace_id: int | None = None,
+        priority: Priority = Priority.BACKGROUND,
+        exact: bool = False,
+    ) -> list[TimeEntry]:
+        """Return the API key owner's time entries between `start` and `end`, oldest first.
+
+        Only the parts of the range that haven't been fetched recently cost a request. Unless `exact`,
+            gaps too short to be worth a request are skipped.
+        """
+        now = dt_util.utcnow()
+        # Nothing to fetch from the future
+        for gap_start, gap_end in self.history.missing(
+            start, min(end, now), now, exact
+        ):
+            await self._async_shared(
+                ("history", gap_start, gap_end),
+                partial(self._async_fetch_history, gap_start, gap_end, now, priority),
+            )
+        return self.history.entries(start, end, now, workspace_id)
+
+    async def _async_fetch_history(
+        self, start: datetime, end: datetime, now: datetime, priority: Priority
+    ) -> None:
+        """Fetch a range of time entries into the history."""
+        _LOGGER.debug("Fetching time entries from %s to %s", start, end)
+        entries = await self.async_submit(
+            priority, self.api.get_time_entries, start, end
+        )
+        self.history.add(start, end, entries, now)
+
+    async def async_get_account(self) -> Account:
+        """Return the account that owns the API key; fetched once as it's needed by every platform."""
+        if self._account is None:
+            self._account = await self.async_submit(
+                Priority.BACKGROUND, self.api.get_account_details
+            )
+        return self._account
+
+    async def async_get_workspaces(
+        self, max_age: timedelta | None = None
+    ) -> list[Workspace]:
         """Return Toggl Track workspaces.
 
         Will not be called as part of the regular coordinator update interval loop.
         That's OK, though.
         Workspaces really don't change much - especially the way they're being used in HA here.
         No sense in sending off a "what's $workspaces does $user have?" request every 30 seconds...
+        The options flow passes `max_age` so that workspaces created since setup show up.
         """
-        if self._workspaces is None:
-            self._workspaces = await self.api.get_workspaces()
+        now = dt_util.utcnow()
+        if self._workspaces is None or (
+            max_age is not None
+            and self._workspaces_fetched_at is not None
+            and now - self._workspaces_fetched_at > max_age
+        ):
+            self._workspaces = await self.async_submit(
+                Priority.BACKGROUND, self.api.get_workspaces
+            )
+            self._workspaces_fetched_at = now
         return self._workspaces
 
+    async def async_get_projects(
+        self, workspace_id: int, search: str, page: int
+    ) -> CatalogPage:
+        """Return a page of a workspace's projects for the options flow, from cache if possible."""
+        now = dt_util.utcnow()
+        if (cached := self.catalog.get(workspace_id, search, page, now)) is not None:
+            return cached
+        # Somebody is waiting on the form
+        catalog_page = await self.async_submit(
+            Priority.REFRESH,
+            async_fetch_projects,
+            self.api,
+            workspace_id,
+            search,
+            page,
+            CATALOG_PAGE_SIZE,
+        )
+        self.catalog.put(workspace_id, search, catalog_page, now)
+        return catalog_page
+
+    async def async_get_summary(
+        self,
+        workspace_id: int,
+        period: SummaryPeriod,
+        grouping: SummaryGrouping,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> SummaryReport:
+        """Return a summary report from cache, fetching it if needed."""
+        now = dt_util.now()
+        if (
+            report := self.summaries.get(workspace_id, period, grouping, now)
+        ) is not None:
+            return report
+        return await self._async_shared(
+            ("summary", workspace_id, period, grouping),
+            partial(
+                self._async_fetch_summary, workspace_id, period, grouping, now, priority
+            ),
+        )
+
+    async def _async_fetch_summary(
+        self,
+        workspace_id: int,
+        period: SummaryPeriod,
+        grouping: SummaryGrouping,
+        now: datetime,
+        priority: Priority,
+    ) -> SummaryReport:
+        """Fetch a summary report into the cache."""
+        report = await self.async_submit(
+            priority,
+            async_fetch_summary,
+            self.api,
+            workspace_id,
+            period,
+            grouping,
+            now,
+        )
+        self.summaries.put(report)
+        return report
+
+    async def async_refresh_summaries(self, _now: Any = None) -> None:
+        """Refresh the summaries shown by the summary sensors if they're stale.
+
+        Runs on a slow timer; most runs find everything still cached and make no requests.
+        """
+        fetched = False
+        for workspace_id in self.tracked_workspace_ids:
+            if self.summaries.get(
+                workspace_id,
+                SummaryPeriod.WEEK,
+                SummaryGrouping.PROJECTS,
+                dt_util.now(),
+            ):
+                continue
+            try:
+                await self.async_get_summary(
+                    workspace_id, SummaryPeriod.WEEK, SummaryGrouping.PROJECTS
+                )
+                fetched = True
+            # pylint: disable=broad-except
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.warning(
+                    "Unable to fetch summary for workspace %s: %s", workspace_id, err
+                )
+        if fetched:
+            self.async_update_listeners()
+
     async def async_shutdown(self) -> None:
         """Shutdown coordinator and any connection."""
+        # User asked for these so write them before the workers go away
+        if self._edits is not None:
+            await self._edits.async_flush_all()
+        # Stop workers first so nothing is mid-request when the session goes away
+        await self.dispatcher.async_stop()
         await self.api.close()
         await super().async_shutdown()
+
+
+def coordinator_for_workspace(
+    hass: HomeAssistant, workspace_id: int
+) -> TogglTrackCoordinator | None:
+    """Return the coordinator of whichever loaded config entry tracks `workspace_id`."""
+    coordinator: TogglTrackCoordinator
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        if workspace_id in coordinator.tracked_workspace_ids:
+            return coordinator
+    return None
@@ -0,0 +1,233 @@
+"""Prioritised async dispatcher for all Toggl Track API calls.
+
+Every request to the Toggl API goes through a single dispatcher per config entry.
+This keeps the number of in-flight requests bounded and makes sure that user initiated
+writes (start/stop/edit) never wait behind background reads like the regular poll.
+
+Writes get their own dedicated worker(s) so a slow read that is already in flight can't hold
+up a start/stop. Reads share the remaining workers and are serviced in priority order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+import itertools
+import logging
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Job priorities; lower value is serviced first."""
+
+    # Service calls that the user is waiting on
+    WRITE = 0
+    # Regular coordinator poll for the running time entry
+    REFRESH = 1
+    # Workspaces, tags, history ... etc. Nobody is waiting on these
+    BACKGROUND = 2
+
+
+@dataclass(order=True)
+class _Job:
+    """Single unit of work sitting in the queue.
+
+    Ordering is by priority and then by submission order so jobs of the same priority are FIFO.
+    """
+
+    priority: Priority
+    seq: int
+    name: str = field(compare=False)
+    func: Callable[..., Awaitable[Any]] = field(compare=False)
+    args: tuple = field(compare=False)
+    kwargs: dict[str, Any] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    submitted: float = field(compare=False, default_factory=time.monotonic)
+
+
+class DispatcherShutdownError(Exception):
+    """Raised when a job is submitted to, or still queued on, a stopped dispatcher."""
+
+
+class TogglTrackDispatcher:
+    """Bounded pool of workers pulling jobs from a priority queue."""
+
+    def __init__(self, name: str, max_concurrency: int, write_concurrency: int) -> None:
+        """Set up the queues; workers are not started until async_start()."""
+        self._name = name
+        self._max_concurrency = max_concurrency
+        self._write_concurrency = write_concurrency
+        # Reads (refresh/background) in priority order
+        self._queue: asyncio.PriorityQueue[_Job] = asyncio.PriorityQueue()
+        # Writes are FIFO but have their own workers
+        self._write_queue: asyncio.Queue[_Job] = asyncio.Queue()
+        self._seq = itertools.count()
+        self._workers: list[asyncio.Task] = []
+        self._running = False
+
+        # Basic counters for diagnostics
+        self._in_flight = 0
+        self._completed: dict[Priority, int] = {p: 0 for p in Priority}
+        self._failed: dict[Priority, int] = {p: 0 for p in Priority}
+        self._max_wait: dict[Priority, float] = {p: 0.0 for p in Priority}
+
+    @property
+    def running(self) -> bool:
+        """Indicate if the workers have been started and not yet stopped."""
+        return self._running
+
+    def async_start(self) -> None:
+        """Start the worker tasks."""
+        if self._running:
+            return
+        _LOGGER.debug(
+            "Starting dispatcher '%s' with %s read and %s write workers",
+            self._name,
+            self._max_concurrency,
+            self._write_concurrency,
+        )
+        self._running = True
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._worker(self._queue), name=f"{self._name}_read_{i}")
+            for i in range(self._max_concurrency)
+        ] + [
+            loop.create_task(
+                self._worker(self._write_queue), name=f"{self._name}_write_{i}"
+            )
+            for i in range(self._write_concurrency)
+        ]
+
+    async def async_stop(self) -> None:
+        """Cancel workers and fail anything still waiting in the queue."""
+        if not self._running:
+            return
+        _LOGGER.debug("Stopping dispatcher '%s'", self._name)
+        self._running = False
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Anybody still awaiting a queued job needs to be told it's not going to happen
+        for queue in (self._write_queue, self._queue):
+            while not queue.empty():
+                job = queue.get_nowait()
+                if not job.future.done():
+                    job.future.set_exception(
+                        DispatcherShutdownError(
+                            f"Dispatcher stopped before '{job.name}' ran"
+                        )
+                    )
+
+    async def async_submit(
+        self,
+        priority: Priority,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        name: str | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Queue `func(*args, **kwargs)` and wait for the result.
+
+        Exceptions raised by `func` are re-raised to the caller.
+        """
+        if not self._running:
+            raise DispatcherShutdownError(f"Dispatcher '{self._name}' is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(
+            priority=priority,
+            seq=next(self._seq),
+            name=name or getattr(func, "__name__", repr(func)),
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            future=future,
+        )
+        if priority is Priority.WRITE:
+            self._write_queue.put_nowait(job)
+        else:
+            self._queue.put_nowait(job)
+        return await future
+
+    def queue_depth(self) -> dict[str, int]:
+        """Return the number of queued jobs per priority."""
+        # Both queues keep their items in a plain list/deque under the hood; a linear scan
+        #   is fine given how small these queues are
+        # pylint: disable=protected-access
+        depth = {p.name.lower(): 0 for p in Priority}
+        for queue in (self._write_queue, self._queue):
+            for job in queue._queue:  # type: ignore[attr-defined]
+                depth[job.priority.name.lower()] += 1
+        return depth
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Snapshot of dispatcher state; used by diagnostics."""
+        return {
+            "running": self._running,
+            "max_concurrency": self._max_concurrency,
+            "write_concurrency": self._write_concurrency,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth(),
+            "completed": {p.name.lower(): v for p, v in self._completed.items()},
+            "failed": {p.name.lower(): v for p, v in self._failed.items()},
+            "max_wait_seconds": {
+                p.name.lower(): round(v, 3) for p, v in self._max_wait.items()
+            },
+        }
+
+    async def _worker(self, queue: asyncio.Queue[_Job]) -> None:
+        """Pull jobs off `queue` forever."""
+        while True:
+            job = await queue.get()
+            try:
+                # Caller may have given up (e.g. their service call was cancelled)
+                if job.future.done():
+                    continue
+
+                waited = time.monotonic() - job.submitted
+                self._max_wait[job.priority] = max(self._max_wait[job.priority], waited)
+                _LOGGER.debug(
+                    "Running job '%s' (priority: %s) after %.3fs in queue. Remaining: %s",
+                    job.name,
+                    job.priority.name,
+                    waited,
+                    self.queue_depth(),
+                )
+
+                self._in_flight += 1
+                try:
+                    result = await job.func(*job.args, **job.kwargs)
+                except asyncio.CancelledError:
+                    if not job.future.done():
+                        if self._running:
+                            job.future.cancel()
+                        else:
+                            # Entry is unloading; tell the caller why rather than just cancelling them
+                            job.future.set_exception(
+                                DispatcherShutdownError(
+                                    f"Dispatcher stopped while '{job.name}' was running"
+                                )
+                            )
+                    raise
+                # pylint: disable=broad-except
+                except Exception as err:  # noqa: BLE001
+                    self._failed[job.priority] += 1
+                    if not job.future.done():
+                        job.future.set_exception(err)
+                else:
+                    self._completed[job.priority] += 1
+                    if not job.future.done():
+                        job.future.set_result(result)
+                finally:
+                    self._in_flight -= 1
+            finally:
+                queue.task_done()
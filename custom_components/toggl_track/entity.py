@@ -0,0 +1,91 @@
+"""Base entity for everything that belongs to a single Toggl Track workspace."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, SIGNAL_OPTIONS_UPDATED
+from .coordinator import TogglTrackCoordinator
+
+
+class TogglTrackWorkspaceEntity(CoordinatorEntity[TogglTrackCoordinator]):
+    """Groups a workspace's entities under one device and tells the coordinator which workspace each belongs to.
+
+    Services use that to go from a targeted entity, device or area to a workspace without reading state.
+    """
+
+    def __init__(
+        self,
+        coordinator: TogglTrackCoordinator,
+        config_entry_id: str,
+        workspace_id: int,
+        workspace_name: str,
+    ) -> None:
+        """Pass coordinator to CoordinatorEntity and set up the workspace device."""
+        super().__init__(coordinator=coordinator)
+        self._workspace_id = workspace_id
+        self._workspace_name = workspace_name
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{config_entry_id}_{workspace_id}")},
+            name=workspace_name,
+            manufacturer="Toggl",
+            model="Workspace",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Register with the coordinator once the unique ID is in the entity registry."""
+        await super().async_added_to_hass()
+        if self.unique_id is not None:
+            self.async_on_remove(
+                self.coordinator.async_register_workspace_entity(
+                    self.unique_id, self._workspace_id
+                )
+            )
+
+
+@callback
+def async_sync_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    build: Callable[[], Iterable[Entity]],
+) -> None:
+    """Add whatever `build` returns now, and again every time the options change.
+
+    Entities are matched on unique ID; new ones are added and ones that `build` no longer returns are
+        removed, registry entry and all. Nothing else is touched so there's no reload and no gap in state.
+    """
+    current: dict[str, Entity] = {}
+
+    @callback
+    def _async_sync() -> None:
+        wanted = {entity.unique_id: entity for entity in build()}
+        registry = er.async_get(hass)
+        for unique_id in set(current) - set(wanted):
+            entity = current.pop(unique_id)
+            if entity.registry_entry is not None:
+                # Registry removal takes the entity out of the state machine as well
+                registry.async_remove(entity.entity_id)
+            else:
+                hass.async_create_task(entity.async_remove())
+        added = [e for unique_id, e in wanted.items() if unique_id not in current]
+        current.update({e.unique_id: e for e in added})
+        if added:
+            async_add_entities(added)
+
+    _async_sync()
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(config_entry.entry_id), _async_sync
+        )
+    )
@@ -0,0 +1,246 @@
+"""Past time entries fetched from the Track API.
+
+Statistics (and anything else that needs completed entries) ask for a time range; only the parts of that
+range that haven't been fetched recently cost a request. Entries created/stopped/edited from HA are
+folded in directly so the cache doesn't need to be refetched after every service call.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta
+
+from lib_toggl.time_entries import TimeEntry
+
+_HOUR = timedelta(hours=1)
+
+
+def floor_hour(dt: datetime) -> datetime:
+    """Return the start of the hour that `dt` falls in."""
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def entry_span(te: TimeEntry, now: datetime) -> tuple[datetime, datetime]:
+    """Return start and end of an entry; running entries end `now`."""
+    if te.stop is not None:
+        return te.start, te.stop
+    if te.duration is not None and te.duration >= 0:
+        return te.start, te.start + timedelta(seconds=te.duration)
+    return te.start, max(te.start, now)
+
+
+def split_by_hour(
+    entries: Iterable[TimeEntry],
+    start: datetime,
+    end: datetime,
+    keys: Callable[[TimeEntry], Iterable[str]],
+) -> dict[str, dict[datetime, float]]:
+    """Return seconds tracked per key per hour between `start` and `end`.
+
+    Each entry counts towards every key that `keys` returns for it. Running entries are ignored; they're
+        counted once they stop. Hours with nothing tracked are left out.
+    """
+    totals: dict[str, dict[datetime, float]] = {}
+    for te in entries:
+        if te.start is None or (
+            te.stop is None and (te.duration is None or te.duration < 0)
+        ):
+            continue
+        te_start, te_end = entry_span(te, end)
+        te_start, te_end = max(te_start, start), min(te_end, end)
+        if te_start >= te_end:
+            continue
+        entry_keys = list(keys(te))
+        hour = floor_hour(te_start)
+        while hour < te_end:
+            seconds = (min(hour + _HOUR, te_end) - max(hour, te_start)).total_seconds()
+            for key in entry_keys:
+                per_hour = totals.setdefault(key, {})
+                per_hour[hour] = per_hour.get(hour, 0.0) + seconds
+            hour += _HOUR
+    return totals
+
+
+class IntervalIndex:
+    """Time entries sorted by start so that overlap queries don't have to look at every entry.
+
+    Anything overlapping a range has to start before the range ends and no earlier than the range start
+        minus the longest entry in the index; that's a single bisect and a short scan.
+    Running entries have no end yet and are kept to one side; there are only ever a handful of them.
+    """
+
+    def __init__(self, entries: Iterable[TimeEntry]) -> None:
+        """Build the index; entries without a start are ignored."""
+        completed: list[tuple[datetime, datetime, TimeEntry]] = []
+        self._running: list[TimeEntry] = []
+        self._longest = timedelta(0)
+        for te in entries:
+            if te.start is None:
+                continue
+            if te.stop is None and (te.duration is None or te.duration < 0):
+                self._running.append(te)
+                continue
+            te_start, te_end = entry_span(te, te.start)
+            self._longest = max(self._longest, te_end - te_start)
+            completed.append((te_start, te_end, te))
+        completed.sort(key=lambda c: c[0])
+        self._starts = [c[0] for c in completed]
+        self._completed = completed
+
+    def __len__(self) -> int:
+        """Return the number of entries in the index."""
+        return len(self._completed) + len(self._running)
+
+    def overlapping(
+        self, start: datetime, end: datetime, now: datetime
+    ) -> list[TimeEntry]:
+        """Return entries that overlap `start` to `end`, oldest first."""
+        found = []
+        for i in range(
+            bisect_left(self._starts, start - self._longest), len(self._starts)
+        ):
+            te_start, te_end, te = self._completed[i]
+            if te_start >= end:
+                break
+            if te_end > start:
+                found.append(te)
+        for te in self._running:
+            te_start, te_end = entry_span(te, now)
+            if te_start < end and te_end > start:
+                found.append(te)
+        return sorted(found, key=lambda te: te.start)
+
+
+class TimeEntryHistory:
+    """Time entries keyed by ID plus a record of which time ranges have been fetched and when."""
+
+    def __init__(self, max_age: timedelta, min_gap: timedelta) -> None:
+        """Ranges fetched more than `max_age` ago are fetched again; that's how edits made outside of HA show up.
+
+        Gaps shorter than `min_gap` aren't worth a request. Mostly this is the sliver between the last fetch
+            and now; the poll and service calls keep that part current.
+        """
+        self._max_age = max_age
+        self._min_gap = min_gap
+        self._entries: dict[int, TimeEntry] = {}
+        # (start, end, fetched_at); may overlap
+        self._covered: list[tuple[datetime, datetime, datetime]] = []
+        # Per workspace; rebuilt on the first query after anything changes.
+        # Calendar cards ask for the same range over and over, entries change far less often.
+        self._index: dict[int, IntervalIndex] | None = None
+        # Bumped whenever the entries change; for anything else that keeps a view of them
+        self.generation = 0
+
+    def missing(
+        self, start: datetime, end: datetime, now: datetime, exact: bool = False
+    ) -> list[tuple[datetime, datetime]]:
+        """Return the parts of `start` to `end` that need to be fetched.
+
+        Gaps shorter than the minimum are skipped unless `exact`; for callers that can't go back and fix
+            things up later.
+        """
+        fresh = sorted(
+            (s, e)
+            for s, e, fetched_at in self._covered
+            if now - fetched_at <= self._max_age
+        )
+        gaps = []
+        cursor = start
+        for s, e in fresh:
+            if e <= cursor:
+                continue
+            if s >= end:
+                break
+            if s > cursor:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return [(s, e) for s, e in gaps if exact or e - s >= self._min_gap]
+
+    def add(
+        self,
+        start: datetime,
+        end: datetime,
+        entries: Iterable[TimeEntry],
+        now: datetime,
+    ) -> None:
+        """Store the result of fetching `start` to `end`.
+
+        Anything previously known to be entirely within the range but not in `entries` was deleted.
+        """
+        self._entries = {
+            te_id: te
+            for te_id, te in self._entries.items()
+            if te.start is None
+            or not (start <= te.start and entry_span(te, now)[1] <= end)
+        }
+        for te in entries:
+            self._entries[te.id] = te
+        self._index = None
+        self.generation += 1
+        self.confirm(start, end, now)
+
+    def confirm(self, start: datetime, end: datetime, now: datetime) -> None:
+        """Record that what's known about `start` to `end` is current as of `now`."""
+        # Ranges this one covers entirely are superseded; stale ones are kept so fetched() still knows about them
+        self._covered = [
+            c for c in self._covered if not (start <= c[0] and c[1] <= end)
+        ] + [(start, end, now)]
+
+    def fetched(self, start: datetime, end: datetime) -> bool:
+        """True if all of `start` to `end` has been fetched at some point, however long ago."""
+        cursor = start
+        for s, e, _ in sorted(self._covered):
+            if s > cursor:
+                break
+            cursor = max(cursor, e)
+            if cursor >= end:
+                return True
+        return cursor >= end
+
+    def upsert(self, te: TimeEntry) -> None:
+        """Fold in an entry that was just created/stopped/edited."""
+        self._entries[te.id] = te
+        self._index = None
+        self.generation += 1
+
+    def invalidate(self, since: datetime) -> None:
+        """Forget that anything from `since` onwards has been fetched."""
+        self._covered = [
+            (s, min(e, since), fetched_at)
+            for s, e, fetched_at in self._covered
+            if s < since
+        ]
+
+    def entries(
+        self,
+        start: datetime,
+        end: datetime,
+        now: datetime,
+        workspace_id: int | None = None,
+    ) -> list[TimeEntry]:
+        """Return known entries that overlap `start` to `end`, oldest first."""
+        if self._index is None:
+            by_workspace: dict[int, list[TimeEntry]] = {}
+            for te in self._entries.values():
+                by_workspace.setdefault(te.workspace_id, []).append(te)
+            self._index = {w: IntervalIndex(e) for w, e in by_workspace.items()}
+
+        if workspace_id is not None:
+            if (index := self._index.get(workspace_id)) is None:
+                return []
+            return index.overlapping(start, end, now)
+        return sorted(
+            (
+                te
+                for index in self._index.values()
+                for te in index.overlapping(start, end, now)
+            ),
+            key=lambda te: te.start,
+        )
+
+    def __iter__(self) -> Iterator[TimeEntry]:
+        """Iterate over every known entry, in no particular order."""
+        return iter(self._entries.values())
@@ -0,0 +1,236 @@
+"""Timed spans of coordinator cycles and service calls, captured on demand.
+
+When a poll or a service call gets slow it's not obvious whether the time goes on schema validation, working
+out which workspace a target is, building the TimeEntry, waiting on the API or updating entities. While a
+profile is running, each of those is timed as a named span; the rest of the time `span()` costs one
+attribute check. Optionally cProfile runs alongside for a function level view of the event loop thread.
+
+Spans are wall clock; an async span (API calls mostly) includes whatever else the event loop did while it
+was waiting, which is usually what you want to know about anyway.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Iterator
+from contextlib import contextmanager
+import cProfile
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import logging
+import pstats
+from time import perf_counter
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Span names; API calls are SPAN_API + the name of the function making the request
+SPAN_POLL = "poll"
+SPAN_FAN_OUT = "poll.fan_out"
+SPAN_API = "api."
+SPAN_SERVICE = "service."
+SPAN_VALIDATE = ".validate"
+SPAN_RESOLVE_TARGETS = "service.resolve_targets"
+SPAN_BUILD_TIME_ENTRY = "service.build_time_entry"
+SPAN_SENSOR_UPDATE = "sensor.update_state"
+
+
+class ProfileInProgressError(Exception):
+    """Only one profile can run at a time."""
+
+
+@dataclass
+class SpanStats:
+    """How many times a span was seen and how long it took, in seconds."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Count one more."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Milliseconds; easier to read than seconds for most of these."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class ProfileSession:
+    """One profile; runs until `cycles` polls and `service_calls` service calls have been seen."""
+
+    def __init__(self, cycles: int, service_calls: int, cprofile: bool) -> None:
+        """Nothing is recorded until the profiler starts the session."""
+        self.cycles_wanted = cycles
+        self.service_calls_wanted = service_calls
+        self.cycles = 0
+        self.service_calls = 0
+        self.spans: dict[str, SpanStats] = {}
+        self.started: datetime | None = None
+        self.finished: datetime | None = None
+        self.done = asyncio.Event()
+        self.profile = cProfile.Profile() if cprofile else None
+
+    @property
+    def complete(self) -> bool:
+        """True if everything that was asked for has been seen."""
+        return (
+            self.cycles >= self.cycles_wanted
+            and self.service_calls >= self.service_calls_wanted
+        )
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one span."""
+        self.spans.setdefault(name, SpanStats()).add(seconds)
+
+    def summary(self) -> dict[str, Any]:
+        """Counts and spans, slowest total first."""
+        return {
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+            "complete": self.complete,
+            "cycles": self.cycles,
+            "service_calls": self.service_calls,
+            "spans": {
+                name: stats.as_dict()
+                for name, stats in sorted(
+                    self.spans.items(), key=lambda kv: kv[1].total, reverse=True
+                )
+            },
+        }
+
+
+class Profiler:
+    """Records spans into the running session, if there is one."""
+
+    def __init__(self) -> None:
+        """Idle until `start()`."""
+        self.session: ProfileSession | None = None
+
+    def start(self, session: ProfileSession) -> None:
+        """Start recording into `session`."""
+        if self.session is not None:
+            raise ProfileInProgressError("A profile is already running")
+        if session.profile is not None:
+            # Python 3.12+ refuses if another profiler (HA's own profiler integration ...etc) is active
+            session.profile.enable()
+        session.started = dt_util.utcnow()
+        self.session = session
+
+    def stop(self) -> ProfileSession | None:
+        """Stop recording; returns whatever session was running."""
+        if (session := self.session) is None:
+            return None
+        self.session = None
+        if session.profile is not None:
+            session.profile.disable()
+        session.finished = dt_util.utcnow()
+        session.done.set()
+        _LOGGER.debug(
+            "Profile stopped after %s cycles and %s service calls",
+            session.cycles,
+            session.service_calls,
+        )
+        return session
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the body of the `with` block if a profile is running."""
+        if (session := self.session) is None:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            session.record(name, perf_counter() - start)
+
+    def cycle_done(self) -> None:
+        """Called at the end of every poll."""
+        if (session := self.session) is None:
+            return
+        session.cycles += 1
+        self._stop_if_complete(session)
+
+    def _stop_if_complete(self, session: ProfileSession) -> None:
+        if not session.complete:
+            return
+        # The poll's fan out to entities happens right after it returns; let that be recorded first
+        asyncio.get_running_loop().call_soon(self._stop_session, session)
+
+    def _stop_session(self, session: ProfileSession) -> None:
+        # Could have been stopped (and another started) in the meantime
+        if self.session is session:
+            self.stop()
+
+    def timed(self, name: str, func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """Wrap a service schema so that validation is a span of its own."""
+
+        def _timed(value: Any) -> Any:
+            with self.span(name):
+                return func(value)
+
+        return _timed
+
+    def wrap_service(
+        self, name: str, handler: Callable[[Any], Coroutine[Any, Any, Any]]
+    ) -> Callable[[Any], Coroutine[Any, Any, Any]]:
+        """Time a service handler and count the call towards the running session."""
+
+        async def _handler(call: Any) -> Any:
+            session = self.session
+            try:
+                with self.span(f"{SPAN_SERVICE}{name}"):
+                    return await handler(call)
+            finally:
+                if session is not None and self.session is session:
+                    session.service_calls += 1
+                    self._stop_if_complete(session)
+
+        return _handler
+
+
+def top_functions(profile: cProfile.Profile, limit: int) -> list[dict[str, Any]]:
+    """The `limit` functions with the most cumulative time. Does real work; run it in the executor."""
+    stats = pstats.Stats(profile)
+    rows = sorted(
+        stats.stats.items(),  # type: ignore[attr-defined]
+        key=lambda kv: kv[1][3],
+        reverse=True,
+    )[:limit]
+    return [
+        {
+            "function": f"{filename}:{line}({func})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in rows
+    ]
+
+
+def write_report(
+    path: str, summary: dict[str, Any], profile: cProfile.Profile | None
+) -> dict[str, Any]:
+    """Write the cProfile stats, if any, and then the summary as JSON to `path`. Blocking.
+
+    Stats go next to the report as .prof; they open with `python -m pstats` or snakeviz.
+    Returns the summary as written.
+    """
+    summary = {**summary, "report": path, "cprofile": None}
+    if profile is not None:
+        summary["cprofile"] = f"{path.removesuffix('.json')}.prof"
+        pstats.Stats(profile).dump_stats(summary["cprofile"])
+    with open(path, "w", encoding="utf-8") as report:
+        json.dump(summary, report, indent=2)
+    return summary
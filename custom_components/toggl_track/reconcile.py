@@ -0,0 +1,215 @@
+"""Find edits and deletions made outside of HA without refetching every time entry.
+
+The history cache only refetches a range once it is older than HISTORY_MAX_AGE_SECONDS, and then the whole
+range. Instead, for each recent completed day, seconds tracked per project are compared with what the
+Reports API says for that day; one request covers a week of one workspace. Only days that don't match are
+fetched again, and every entry that turns out to have been created, changed or deleted fires an event.
+
+Days are in HA's time zone; the Reports API uses the time zone set in the Toggl profile. If those differ,
+days near midnight will look different every time and be refetched more often than they need to be.
+Changes that don't move time between projects (description, tags ... etc) can't be seen this way; those
+still show up when the range expires.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import date, datetime, time, timedelta
+import logging
+from typing import Any
+
+from lib_toggl.time_entries import TimeEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_DESCRIPTION,
+    ATTR_TIME_ENTRY_ID,
+    ATTR_WORKSPACE_ID,
+    EVENT_TIME_ENTRY_CHANGED,
+    RECONCILE_DAYS,
+    RECONCILE_MAX_REQUESTS,
+)
+from .coordinator import TogglTrackCoordinator
+from .dispatcher import Priority
+from .history import entry_span
+from .reports import async_fetch_daily_totals
+
+_LOGGER = logging.getLogger(__name__)
+
+_DAY = timedelta(days=1)
+# Reports API won't do more than a week per request
+_WEEK = 7
+
+CHANGE_CREATED = "created"
+CHANGE_UPDATED = "updated"
+CHANGE_DELETED = "deleted"
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """Return the start and end of a local day, in UTC."""
+    start = datetime.combine(day, time(), dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_utc(start), dt_util.as_utc(start + _DAY)
+
+
+def daily_totals(entries: list[TimeEntry], day: date) -> dict[str, int]:
+    """Seconds per project of the completed entries that started on `day`, keyed like the Reports API.
+
+    Reports count the whole of an entry towards the day it started on, so this does too.
+    """
+    start, end = day_bounds(day)
+    totals: dict[str, int] = {}
+    for te in entries:
+        if te.start is None or not start <= te.start < end:
+            continue
+        if te.stop is None and (te.duration is None or te.duration < 0):
+            continue
+        te_start, te_end = entry_span(te, end)
+        project = str(te.project_id).lower()
+        totals[project] = totals.get(project, 0) + round(
+            (te_end - te_start).total_seconds()
+        )
+    return {k: v for k, v in totals.items() if v}
+
+
+def diff_entries(
+    before: dict[int, TimeEntry], after: dict[int, TimeEntry]
+) -> list[tuple[str, TimeEntry]]:
+    """Return what changed between two snapshots of the same range, keyed by time entry ID."""
+    changes = [
+        (CHANGE_DELETED, te) for te_id, te in before.items() if te_id not in after
+    ]
+    for te_id, te in after.items():
+        if te_id not in before:
+            changes.append((CHANGE_CREATED, te))
+        # Pydantic 1.x uses .dict() instead of model_dump()
+        elif before[te_id].dict() != te.dict():
+            changes.append((CHANGE_UPDATED, te))
+    return changes
+
+
+class Reconciler:
+    """Compare recent days with the Reports API and refetch the ones that differ.
+
+    Work is queued a week at a time, most recent first. A run stops once it has used up its request
+        budget and the next run carries on from there. A new round is queued once the last one is done.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: TogglTrackCoordinator) -> None:
+        """Nothing is queued until the first run."""
+        self.hass = hass
+        self.coordinator = coordinator
+        # (first day, day after the last)
+        self._queue: deque[tuple[date, date]] = deque()
+
+    def _queue_round(self, today: date) -> None:
+        """Queue the last RECONCILE_DAYS days, not counting today, a week at a time."""
+        first = today - timedelta(days=RECONCILE_DAYS)
+        week_end = today
+        while week_end > first:
+            week_start = max(week_end - timedelta(days=_WEEK), first)
+            self._queue.append((week_start, week_end))
+            week_end = week_start
+
+    async def async_run(self, _now: Any = None) -> None:
+        """Work through the queue until it's empty or the request budget is used up."""
+        if not self._queue:
+            self._queue_round(dt_util.now().date())
+        budget = RECONCILE_MAX_REQUESTS
+        while self._queue and budget > 0:
+            week_start, week_end = self._queue[0]
+            try:
+                budget -= await self._async_reconcile_week(week_start, week_end)
+            # pylint: disable=broad-except
+            except Exception as err:  # noqa: BLE001
+                # Try again next run; if the API is down there's no point going on now
+                _LOGGER.warning("Unable to reconcile from %s: %s", week_start, err)
+                return
+            self._queue.popleft()
+
+    async def _async_reconcile_week(self, week_start: date, week_end: date) -> int:
+        """Reconcile the days of one week that have been fetched before.
+
+        Costs one request per tracked workspace, plus one if anything differs. Returns the number of requests made.
+        """
+        history = self.coordinator.history
+        days = [
+            day
+            for day in (
+                week_start + timedelta(days=i)
+                for i in range((week_end - week_start).days)
+            )
+            if history.fetched(*day_bounds(day))
+        ]
+        # Nobody has asked for these days so nothing to keep up to date
+        if not days:
+            return 0
+
+        account = await self.coordinator.async_get_account()
+        requests = 0
+        changed: set[date] = set()
+        for workspace_id in self.coordinator.tracked_workspace_ids:
+            remote = await self.coordinator.async_submit(
+                Priority.BACKGROUND,
+                async_fetch_daily_totals,
+                self.coordinator.api,
+                workspace_id,
+                account.id,
+                days[0],
+                (days[-1] - days[0]).days + 1,
+            )
+            requests += 1
+            now = dt_util.utcnow()
+            for day in days:
+                local = daily_totals(
+                    history.entries(*day_bounds(day), now, workspace_id), day
+                )
+                if local != remote.get(day, {}):
+                    changed.add(day)
+
+        now = dt_util.utcnow()
+        # History isn't split by workspace so a day is only known good if every workspace agrees
+        for day in days:
+            if day not in changed:
+                history.confirm(*day_bounds(day), now)
+        if not changed:
+            return requests
+
+        # One request for the whole span is cheaper than one per day; days in between are fetched again too
+        start, end = day_bounds(min(changed))[0], day_bounds(max(changed))[1]
+        _LOGGER.debug(
+            "Time entries differ from the Reports API on %s; fetching again",
+            ", ".join(str(day) for day in sorted(changed)),
+        )
+        before = self._snapshot(start, end, now)
+        entries = await self.coordinator.async_submit(
+            Priority.BACKGROUND, self.coordinator.api.get_time_entries, start, end
+        )
+        now = dt_util.utcnow()
+        history.add(start, end, entries, now)
+        changes = diff_entries(before, self._snapshot(start, end, now))
+        for change, te in changes:
+            self.hass.bus.async_fire(
+                EVENT_TIME_ENTRY_CHANGED,
+                {
+                    ATTR_WORKSPACE_ID: te.workspace_id,
+                    ATTR_TIME_ENTRY_ID: te.id,
+                    ATTR_DESCRIPTION: te.description,
+                    "change": change,
+                },
+            )
+        if changes:
+            self.coordinator.summaries.invalidate()
+            self.coordinator.async_update_listeners()
+        return requests + 1
+
+    def _snapshot(
+        self, start: datetime, end: datetime, now: datetime
+    ) -> dict[int, TimeEntry]:
+        """Known entries that started between `start` and `end`, every workspace."""
+        return {
+            te.id: te
+            for te in self.coordinator.history.entries(start, end, now)
+            if start <= te.start < end
+        }
@@ -0,0 +1,255 @@
+"""Server-side aggregated totals from the Toggl Reports API.
+
+lib-toggl only covers the Track API so the handful of Reports API calls that we need live here.
+Summary reports do the aggregation server side; one request per workspace per period is enough
+to get totals per project/client/user/tag without pulling every time entry.
+See: https://engineering.toggl.com/docs/reports/summary_reports
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from enum import StrEnum
+import json
+import logging
+from typing import Any
+
+from lib_toggl.client import Toggl
+
+_LOGGER = logging.getLogger(__name__)
+
+REPORTS_BASE = "https://api.track.toggl.com/reports/api/v3"
+
+
+# pylint: disable=invalid-name
+def SUMMARY_ENDPOINT(workspace_id: int) -> str:
+    """Return the summary report endpoint for a workspace."""
+    return f"{REPORTS_BASE}/workspace/{workspace_id}/summary/time_entries"
+
+
+# pylint: disable=invalid-name
+def WEEKLY_ENDPOINT(workspace_id: int) -> str:
+    """Return the weekly report endpoint for a workspace."""
+    return f"{REPORTS_BASE}/workspace/{workspace_id}/weekly/time_entries"
+
+
+class SummaryPeriod(StrEnum):
+    """Calendar periods that a summary can cover."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class SummaryGrouping(StrEnum):
+    """What a summary is totalled by; the summary endpoint only has tags as a sub grouping."""
+
+    PROJECTS = "projects"
+    CLIENTS = "clients"
+    USERS = "users"
+    TAGS = "tags"
+
+
+def period_bounds(period: SummaryPeriod, now: datetime) -> tuple[date, date]:
+    """Return the first and last (inclusive) day of the period that `now` falls in.
+
+    Weeks start on Monday.
+    """
+    today = now.date()
+    if period is SummaryPeriod.DAY:
+        return today, today
+    if period is SummaryPeriod.WEEK:
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    start = today.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+@dataclass
+class GroupTotal:
+    """Tracked time for one group (project, client ... etc) in a summary."""
+
+    seconds: int = 0
+    billable_seconds: int = 0
+
+
+@dataclass
+class SummaryReport:
+    """Totals for one workspace, period and grouping."""
+
+    workspace_id: int
+    period: SummaryPeriod
+    grouping: SummaryGrouping
+    start: date
+    end: date
+    # Keyed by the group ID as a string; Toggl uses null for "no project" ... etc which becomes "none"
+    groups: dict[str, GroupTotal] = field(default_factory=dict)
+    fetched_at: datetime | None = None
+    # Cached until the period rolls over or a local write invalidates it
+    expires_at: datetime | None = None
+
+    @property
+    def total_seconds(self) -> int:
+        """Tracked seconds across all groups."""
+        return sum(g.seconds for g in self.groups.values())
+
+    @property
+    def billable_seconds(self) -> int:
+        """Billable seconds across all groups."""
+        return sum(g.billable_seconds for g in self.groups.values())
+
+    def is_fresh(self, now: datetime) -> bool:
+        """Indicate if the report can still be served from cache."""
+        return self.expires_at is not None and now < self.expires_at
+
+    def as_dict(self) -> dict[str, Any]:
+        """Render for service call responses."""
+        return {
+            "workspace_id": self.workspace_id,
+            "period": str(self.period),
+            "grouping": str(self.grouping),
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "total_seconds": self.total_seconds,
+            "billable_seconds": self.billable_seconds,
+            "groups": {
+                k: {"seconds": v.seconds, "billable_seconds": v.billable_seconds}
+                for k, v in self.groups.items()
+            },
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+        }
+
+
+def _parse_summary(
+    payload: dict[str, Any], by_sub_group: bool = False
+) -> dict[str, GroupTotal]:
+    """Sum up the sub groups of each group in a summary response.
+
+    With `by_sub_group`, sub groups with the same ID are summed across groups instead.
+    """
+    groups: dict[str, GroupTotal] = {}
+    for group in payload.get("groups") or []:
+        if not by_sub_group:
+            total = groups.setdefault(str(group.get("id")).lower(), GroupTotal())
+        for sub_group in group.get("sub_groups") or []:
+            if by_sub_group:
+                total = groups.setdefault(
+                    str(sub_group.get("id")).lower(), GroupTotal()
+                )
+            total.seconds += sub_group.get("seconds") or 0
+            for rate in sub_group.get("rates") or []:
+                total.billable_seconds += rate.get("billable_seconds") or 0
+    return groups
+
+
+async def async_fetch_summary(
+    api: Toggl,
+    workspace_id: int,
+    period: SummaryPeriod,
+    grouping: SummaryGrouping,
+    now: datetime,
+) -> SummaryReport:
+    """Fetch a single summary report. Expiry is set to the end of the period."""
+    start, end = period_bounds(period, now)
+    body = {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "grouping": str(grouping),
+        "sub_grouping": "time_entries",
+    }
+    if grouping is SummaryGrouping.TAGS:
+        # Tags per project, added up across projects. An entry counts once for each of its tags
+        body["grouping"] = str(SummaryGrouping.PROJECTS)
+        body["sub_grouping"] = str(SummaryGrouping.TAGS)
+    _LOGGER.debug("Fetching %s summary for workspace %s", period, workspace_id)
+    payload = await api.do_post_request(
+        SUMMARY_ENDPOINT(workspace_id), data_as_json_str=json.dumps(body)
+    )
+    return SummaryReport(
+        workspace_id=workspace_id,
+        period=period,
+        grouping=grouping,
+        start=start,
+        end=end,
+        groups=_parse_summary(payload or {}, grouping is SummaryGrouping.TAGS),
+        fetched_at=now,
+        expires_at=datetime.combine(end + timedelta(days=1), time(), now.tzinfo),
+    )
+
+
+async def async_fetch_daily_totals(
+    api: Toggl, workspace_id: int, user_id: int, start: date, days: int = 7
+) -> dict[date, dict[str, int]]:
+    """Fetch seconds tracked per project per day for one user, `days` (at most 7) days from `start`.
+
+    Project IDs are keyed the same way as summary groups. Days with nothing tracked map to an empty dict.
+    See: https://engineering.toggl.com/docs/reports/weekly_reports
+    """
+    end = start + timedelta(days=days - 1)
+    body = {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "user_ids": [user_id],
+    }
+    _LOGGER.debug(
+        "Fetching daily totals for workspace %s from %s to %s", workspace_id, start, end
+    )
+    payload = await api.do_post_request(
+        WEEKLY_ENDPOINT(workspace_id), data_as_json_str=json.dumps(body)
+    )
+    totals: dict[date, dict[str, int]] = {
+        start + timedelta(days=i): {} for i in range(days)
+    }
+    # One row per user/project; `seconds` has one value per day, starting at start_date
+    for row in payload or []:
+        project = str(row.get("project_id")).lower()
+        for day, seconds in zip(totals, row.get("seconds") or [], strict=False):
+            if seconds:
+                totals[day][project] = totals[day].get(project, 0) + seconds
+    return totals
+
+
+class SummaryCache:
+    """Summary reports keyed by workspace, period and grouping."""
+
+    def __init__(self, max_age: timedelta) -> None:
+        """Reports older than `max_age` are refetched even if the period hasn't rolled over.
+
+        This is how edits made outside of HA eventually show up.
+        """
+        self._max_age = max_age
+        self._reports: dict[
+            tuple[int, SummaryPeriod, SummaryGrouping], SummaryReport
+        ] = {}
+
+    def get(
+        self,
+        workspace_id: int,
+        period: SummaryPeriod,
+        grouping: SummaryGrouping,
+        now: datetime,
+    ) -> SummaryReport | None:
+        """Return the cached report if it's still fresh."""
+        report = self.peek(workspace_id, period, grouping)
+        if report is None or not report.is_fresh(now):
+            return None
+        if report.fetched_at is not None and now - report.fetched_at > self._max_age:
+            return None
+        return report
+
+    def peek(
+        self, workspace_id: int, period: SummaryPeriod, grouping: SummaryGrouping
+    ) -> SummaryReport | None:
+        """Return the cached report even if it is stale; entities use this so they don't go blank."""
+        return self._reports.get((workspace_id, period, grouping))
+
+    def put(self, report: SummaryReport) -> None:
+        """Cache a report."""
+        self._reports[(report.workspace_id, report.period, report.grouping)] = report
+
+    def invalidate(self) -> None:
+        """Mark every cached report as stale. Called after any local write."""
+        for report in self._reports.values():
+            report.expires_at = None
@@ -0,0 +1,189 @@
+"""Deadlines, retries and hedging for individual Toggl Track API requests.
+
+Toggl's API is usually quick but has a long tail; one slow request used to cost a whole poll cycle.
+Every request now gets its own deadline. Idempotent reads are retried with jittered backoff when the
+failure looks transient and can optionally be hedged: if the first attempt is still outstanding after
+the observed p95 latency for that operation, a second identical request is sent and whichever answers
+first wins.
+See: https://research.google/pubs/the-tail-at-scale/
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from http import HTTPStatus
+import logging
+import random
+from typing import Any, TypeVar
+
+from aiohttp.client_exceptions import ClientConnectionError, ClientResponseError
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Gateway style errors are usually gone on the next attempt. 429 is deliberately not here; the circuit
+#   breaker deals with that one as Toggl tells us how long to back off for.
+RETRYABLE_STATUSES = {
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """How long a request may take in total and what may be done to get an answer within that time."""
+
+    # Seconds, across every attempt and backoff
+    deadline: float
+    attempts: int = 1
+    hedge: bool = False
+    backoff: float = 0.5
+    max_backoff: float = 4.0
+
+
+def is_retryable(err: BaseException) -> bool:
+    """Indicate if an error is likely to go away if the request is simply made again."""
+    if isinstance(err, ClientResponseError):
+        return err.status in RETRYABLE_STATUSES
+    return isinstance(err, (ClientConnectionError, TimeoutError))
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full jitter exponential backoff; `attempt` counts from 0."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies per operation."""
+
+    def __init__(self, window: int, min_samples: int) -> None:
+        """Percentiles are only reported once there are `min_samples` in the window."""
+        self._window = window
+        self._min_samples = min_samples
+        self._samples: dict[str, deque[float]] = {}
+
+    def observe(self, op: str, seconds: float) -> None:
+        """Record how long a successful request took."""
+        self._samples.setdefault(op, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, op: str, pct: float) -> float | None:
+        """Return the nearest rank percentile for an operation, if there is enough data."""
+        samples = self._samples.get(op)
+        if samples is None or len(samples) < self._min_samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(round(pct / 100 * len(ordered)) - 1, 0)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Snapshot of latency percentiles; used by diagnostics."""
+        return {
+            op: {
+                "samples": len(samples),
+                "p50": self.percentile(op, 50),
+                "p95": self.percentile(op, 95),
+            }
+            for op, samples in self._samples.items()
+        }
+
+
+async def _async_timed(
+    op: str, call: Callable[[], Awaitable[_T]], latency: LatencyTracker
+) -> _T:
+    """Make the request and record how long it took if it worked."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    result = await call()
+    latency.observe(op, loop.time() - started)
+    return result
+
+
+async def _async_hedged(
+    op: str,
+    call: Callable[[], Awaitable[_T]],
+    latency: LatencyTracker,
+    hedge_after: float | None,
+) -> _T:
+    """Make the request; if it's still outstanding after `hedge_after` seconds make it again.
+
+    First successful answer wins and the other request is cancelled.
+    """
+    if hedge_after is None:
+        return await _async_timed(op, call, latency)
+
+    pending = {asyncio.ensure_future(_async_timed(op, call, latency))}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_after)
+        if not done:
+            _LOGGER.debug(
+                "'%s' slower than %.3fs; sending hedged request", op, hedge_after
+            )
+            pending.add(asyncio.ensure_future(_async_timed(op, call, latency)))
+
+        while True:
+            for task in done:
+                if (error := task.exception()) is None:
+                    return task.result()
+                if not pending:
+                    # Every request made failed
+                    raise error
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+    finally:
+        # Loser (or both, if we're being cancelled) shouldn't be left running
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def async_call(
+    op: str,
+    call: Callable[[], Awaitable[_T]],
+    policy: RequestPolicy,
+    latency: LatencyTracker,
+    hedge_floor: float = 0.0,
+) -> _T:
+    """Make a request according to `policy`.
+
+    Raises TimeoutError if the deadline passes or the last error if every attempt failed.
+    The first attempt may use the whole deadline; slow but healthy reads (backfills, team dashboards ...etc)
+        shouldn't be cut short and retried. Once an attempt has actually failed, each retry gets an equal
+        share of whatever is left so a single hung retry can't eat the time meant for the next one.
+    """
+    loop = asyncio.get_running_loop()
+    async with asyncio.timeout(policy.deadline) as deadline:
+        attempt = 0
+        while True:
+            hedge_after = None
+            if policy.hedge and (p95 := latency.percentile(op, 95)) is not None:
+                hedge_after = max(p95, hedge_floor)
+            remaining = (deadline.when() or loop.time()) - loop.time()
+            try:
+                async with asyncio.timeout(
+                    remaining
+                    if attempt == 0
+                    else remaining / (policy.attempts - attempt)
+                ):
+                    return await _async_hedged(op, call, latency, hedge_after)
+            except Exception as err:
+                attempt += 1
+                if attempt >= policy.attempts or not is_retryable(err):
+                    raise
+                delay = backoff_delay(attempt - 1, policy.backoff, policy.max_backoff)
+                _LOGGER.debug(
+                    "'%s' failed (%s); attempt %s of %s in %.3fs",
+                    op,
+                    err or type(err).__name__,
+                    attempt + 1,
+                    policy.attempts,
+                    delay,
+                )
+                await asyncio.sleep(delay)
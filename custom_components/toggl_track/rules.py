@@ -0,0 +1,380 @@
+"""Start and stop time entries from the state of other entities.
+
+Doing this with automations means every flap of a presence or occupancy sensor is a start or stop request,
+and several automations racing each other to start/stop the same entry. Rules are evaluated locally instead:
+
+- A state has to hold for `on_for` (or `off_for`) before anything is written. Flapping back and forth
+    inside that window costs nothing.
+- Numeric entities can use `above` and `below` as a hysteresis band; a value hovering around a single
+    threshold doesn't cause transitions.
+- Each real transition is at most one write. A rule only ever stops the time entry that it started; if
+    something else has replaced it since, stopping is a no-op.
+
+Nothing is written on startup. If the entity is already active and the API key owner is running an entry with
+the rule's description, the rule picks that entry up; otherwise it waits for the next transition.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from aiohttp.client_exceptions import ClientError
+from lib_toggl.time_entries import TimeEntry
+import voluptuous as vol
+
+from homeassistant.const import (
+    CONF_ABOVE,
+    CONF_BELOW,
+    CONF_ENTITY_ID,
+    CONF_NAME,
+    CONF_STATE,
+    EVENT_HOMEASSISTANT_STOP,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.template import Template
+
+from .breaker import CircuitOpenError
+from .const import (
+    ATTR_BILLABLE,
+    ATTR_CREATED_WITH,
+    ATTR_DESCRIPTION,
+    ATTR_PROJECT_ID,
+    ATTR_TAGS,
+    ATTR_WORKSPACE_ID,
+    CONF_OFF_FOR,
+    CONF_ON_FOR,
+    DEFAULT_RULE_OFF_FOR_SECONDS,
+    DEFAULT_RULE_ON_FOR_SECONDS,
+    RULE_CREATED_WITH,
+    RULE_RETRY_SECONDS,
+)
+from .coordinator import TogglTrackCoordinator, coordinator_for_workspace
+from .dispatcher import DispatcherShutdownError, Priority
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _thresholds(rule: dict[str, Any]) -> dict[str, Any]:
+    """A rule matches on state or on a numeric band, not both; `below` alone makes no sense."""
+    if CONF_STATE in rule:
+        if CONF_ABOVE in rule or CONF_BELOW in rule:
+            raise vol.Invalid(
+                f"Use either '{CONF_STATE}' or '{CONF_ABOVE}'/'{CONF_BELOW}'"
+            )
+        return rule
+    if CONF_ABOVE not in rule:
+        raise vol.Invalid(f"One of '{CONF_STATE}' or '{CONF_ABOVE}' is required")
+    rule.setdefault(CONF_BELOW, rule[CONF_ABOVE])
+    if rule[CONF_BELOW] > rule[CONF_ABOVE]:
+        raise vol.Invalid(f"'{CONF_BELOW}' must not be greater than '{CONF_ABOVE}'")
+    return rule
+
+
+RULE_SCHEMA = vol.All(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(CONF_ENTITY_ID): cv.entity_id,
+        # Active while the entity is in one of these states ...
+        vol.Optional(CONF_STATE): vol.All(cv.ensure_list, [cv.string]),
+        # ... or once it goes above `above`, until it drops below `below`
+        vol.Optional(CONF_ABOVE): vol.Coerce(float),
+        vol.Optional(CONF_BELOW): vol.Coerce(float),
+        vol.Optional(
+            CONF_ON_FOR, default=timedelta(seconds=DEFAULT_RULE_ON_FOR_SECONDS)
+        ): cv.positive_time_period,
+        vol.Optional(
+            CONF_OFF_FOR, default=timedelta(seconds=DEFAULT_RULE_OFF_FOR_SECONDS)
+        ): cv.positive_time_period,
+        # Time entry to start
+        vol.Required(ATTR_WORKSPACE_ID): cv.positive_int,
+        vol.Required(ATTR_DESCRIPTION): cv.template,
+        vol.Optional(ATTR_PROJECT_ID): cv.positive_int,
+        vol.Optional(ATTR_TAGS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_BILLABLE): cv.boolean,
+    },
+    _thresholds,
+)
+
+
+@dataclass
+class Rule:
+    """One entity driving one kind of time entry."""
+
+    name: str
+    entity_id: str
+    workspace_id: int
+    description: Template
+    on_for: timedelta
+    off_for: timedelta
+    states: list[str] | None = None
+    above: float | None = None
+    below: float | None = None
+    project_id: int | None = None
+    tags: list[str] | None = None
+    billable: bool | None = None
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> Rule:
+        """Build from an already validated RULE_SCHEMA entry."""
+        return cls(
+            name=config[CONF_NAME],
+            entity_id=config[CONF_ENTITY_ID],
+            workspace_id=config[ATTR_WORKSPACE_ID],
+            description=config[ATTR_DESCRIPTION],
+            on_for=config[CONF_ON_FOR],
+            off_for=config[CONF_OFF_FOR],
+            states=config.get(CONF_STATE),
+            above=config.get(CONF_ABOVE),
+            below=config.get(CONF_BELOW),
+            project_id=config.get(ATTR_PROJECT_ID),
+            tags=config.get(ATTR_TAGS),
+            billable=config.get(ATTR_BILLABLE),
+        )
+
+    def is_active(self, state: State | None, was_active: bool) -> bool | None:
+        """Return whether `state` means a time entry should be running; None if it says nothing either way.
+
+        `was_active` is the previous answer; that's what the hysteresis band works from.
+        """
+        if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return None
+        if self.states is not None:
+            return state.state in self.states
+        try:
+            value = float(state.state)
+        except ValueError:
+            return None
+        if was_active:
+            return value >= self.below
+        return value > self.above
+
+
+class RuleTracker:
+    """Follows a rule's entity and writes at most once per transition that outlasts the debounce."""
+
+    def __init__(self, hass: HomeAssistant, rule: Rule) -> None:
+        """Start out inactive; async_start() works out where things actually are."""
+        self.hass = hass
+        self.rule = rule
+        # Latest reading of the entity, after hysteresis
+        self._wanted = False
+        # What was last written to Toggl
+        self._active = False
+        # Entry this rule started, if it's still running as far as we know
+        self._time_entry_id: int | None = None
+        self._timer: CALLBACK_TYPE | None = None
+        self._unsub_state: CALLBACK_TYPE | None = None
+        self._writing = False
+
+    @callback
+    def async_start(self) -> None:
+        """Pick up the current state and start following the entity."""
+        self._wanted = bool(
+            self.rule.is_active(self.hass.states.get(self.rule.entity_id), False)
+        )
+        self._active = self._wanted
+        if self._active:
+            self._time_entry_id = self._adopt()
+
+        # Rules can't be reloaded; stopped along with Home Assistant, see async_setup_rules()
+        self._unsub_state = async_track_state_change_event(
+            self.hass, [self.rule.entity_id], self._async_state_changed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the entity; a write that's in flight still finishes."""
+        self._cancel_timer()
+        if self._unsub_state is not None:
+            self._unsub_state()
+            self._unsub_state = None
+
+    def _adopt(self) -> int | None:
+        """Return the ID of an already running entry that this rule would have started."""
+        coordinator = coordinator_for_workspace(self.hass, self.rule.workspace_id)
+        if coordinator is None:
+            return None
+        te = coordinator.own_entry(self.rule.workspace_id)
+        if te is not None and te.description == self._render_description():
+            _LOGGER.debug(
+                "Rule '%s' picked up running time entry %s", self.rule.name, te.id
+            )
+            return te.id
+        return None
+
+    def _render_description(self) -> str:
+        """Description templates may refer to other entities; rendered at the time of the write."""
+        self.rule.description.hass = self.hass
+        return self.rule.description.async_render(parse_result=False)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Entity changed; see if it means anything once hysteresis is applied."""
+        wanted = self.rule.is_active(event.data.get("new_state"), self._wanted)
+        if wanted is None:
+            # Unavailable/unknown; keep doing whatever we were doing
+            return
+        self._wanted = wanted
+        self._async_evaluate()
+
+    @callback
+    def _async_evaluate(self) -> None:
+        """(Re)start, keep or cancel the debounce timer."""
+        if self._writing or self._unsub_state is None:
+            # Evaluated again once the write is done; never once stopped
+            return
+        if self._wanted == self._active:
+            # Flapped back before the debounce was up; nothing to do
+            self._cancel_timer()
+            return
+        if self._timer is not None:
+            # Already counting down towards this transition
+            return
+        delay = self.rule.on_for if self._wanted else self.rule.off_for
+        self._timer = async_call_later(self.hass, delay, self._async_debounced)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer()
+            self._timer = None
+
+    @callback
+    def _async_debounced(self, _now: datetime) -> None:
+        """State held long enough; write it."""
+        self._timer = None
+        if self._wanted == self._active:
+            return
+        self._writing = True
+        self.hass.async_create_task(
+            self._async_write(self._wanted),
+            f"toggl_track_rule_{self.rule.name}",
+        )
+
+    async def _async_write(self, start: bool) -> None:
+        """Start or stop the rule's time entry; one request at most."""
+        coordinator = coordinator_for_workspace(self.hass, self.rule.workspace_id)
+        try:
+            if coordinator is None:
+                _LOGGER.warning(
+                    "Rule '%s': no loaded config entry tracks workspace %s",
+                    self.rule.name,
+                    self.rule.workspace_id,
+                )
+            elif start:
+                await self._async_start_entry(coordinator)
+            else:
+                await self._async_stop_entry(coordinator)
+        # HomeAssistantError includes TemplateError from rendering the description
+        except (
+            ClientError,
+            CircuitOpenError,
+            DispatcherShutdownError,
+            HomeAssistantError,
+            TimeoutError,
+        ) as err:
+            _LOGGER.warning(
+                "Rule '%s' could not %s its time entry: %s",
+                self.rule.name,
+                "start" if start else "stop",
+                err,
+            )
+            coordinator = None
+        finally:
+            self._writing = False
+
+        if coordinator is None:
+            if self._unsub_state is None:
+                # Stopped while the request was in flight
+                return
+            # Try again later unless the state changes back in the meantime
+            self._timer = async_call_later(
+                self.hass, RULE_RETRY_SECONDS, self._async_debounced
+            )
+            return
+        self._active = start
+        # State may have changed while the request was in flight
+        self._async_evaluate()
+
+    async def _async_start_entry(self, coordinator: TogglTrackCoordinator) -> None:
+        te = {
+            ATTR_WORKSPACE_ID: self.rule.workspace_id,
+            ATTR_DESCRIPTION: self._render_description(),
+            ATTR_PROJECT_ID: self.rule.project_id,
+            ATTR_TAGS: self.rule.tags,
+            ATTR_BILLABLE: self.rule.billable,
+            ATTR_CREATED_WITH: RULE_CREATED_WITH,
+        }
+        _LOGGER.debug("Rule '%s' starting time entry", self.rule.name)
+        coordinator.async_note_activity()
+        created = await coordinator.async_submit(
+            Priority.WRITE,
+            coordinator.api.create_new_time_entry,
+            # Same as the service; only pass what's set
+            TimeEntry(**{k: v for k, v in te.items() if v is not None}),
+        )
+        if not created:
+            raise HomeAssistantError("Toggl Track didn't return the new time entry")
+        coordinator.async_apply_time_entry(created)
+        self._time_entry_id = created.id
+
+    async def _async_stop_entry(self, coordinator: TogglTrackCoordinator) -> None:
+        running = coordinator.own_entry(self.rule.workspace_id)
+        if (
+            self._time_entry_id is None
+            or running is None
+            or running.id != self._time_entry_id
+        ):
+            # Stopped or replaced by something else already; not ours to stop
+            _LOGGER.debug("Rule '%s' has no running time entry to stop", self.rule.name)
+            self._time_entry_id = None
+            return
+        _LOGGER.debug(
+            "Rule '%s' stopping time entry %s", self.rule.name, self._time_entry_id
+        )
+        coordinator.async_note_activity()
+        stopped = await coordinator.async_submit(
+            Priority.WRITE,
+            coordinator.api.stop_time_entry,
+            TimeEntry(workspace_id=self.rule.workspace_id, id=self._time_entry_id),
+        )
+        self._time_entry_id = None
+        if stopped is not None:
+            coordinator.async_apply_time_entry(stopped)
+
+
+@callback
+def async_setup_rules(hass: HomeAssistant, rules: list[dict[str, Any]]) -> None:
+    """Follow every configured rule once Home Assistant has started.
+
+    Waiting for startup means entities that haven't been set up yet aren't mistaken for inactive ones and
+        the config entries (and their coordinators) are loaded.
+    """
+    trackers = [RuleTracker(hass, Rule.from_config(rule)) for rule in rules]
+
+    @callback
+    def _async_started(_hass: HomeAssistant) -> None:
+        for tracker in trackers:
+            tracker.async_start()
+
+    @callback
+    def _async_stop(_event: Event) -> None:
+        for tracker in trackers:
+            tracker.async_stop()
+
+    async_at_started(hass, _async_started)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
@@ -0,0 +1,93 @@
+"""Weekly active-hours window; polling is throttled outside of it and only time inside it counts as idle."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from .const import (
+    CONF_ACTIVE_DAYS,
+    CONF_ACTIVE_END,
+    CONF_ACTIVE_START,
+    WEEKDAYS,
+)
+
+
+@dataclass(frozen=True)
+class ActiveHours:
+    """Same start/end time on each of the selected days of the week.
+
+    If `end` is earlier than `start` the window runs past midnight and belongs to the day it starts on.
+    If `start` and `end` are the same, the window covers the whole day.
+    """
+
+    # datetime.weekday() values; Monday is 0
+    days: frozenset[int]
+    start: time
+    end: time
+
+    @classmethod
+    def from_config(cls, data: dict[str, Any]) -> ActiveHours | None:
+        """Build from config entry data. Returns None if no schedule is configured."""
+        if CONF_ACTIVE_DAYS not in data:
+            return None
+        return cls(
+            days=frozenset(WEEKDAYS.index(d) for d in data[CONF_ACTIVE_DAYS]),
+            start=time.fromisoformat(data.get(CONF_ACTIVE_START, "00:00:00")),
+            end=time.fromisoformat(data.get(CONF_ACTIVE_END, "00:00:00")),
+        )
+
+    @property
+    def always_active(self) -> bool:
+        """Indicate if this schedule never actually throttles anything."""
+        return len(self.days) == len(WEEKDAYS) and self.start == self.end
+
+    def _window(self, day: datetime) -> tuple[datetime, datetime]:
+        """Return the [start, end) of the window that starts on `day`'s date."""
+        start = day.replace(
+            hour=self.start.hour,
+            minute=self.start.minute,
+            second=self.start.second,
+            microsecond=0,
+        )
+        end = day.replace(
+            hour=self.end.hour,
+            minute=self.end.minute,
+            second=self.end.second,
+            microsecond=0,
+        )
+        if end <= start:
+            end += timedelta(days=1)
+        return start, end
+
+    def is_active(self, now: datetime) -> bool:
+        """Indicate if `now` falls inside any window."""
+        if self.always_active:
+            return True
+        return self.current_window(now) is not None
+
+    def current_window(self, now: datetime) -> tuple[datetime, datetime] | None:
+        """Return the [start, end) of the window `now` falls inside, if any."""
+        # The window that started yesterday may still be running if it crosses midnight
+        for offset in (0, -1):
+            day = now + timedelta(days=offset)
+            if day.weekday() not in self.days:
+                continue
+            start, end = self._window(day)
+            if start <= now < end:
+                return start, end
+        return None
+
+    def next_start(self, now: datetime) -> datetime | None:
+        """Return when the next window opens, or None if there are no windows at all."""
+        if not self.days:
+            return None
+        for offset in range(8):
+            day = now + timedelta(days=offset)
+            if day.weekday() not in self.days:
+                continue
+            start, _ = self._window(day)
+            if start > now:
+                return start
+        return None
@@ -5,19 +5,28 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_NAME, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     ATTR_AT,
     ATTR_BILLABLE,
+    ATTR_BILLABLE_HOURS,
+    ATTR_DESCRIPTION,
     ATTR_DURATION,
+    ATTR_GROUPING,
     ATTR_ID,
+    ATTR_PERIOD,
+    ATTR_PERIOD_END,
+    ATTR_PERIOD_START,
+    ATTR_PROJECT_HOURS,
     ATTR_PROJECT_ID,
+    ATTR_RUNNING_ENTRIES,
+    ATTR_STALE,
     ATTR_START,
     ATTR_STOP,
     ATTR_TAGS,
@@ -25,10 +34,14 @@ from .const import (
     ATTR_USER_ID,
     ATTR_WORKSPACE_ID,
     ATTR_WORKSPACE_NAME,
+    CONF_PROJECTS,
     CONF_WORKSPACES,
     DOMAIN,
 )
 from .coordinator import TogglTrackCoordinator
+from .entity import TogglTrackWorkspaceEntity, async_sync_entities
+from .profiler import SPAN_SENSOR_UPDATE
+from .reports import SummaryGrouping, SummaryPeriod
 
 # Various attributes that each time entry has
 TE_SPECIFIC_ATTR_KEYS = [
@@ -66,15 +79,16 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in HA."""
     _LOGGER.debug("async_setup_entry is alive")
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
-    _acct = await coordinator.api.get_account_details()
-    # Will be a dict where key is ID, value is name
-    _workspaces = config_entry.options[CONF_WORKSPACES]
-
-    async_add_entities(
-        [
-            # Multiple workspaces are a premium thing; I can't test this as is.
-            # This _should_ work with multiple workspaces but I've got just the one for now...
-            ##
+    _acct = await coordinator.async_get_account()
+
+    def _build() -> list[SensorEntity]:
+        """Sensors for the workspaces and projects currently in the options."""
+        # Will be a dict where key is ID, value is name
+        _workspaces = config_entry.options[CONF_WORKSPACES]
+        # Multiple workspaces are a premium thing; I can't test this as is.
+        # This _should_ work with multiple workspaces but I've got just the one for now...
+        ##
+        entities: list[SensorEntity] = [
             TogglTrackWorkspaceSensorEntity(
                 coordinator,
                 config_entry.entry_id,
@@ -85,24 +99,64 @@ async def async_setup_entry(
             )
             for workspace_id, workspace_name in _workspaces.items()
         ]
-    )
+        entities += [
+            TogglTrackSummarySensorEntity(
+                coordinator,
+                config_entry.entry_id,
+                _acct.id,
+                int(workspace_id),
+                workspace_name,
+            )
+            for workspace_id, workspace_name in _workspaces.items()
+        ]
+        # Opt in; only projects in workspaces that are still tracked
+        entities += [
+            TogglTrackProjectSensorEntity(
+                coordinator,
+                config_entry.entry_id,
+                _acct.id,
+                int(project[ATTR_WORKSPACE_ID]),
+                _workspaces[str(project[ATTR_WORKSPACE_ID])],
+                int(project_id),
+                project[ATTR_NAME],
+            )
+            for project_id, project in config_entry.options.get(
+                CONF_PROJECTS, {}
+            ).items()
+            if str(project[ATTR_WORKSPACE_ID]) in _workspaces
+        ]
+        return entities
 
+    # Options changes add/remove sensors in place; see entity.py
+    async_sync_entities(hass, config_entry, async_add_entities, _build)
 
-# Long term, would be nice to have workspace selection as part of init/options flow
-# But for now, just create a sensor for each workspace. User can always disable the
-#   ones they don't want
+
+# One sensor for each workspace picked in the config/options flow.
 # This way we have an easy / user-friendly way to show the workspace name and ID
 # Then can select other workspace entities in the create time track service call...
 ##
-class TogglTrackWorkspaceSensorEntity(
-    CoordinatorEntity[TogglTrackCoordinator], SensorEntity
-):
+class TogglTrackWorkspaceSensorEntity(TogglTrackWorkspaceEntity, SensorEntity):
     """Sensor representing workspace details.
 
     Workspace(s) are mostly read-only; this is just a "helper" that
     makes it easier to see the workspace name and ID in the UI.
     """
 
+    # These change on (nearly) every poll; keeping them in the recorder just bloats the database.
+    # Tracked time history comes from the long-term statistics instead; see statistics.py
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_ID,
+            ATTR_AT,
+            ATTR_START,
+            ATTR_STOP,
+            ATTR_DURATION,
+            ATTR_TAGS,
+            ATTR_RUNNING_ENTRIES,
+            ATTR_STALE,
+        }
+    )
+
     def __init__(
         self,
         coordinator: TogglTrackCoordinator,
@@ -112,11 +166,9 @@ class TogglTrackWorkspaceSensorEntity(
         workspace_name: str,
     ) -> None:
         """Pass coordinator to CoordinatorEntity and store some UUIDs."""
-        super().__init__(coordinator=coordinator)
+        super().__init__(coordinator, config_entry_id, workspace_id, workspace_name)
         _LOGGER.debug("TogglTrackWorkspaceSensorEntity is alive")
         self._toggle_acct_id = account_id
-        self._workspace_id = workspace_id
-        self._workspace_name = workspace_name
 
         # Human friendly name in HA ui
         self._attr_name = f"{workspace_name}"
@@ -144,32 +196,30 @@ class TogglTrackWorkspaceSensorEntity(
                 del self._attrs[k]
 
     def _update_state(self) -> None:
-        """Update the state of the sensor if the workspace ID belongs to us."""
+        """Update the state of the sensor from this workspace's slice of the running entries."""
+        entries = self.coordinator.running_entries(self._workspace_id)
+        # Whatever is shown, indicate if it's the last good data from before the API started failing
+        self._attrs[ATTR_STALE] = self.coordinator.stale
 
         # If there is no time entry running, remove all the attributes that are specific time entry
-        if self.coordinator.data is None:
+        if not entries:
             _LOGGER.debug(
-                "No current time entry running; state to become None and attrs to be cleared"
-            )
-            self._do_empty_state()
-            return
-        # If not none, then there is some time entry running... is it in our workspace?
-        if self.coordinator.data.workspace_id != self._workspace_id:
-            _LOGGER.debug(
-                # pylint: disable=line-too-long
-                "Current time entry is for workspace '%s' which is not our workspace '%s'; state to become None and attrs to be cleared",
-                self.coordinator.data.workspace_id,
+                "No time entry running in workspace '%s'; state to become None and attrs to be cleared",
                 self._workspace_id,
             )
             self._do_empty_state()
+            self._attrs.pop(ATTR_RUNNING_ENTRIES, None)
             return
 
+        # Own entry (if running) is first; that's the one the state and services work with
+        current = entries[0]
+
         # The critical bit of data is the name/description of the time entry
-        self._state = self.coordinator.data.description
+        self._state = current.description
 
         # All the other data associated with a time entry becomes an attribute
         for k in TE_SPECIFIC_ATTR_KEYS:
-            self._attrs[k] = getattr(self.coordinator.data, k)
+            self._attrs[k] = getattr(current, k)
 
         # Rather than have two separate lists, we can just zip together the tag IDs and tag names
         # Note: The API docs don't explicitly say there is a 1:1 map between tag IDs and tag names
@@ -177,15 +227,12 @@ class TogglTrackWorkspaceSensorEntity(
         # In testing this does seem to be the case, though so we just zip things up to mae it easier
         #   to work with in the HA UI / templates ... etc
         ##
-        if (
-            self.coordinator.data.tag_ids is not None
-            and self.coordinator.data.tags is not None
-        ):
+        if current.tag_ids is not None and current.tags is not None:
             # Everything copied in, zip up then clean up
             self._attrs[ATTR_TAGS] = dict(
                 zip(
-                    self.coordinator.data.tag_ids,
-                    self.coordinator.data.tags,
+                    current.tag_ids,
+                    current.tags,
                     # Raise an error if the lengths don't match
                     strict=True,
                 )
@@ -193,6 +240,20 @@ class TogglTrackWorkspaceSensorEntity(
         else:
             self._attrs[ATTR_TAGS] = {}
 
+        # With team activity enabled, other people's timers in the same workspace are listed too
+        if len(entries) > 1:
+            self._attrs[ATTR_RUNNING_ENTRIES] = [
+                {
+                    ATTR_ID: e.id,
+                    ATTR_USER_ID: e.user_id,
+                    ATTR_DESCRIPTION: e.description,
+                    ATTR_START: e.start,
+                }
+                for e in entries
+            ]
+        else:
+            self._attrs.pop(ATTR_RUNNING_ENTRIES, None)
+
         # This is a bit of a hack, but it works
         # For reasons that are going to suck to track down, the workspace ID is
         #   showing up as an integer when first set but as soon as we get a None for
@@ -219,5 +280,129 @@ class TogglTrackWorkspaceSensorEntity(
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._update_state()
+        with self.coordinator.profiler.span(SPAN_SENSOR_UPDATE):
+            self._update_state()
         super()._handle_coordinator_update()
+
+
+class TogglTrackSummarySensorEntity(TogglTrackWorkspaceEntity, SensorEntity):
+    """Hours tracked in a workspace this week.
+
+    Comes from the server side aggregated summary report that the coordinator caches.
+    Time on the currently running entry isn't in the report until it's stopped.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+    _attr_suggested_display_precision = 2
+    _attr_icon = "mdi:chart-timeline"
+    _unrecorded_attributes = frozenset({ATTR_PROJECT_HOURS})
+
+    _period = SummaryPeriod.WEEK
+    _grouping = SummaryGrouping.PROJECTS
+
+    def __init__(
+        self,
+        coordinator: TogglTrackCoordinator,
+        config_entry_id: str,
+        account_id: int,
+        workspace_id: int,
+        workspace_name: str,
+    ) -> None:
+        """Pass coordinator to CoordinatorEntity and store some UUIDs."""
+        super().__init__(coordinator, config_entry_id, workspace_id, workspace_name)
+        self._attr_name = f"{workspace_name} this {self._period}"
+        self._attr_unique_id = (
+            f"{config_entry_id}_{account_id}_{workspace_id}_{self._period}_summary"
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return tracked hours or None if the report hasn't been fetched yet."""
+        report = self.coordinator.summaries.peek(
+            self._workspace_id, self._period, self._grouping
+        )
+        if report is None:
+            return None
+        return round(report.total_seconds / 3600, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the per project breakdown."""
+        report = self.coordinator.summaries.peek(
+            self._workspace_id, self._period, self._grouping
+        )
+        attrs: dict[str, Any] = {
+            ATTR_WORKSPACE_ID: self._workspace_id,
+            ATTR_PERIOD: str(self._period),
+            ATTR_GROUPING: str(self._grouping),
+        }
+        if report is None:
+            return attrs
+        attrs[ATTR_PERIOD_START] = report.start.isoformat()
+        attrs[ATTR_PERIOD_END] = report.end.isoformat()
+        attrs[ATTR_BILLABLE_HOURS] = round(report.billable_seconds / 3600, 2)
+        attrs[ATTR_PROJECT_HOURS] = {
+            k: round(v.seconds / 3600, 2) for k, v in report.groups.items()
+        }
+        return attrs
+
+
+class TogglTrackProjectSensorEntity(TogglTrackSummarySensorEntity):
+    """Hours tracked against one project this week.
+
+    Only for projects that were picked in the options flow. Read from the same cached summary report as the
+        workspace's summary sensor so it costs no extra requests.
+    """
+
+    _attr_icon = "mdi:folder-clock-outline"
+
+    def __init__(
+        self,
+        coordinator: TogglTrackCoordinator,
+        config_entry_id: str,
+        account_id: int,
+        workspace_id: int,
+        workspace_name: str,
+        project_id: int,
+        project_name: str,
+    ) -> None:
+        """Pass coordinator to CoordinatorEntity and store some UUIDs."""
+        super().__init__(
+            coordinator, config_entry_id, account_id, workspace_id, workspace_name
+        )
+        self._project_id = project_id
+        self._attr_name = f"{project_name} this {self._period}"
+        self._attr_unique_id = f"{config_entry_id}_{account_id}_{workspace_id}_project_{project_id}_{self._period}_summary"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return tracked hours, 0 if nothing was tracked, or None if the report hasn't been fetched yet."""
+        report = self.coordinator.summaries.peek(
+            self._workspace_id, self._period, self._grouping
+        )
+        if report is None:
+            return None
+        group = report.groups.get(str(self._project_id))
+        return round(group.seconds / 3600, 2) if group else 0.0
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the project and how much of it was billable."""
+        report = self.coordinator.summaries.peek(
+            self._workspace_id, self._period, self._grouping
+        )
+        attrs: dict[str, Any] = {
+            ATTR_WORKSPACE_ID: self._workspace_id,
+            ATTR_PROJECT_ID: self._project_id,
+            ATTR_PERIOD: str(self._period),
+        }
+        if report is None:
+            return attrs
+        group = report.groups.get(str(self._project_id))
+        attrs[ATTR_PERIOD_START] = report.start.isoformat()
+        attrs[ATTR_PERIOD_END] = report.end.isoformat()
+        attrs[ATTR_BILLABLE_HOURS] = (
+            round(group.billable_seconds / 3600, 2) if group else 0.0
+        )
+        return attrs
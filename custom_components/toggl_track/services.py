@@ -2,32 +2,92 @@
 
 from __future__ import annotations
 
+import asyncio
+from datetime import timedelta
 import logging
 
-from aiohttp.client_exceptions import ClientResponseError
+from aiohttp.client_exceptions import ClientError
 from lib_toggl.time_entries import TimeEntry
-from voluptuous import All, Any, Invalid, Length, Optional, Required, Schema
+from voluptuous import (
+    All,
+    Any,
+    Coerce,
+    Invalid,
+    Length,
+    Optional,
+    Range,
+    Required,
+    Schema,
+)
 
-from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.const import ATTR_AREA_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import entity_registry as er
 import homeassistant.helpers.config_validation as cv
-
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+from homeassistant.util import dt as dt_util
+
+from .analytics import (
+    BUCKETS,
+    TAG_GROUPS,
+    ReportGroup,
+    compute_report,
+    history_columns,
+)
+from .breaker import CircuitOpenError
 from .const import (
     ATTR_BILLABLE,
+    ATTR_CPROFILE,
     ATTR_CREATED_WITH,
+    ATTR_CYCLES,
     ATTR_DESCRIPTION,
+    ATTR_DURATION,
+    ATTR_END,
+    ATTR_GROUP_BY,
+    ATTR_GROUPING,
     ATTR_ID,
+    ATTR_PERIOD,
     ATTR_PROJECT_ID,
+    ATTR_SERVICE_CALLS,
+    ATTR_START,
     ATTR_TAGS,
+    ATTR_TIME_ENTRIES,
     ATTR_TIME_ENTRY_ID,
+    ATTR_TIMEOUT,
     ATTR_WORKSPACE_ID,
     DOMAIN,
+    PROFILE_DEFAULT_CYCLES,
+    PROFILE_DEFAULT_TIMEOUT_SECONDS,
+    PROFILE_MAX_CYCLES,
+    PROFILE_MAX_SERVICE_CALLS,
+    PROFILE_MAX_TIMEOUT_SECONDS,
+    PROFILE_TOP_FUNCTIONS,
+    SERVICE_COMPUTE_REPORT,
     SERVICE_EDIT_TIME_ENTRY,
+    SERVICE_GET_SUMMARY,
     SERVICE_NEW_TIME_ENTRY,
+    SERVICE_PROFILE,
+    SERVICE_RECORD_TRAFFIC,
     SERVICE_STOP_TIME_ENTRY,
     SERVICE_WORKSPACE_ID_ENTITY_ID,
+    TRAFFIC_DEFAULT_SECONDS,
+    TRAFFIC_MAX_SECONDS,
 )
 from .coordinator import TogglTrackCoordinator
+from .dispatcher import DispatcherShutdownError, Priority
+from .profiler import (
+    SPAN_BUILD_TIME_ENTRY,
+    SPAN_RESOLVE_TARGETS,
+    SPAN_SERVICE,
+    SPAN_VALIDATE,
+    ProfileInProgressError,
+    ProfileSession,
+    top_functions,
+    write_report,
+)
+from .reports import SummaryGrouping, SummaryPeriod
+from .traffic import TrafficRecorder, write_traffic
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +103,7 @@ NEW_TIME_ENTRY_SERVICE_SCHEMA = Schema(
         # Will use XOR
         ATTR_WORKSPACE_ID: cv.positive_int,
         SERVICE_WORKSPACE_ID_ENTITY_ID: str,
+        **cv.ENTITY_SERVICE_FIELDS,
         Optional(ATTR_CREATED_WITH, description="test-description"): All(
             cv.string, Length(min=1, max=128)
         ),
@@ -55,26 +116,38 @@ NEW_TIME_ENTRY_SERVICE_SCHEMA = Schema(
 )
 
 
+# Standard HA service targets; entity, device and/or area
+_TARGET_KEYS = (ATTR_ENTITY_ID, ATTR_DEVICE_ID, ATTR_AREA_ID)
+
+
+def _has_target(incoming_data) -> bool:
+    """True if the call names a workspace through an entity, device or area rather than by ID."""
+    return SERVICE_WORKSPACE_ID_ENTITY_ID in incoming_data or any(
+        key in incoming_data for key in _TARGET_KEYS
+    )
+
+
 def _xor_validator(incoming_data):
     """Exclusive Or validator for stop/edit time entry schema.
 
-    Either the sensor entity id is specified or both the workspace and time entry ID must be.
+    Either target the workspace(s) (sensor entity ID, or an entity/device/area target) or provide both the
+        workspace and time entry ID.
+    Providing neither means "the time entry that is running right now", in every workspace.
     """
     # Voluptuous will have already done basic type validation so we just check for presence/absence of keys
-    if SERVICE_WORKSPACE_ID_ENTITY_ID not in incoming_data:
-        # If the entity ID is not present, we need both workspace and time entry IDs
-        if ATTR_WORKSPACE_ID in incoming_data and ATTR_TIME_ENTRY_ID in incoming_data:
-            return incoming_data
+    has_ids = ATTR_WORKSPACE_ID in incoming_data or ATTR_TIME_ENTRY_ID in incoming_data
+    if not has_ids:
+        return incoming_data
 
+    if _has_target(incoming_data):
         raise Invalid(
-            "If Sensor Entity ID not provided, BOTH Workspace ID and Time Entry ID must be provided."
-        )
-    # We know that the entity ID is present
-    if ATTR_WORKSPACE_ID in incoming_data or ATTR_TIME_ENTRY_ID in incoming_data:
-        raise Invalid(
-            "If Sensor Entity ID is provided, Workspace ID and Time Entry ID must NOT be provided."
+            "If a target or Sensor Entity ID is provided, Workspace ID and Time Entry ID must NOT be provided."
         )
-    return incoming_data
+    if ATTR_WORKSPACE_ID in incoming_data and ATTR_TIME_ENTRY_ID in incoming_data:
+        return incoming_data
+    raise Invalid(
+        "If no target or Sensor Entity ID is provided, BOTH Workspace ID and Time Entry ID must be provided."
+    )
 
 
 def _new_te_xor_validator(incoming_data):
@@ -83,18 +156,27 @@ def _new_te_xor_validator(incoming_data):
     There's no good way to do Exclusive() and Required() at the same time w/o nesting the data.
     Nesting is not possible so we roll our own.
     The logic is more or less the same but with the new time entry service, we have fewer inputs that
-        the XOR logic needs to be applied to
+        the XOR logic needs to be applied to. Whatever is targeted has to come down to exactly one workspace;
+        that's checked once the target has been resolved.
     """
     # Voluptuous will have already done basic type validation so we just check for presence/absence of keys
-    if SERVICE_WORKSPACE_ID_ENTITY_ID not in incoming_data:
-        # If the entity ID is not present, we need both workspace and time entry IDs
-        if ATTR_WORKSPACE_ID in incoming_data:
-            return incoming_data
+    if _has_target(incoming_data) != (ATTR_WORKSPACE_ID in incoming_data):
+        return incoming_data
+    raise Invalid(
+        "Either a target / Sensor Entity ID or a Workspace ID must be provided, not both."
+    )
+
+
+def _optional_xor_validator(incoming_data):
+    """Exclusive Or validator for services that also work without naming a workspace at all.
 
-    if SERVICE_WORKSPACE_ID_ENTITY_ID in incoming_data:
-        if ATTR_WORKSPACE_ID not in incoming_data:
-            return incoming_data
-    raise Invalid("If Sensor Entity ID not provided, Workspace ID must be provided.")
+    Same as _new_te_xor_validator() except that neither a target nor a Workspace ID is fine too.
+    """
+    if ATTR_WORKSPACE_ID in incoming_data and _has_target(incoming_data):
+        raise Invalid(
+            "Either a target / Sensor Entity ID or a Workspace ID may be provided, not both."
+        )
+    return incoming_data
 
 
 # Stop service takes nothing but a workspace ID and time entry ID
@@ -105,6 +187,7 @@ STOP_TIME_ENTRY_SERVICE_SCHEMA = Schema(
             ATTR_TIME_ENTRY_ID: cv.positive_int,
             ATTR_WORKSPACE_ID: cv.positive_int,
             SERVICE_WORKSPACE_ID_ENTITY_ID: str,
+            **cv.ENTITY_SERVICE_FIELDS,
         },
         # Then do the XOR check
         _xor_validator,
@@ -127,130 +210,241 @@ EDIT_TIME_ENTRY_SERVICE_SCHEMA = Schema(
             ATTR_TIME_ENTRY_ID: cv.positive_int,
             ATTR_WORKSPACE_ID: cv.positive_int,
             SERVICE_WORKSPACE_ID_ENTITY_ID: str,
+            **cv.ENTITY_SERVICE_FIELDS,
         },
         # Then do the XOR check
         _xor_validator,
     )
 )
 
+# Summary only needs a workspace; same XOR rules as creating a new time entry
+GET_SUMMARY_SERVICE_SCHEMA = Schema(
+    All(
+        {
+            ATTR_WORKSPACE_ID: cv.positive_int,
+            SERVICE_WORKSPACE_ID_ENTITY_ID: str,
+            **cv.ENTITY_SERVICE_FIELDS,
+            Optional(ATTR_PERIOD, default=SummaryPeriod.WEEK): Coerce(SummaryPeriod),
+            Optional(ATTR_GROUPING, default=SummaryGrouping.PROJECTS): Coerce(
+                SummaryGrouping
+            ),
+        },
+        _new_te_xor_validator,
+    )
+)
 
-def _get_attr_from_entity_id(
-    attr_name: str, call_data: dict, hass: HomeAssistant
-) -> Any | None:
-    """Get $attr from entity ID.
-
-    Returns None if the entity ID does not exist or does not have $attr.
-    """
 
-    if SERVICE_WORKSPACE_ID_ENTITY_ID not in call_data:
-        _LOGGER.error(
-            "Entity ID not provided in service call data. Cannot do indirect lookup of %s",
-            attr_name,
+def _group_by_validator(groups: list[ReportGroup]) -> list[ReportGroup]:
+    """At most one of day/week/month and one of tag/tag_pair; no repeats."""
+    if (
+        len(set(groups)) != len(groups)
+        or len(set(groups) & set(BUCKETS)) > 1
+        or len(set(groups) & set(TAG_GROUPS)) > 1
+    ):
+        raise Invalid(
+            "group_by can have at most one of day/week/month and one of tag/tag_pair"
         )
-        return None
+    return groups
+
 
-    _LOGGER.debug(
-        "Doing indirect lookup of %s from entity ID %s",
-        attr_name,
-        call_data[SERVICE_WORKSPACE_ID_ENTITY_ID],
+# Computed reports work across any number of workspaces; no target means every tracked workspace
+COMPUTE_REPORT_SERVICE_SCHEMA = Schema(
+    All(
+        {
+            ATTR_WORKSPACE_ID: cv.positive_int,
+            **cv.ENTITY_SERVICE_FIELDS,
+            Optional(ATTR_START): cv.datetime,
+            Optional(ATTR_END): cv.datetime,
+            Optional(ATTR_GROUP_BY, default=[ReportGroup.PROJECT]): All(
+                cv.ensure_list, [Coerce(ReportGroup)], _group_by_validator
+            ),
+        },
+        _optional_xor_validator,
     )
+)
+
+
+def _profile_validator(incoming_data):
+    """Profiling nothing would never finish."""
+    if not incoming_data[ATTR_CYCLES] and not incoming_data[ATTR_SERVICE_CALLS]:
+        raise Invalid("At least one of cycles and service_calls must be more than 0")
+    return incoming_data
+
 
-    entity_state = hass.states.get(
-        call_data[SERVICE_WORKSPACE_ID_ENTITY_ID],
+# Stops after `cycles` polls and `service_calls` calls to the other services, or after `timeout` seconds
+PROFILE_SERVICE_SCHEMA = Schema(
+    All(
+        {
+            Optional(ATTR_CYCLES, default=PROFILE_DEFAULT_CYCLES): All(
+                Coerce(int), Range(min=0, max=PROFILE_MAX_CYCLES)
+            ),
+            Optional(ATTR_SERVICE_CALLS, default=0): All(
+                Coerce(int), Range(min=0, max=PROFILE_MAX_SERVICE_CALLS)
+            ),
+            Optional(ATTR_CPROFILE, default=False): cv.boolean,
+            Optional(ATTR_TIMEOUT, default=PROFILE_DEFAULT_TIMEOUT_SECONDS): All(
+                Coerce(int), Range(min=1, max=PROFILE_MAX_TIMEOUT_SECONDS)
+            ),
+        },
+        _profile_validator,
     )
+)
 
-    if entity_state is None:
-        _LOGGER.error(
-            "Entity ID '%s' does not exist",
-            call_data[SERVICE_WORKSPACE_ID_ENTITY_ID],
-        )
-        return None
 
-    if attr_name not in entity_state.attributes:
-        _LOGGER.error(
-            "Entity ID '%s' does not have an attribute named '%s'",
-            call_data[SERVICE_WORKSPACE_ID_ENTITY_ID],
-            attr_name,
-        )
-        return None
-    return entity_state.attributes[attr_name]
+# Records for `duration` seconds
+RECORD_TRAFFIC_SERVICE_SCHEMA = Schema(
+    {
+        Optional(ATTR_DURATION, default=TRAFFIC_DEFAULT_SECONDS): All(
+            Coerce(int), Range(min=1, max=TRAFFIC_MAX_SECONDS)
+        ),
+    }
+)
+
+# Everything async_register_services() registers
+SERVICES = (
+    SERVICE_NEW_TIME_ENTRY,
+    SERVICE_STOP_TIME_ENTRY,
+    SERVICE_EDIT_TIME_ENTRY,
+    SERVICE_GET_SUMMARY,
+    SERVICE_COMPUTE_REPORT,
+    SERVICE_PROFILE,
+    SERVICE_RECORD_TRAFFIC,
+)
 
 
-def _handle_workspace_id(hass: HomeAssistant, call_data: dict[str, Any]):
-    if ATTR_WORKSPACE_ID not in call_data:
-        if attr_value := _get_attr_from_entity_id(ATTR_WORKSPACE_ID, call_data, hass):
-            call_data[ATTR_WORKSPACE_ID] = attr_value
-        else:
-            # pylint: disable=line-too-long
-            _err = f"Provided entity ID {call_data[SERVICE_WORKSPACE_ID_ENTITY_ID]} does not have a workspace ID"
-            _LOGGER.error(_err)
+def _resolve_workspace_ids(
+    hass: HomeAssistant, coordinator: TogglTrackCoordinator, call: ServiceCall
+) -> list[int]:
+    """Return the workspace(s) that a call targets, in no particular order.
+
+    Entities are looked up in the entity registry and mapped to a workspace by the coordinator; nothing is read
+        from entity state so a sensor that is unavailable or hasn't updated yet still resolves.
+    Entities that were named explicitly must belong to this integration. Entities pulled in by a device or
+        area target that don't are ignored.
+    """
+    selected = async_extract_referenced_entity_ids(hass, call)
+    referenced = set(selected.referenced)
+    if legacy_entity_id := call.data.get(SERVICE_WORKSPACE_ID_ENTITY_ID):
+        referenced.add(legacy_entity_id)
+
+    registry = er.async_get(hass)
+    workspace_ids: set[int] = set()
+    for entity_id in referenced | selected.indirectly_referenced:
+        workspace_id = None
+        if (
+            entry := registry.async_get(entity_id)
+        ) is not None and entry.platform == DOMAIN:
+            workspace_id = coordinator.workspace_for_unique_id(entry.unique_id)
+        if workspace_id is not None:
+            workspace_ids.add(workspace_id)
+        elif entity_id in referenced:
+            _LOGGER.error("Entity ID '%s' is not a Toggl Track workspace", entity_id)
             raise ServiceValidationError(
                 translation_domain=DOMAIN,
                 translation_key="cant_fetch_ws_id_from_entity_id",
-                translation_placeholders={
-                    "entity_id": call_data[SERVICE_WORKSPACE_ID_ENTITY_ID]
-                },
+                translation_placeholders={"entity_id": entity_id},
             )
+    return list(workspace_ids)
 
 
-def _handle_time_entry_id(hass: HomeAssistant, call_data: dict[str, Any]):
-    # The toggle track API is inconsistent. Depending on the verb/API endpoint
-    #   they payload may need to refer to a time entry with _just_ `id` or `time_entry_id`.
-    # Internal to lib-toggl and the underlying Pydantic models, it's _always_ `id` and is adjusted
-    #   on the fly based on the API endpoint/verb.
-    # But for the stop and edit service calls, it's always called `ATTR_TIME_ENTRY_ID`
-    # So we need to re-write and then drop after extracting the value
-    ##
-    if ATTR_TIME_ENTRY_ID not in call_data:
-        if attr_value := _get_attr_from_entity_id(ATTR_ID, call_data, hass):
-            call_data[ATTR_ID] = attr_value
-        else:
-            # pylint: disable=line-too-long
-            _err = f"Provided entity ID {call_data[SERVICE_WORKSPACE_ID_ENTITY_ID]} does not have a time entry ID"
-            _LOGGER.error(_err)
-            raise ServiceValidationError(
-                translation_domain=DOMAIN,
-                translation_key="cant_fetch_te_id_from_entity_id",
-                translation_placeholders={
-                    "entity_id": call_data[SERVICE_WORKSPACE_ID_ENTITY_ID]
-                },
-            )
+def _handle_workspace_id(
+    hass: HomeAssistant,
+    coordinator: TogglTrackCoordinator,
+    call: ServiceCall,
+    call_data: dict[str, Any],
+) -> None:
+    """Set the workspace ID for services that work on exactly one workspace."""
+    if ATTR_WORKSPACE_ID in call_data:
+        return
+    workspace_ids = _resolve_workspace_ids(hass, coordinator, call)
+    if len(workspace_ids) != 1:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="one_workspace_required",
+            translation_placeholders={"count": str(len(workspace_ids))},
+        )
+    call_data[ATTR_WORKSPACE_ID] = workspace_ids[0]
+
+
+def _time_entry_ids(
+    hass: HomeAssistant,
+    coordinator: TogglTrackCoordinator,
+    call: ServiceCall,
+    call_data: dict[str, Any],
+) -> list[tuple[int, int]]:
+    """Return (workspace ID, time entry ID) for every time entry a stop/edit call is about.
+
+    The toggle track API is inconsistent. Depending on the verb/API endpoint they payload may need to refer
+        to a time entry with _just_ `id` or `time_entry_id`. Internal to lib-toggl it's _always_ `id` but for
+        the stop and edit service calls, it's always `ATTR_TIME_ENTRY_ID`.
+    Without explicit IDs, it's whatever the API key owner is running in the targeted workspaces (or all
+        tracked workspaces if nothing is targeted) according to the last poll; no request needed.
+    """
+    if ATTR_TIME_ENTRY_ID in call_data:
+        return [(call_data[ATTR_WORKSPACE_ID], call_data[ATTR_TIME_ENTRY_ID])]
+
+    if _has_target(call_data):
+        workspace_ids = _resolve_workspace_ids(hass, coordinator, call)
     else:
-        call_data[ATTR_ID] = call_data[ATTR_TIME_ENTRY_ID]
-        del call_data[ATTR_TIME_ENTRY_ID]
+        workspace_ids = coordinator.tracked_workspace_ids
+    return [
+        (workspace_id, te.id)
+        for workspace_id in sorted(workspace_ids)
+        if (te := coordinator.own_entry(workspace_id)) is not None
+    ]
 
 
 def _clean_call_data(call_data: dict[str, Any]) -> dict[str, Any]:
     """Remove any keys from call_data that are not expected by the lib-toggl API."""
-    if SERVICE_WORKSPACE_ID_ENTITY_ID in call_data:
-        del call_data[SERVICE_WORKSPACE_ID_ENTITY_ID]
+    for key in (SERVICE_WORKSPACE_ID_ENTITY_ID, ATTR_TIME_ENTRY_ID, *_TARGET_KEYS):
+        call_data.pop(key, None)
+    return call_data
+
+
+def _response(time_entries: list[TimeEntry]) -> dict:
+    """One time entry is returned as is; several are wrapped in a list."""
+    # Pydantic 1.x uses .dict() instead of model_dump()
+    if len(time_entries) == 1:
+        return time_entries[0].dict()
+    if not time_entries:
+        return {}
+    return {ATTR_TIME_ENTRIES: [te.dict() for te in time_entries]}
 
 
 def async_register_services(
     hass: HomeAssistant, coordinator: TogglTrackCoordinator
 ) -> None:
     """Register services for Toggl Track integration."""
+    profiler = coordinator.profiler
 
     async def handle_start_new_time_entry(call: ServiceCall) -> dict:
         """Handle creating a new Time Entry."""
 
         _LOGGER.debug("handle_start_new_time_entry() called")
+        coordinator.async_note_activity()
         # Call.data is immutable; copy before we clear SERVICE_WORKSPACE_ID_ENTITY_ID
         #   and set the workspace ID
         call_data = call.data.copy()
 
-        _handle_workspace_id(hass, call_data)
+        with profiler.span(SPAN_RESOLVE_TARGETS):
+            _handle_workspace_id(hass, coordinator, call, call_data)
         _clean_call_data(call_data)
 
-        new_time_entry = TimeEntry(**call_data)
+        with profiler.span(SPAN_BUILD_TIME_ENTRY):
+            new_time_entry = TimeEntry(**call_data)
         try:
-            created_time_entry = await coordinator.api.create_new_time_entry(
-                new_time_entry
+            created_time_entry = await coordinator.async_submit(
+                Priority.WRITE, coordinator.api.create_new_time_entry, new_time_entry
             )
             # Update entity immediately so we don't have to wait for the next poll
-            coordinator.async_set_updated_data(created_time_entry)
-
-        except ClientResponseError as err:
+            coordinator.async_apply_time_entry(created_time_entry)
+
+        except (
+            ClientError,
+            CircuitOpenError,
+            DispatcherShutdownError,
+            TimeoutError,
+        ) as err:
             # TODO: in lib-toggl catch he various 4XX family and raise a more specific error
             raise HomeAssistantError(f"Error creating Time Entry: {err}") from err
 
@@ -267,90 +461,319 @@ def async_register_services(
             return None
 
     async def handle_stop_new_time_entry(call: ServiceCall) -> dict:
-        """Handle stopping a Time Entry. Requires a workspace ID and a Time Entry ID."""
+        """Handle stopping a Time Entry.
+
+        Stops the given time entry or, without IDs, whatever is running in the targeted workspace(s).
+        """
         _LOGGER.debug("handle_stop_new_time_entry() called")
+        coordinator.async_note_activity()
 
         call_data = call.data.copy()
+        with profiler.span(SPAN_RESOLVE_TARGETS):
+            targets = _time_entry_ids(hass, coordinator, call, call_data)
+        if not targets:
+            # Nothing running; that's as stopped as it gets
+            _LOGGER.debug("No running Time Entry to stop")
+            return {}
 
-        _handle_workspace_id(hass, call_data)
-        _handle_time_entry_id(hass, call_data)
-        _clean_call_data(call_data)
-
-        te_to_stop = TimeEntry(**call_data)
-        try:
-            stopped_te = await coordinator.api.stop_time_entry(te_to_stop)
-        except ClientResponseError as err:
-            # TODO: in lib-toggl catch he various 4XX family and raise a more specific error
-            raise HomeAssistantError(f"Error stopping Time Entry: {err}") from err
+        stopped = []
+        for workspace_id, time_entry_id in targets:
+            te_to_stop = TimeEntry(workspace_id=workspace_id, id=time_entry_id)
+            try:
+                stopped_te = await coordinator.async_submit(
+                    Priority.WRITE, coordinator.api.stop_time_entry, te_to_stop
+                )
+            except (
+                ClientError,
+                CircuitOpenError,
+                DispatcherShutdownError,
+                TimeoutError,
+            ) as err:
+                # TODO: in lib-toggl catch he various 4XX family and raise a more specific error
+                raise HomeAssistantError(f"Error stopping Time Entry: {err}") from err
+
+            # Any poll that was in flight during the stop will be discarded so clear the entity now
+            if stopped_te is not None:
+                coordinator.async_apply_time_entry(stopped_te)
+                stopped.append(stopped_te)
 
         if call.return_response:
-            # Pydantic 1.x uses .dict() instead of model_dump()
-            return stopped_te.dict()
+            return _response(stopped)
         return {}
 
     async def handle_edit_new_time_entry(call: ServiceCall) -> dict:
         _LOGGER.debug("handle_edit_new_time_entry() called with: %s", call.data)
+        coordinator.async_note_activity()
         # Immutable so copy.
         call_data = call.data.copy()
 
-        _handle_workspace_id(hass, call_data)
-        _handle_time_entry_id(hass, call_data)
+        with profiler.span(SPAN_RESOLVE_TARGETS):
+            targets = _time_entry_ids(hass, coordinator, call, call_data)
+        if not targets:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="no_running_time_entry",
+            )
         _clean_call_data(call_data)
 
-        edited_te = TimeEntry(**call_data)
-        try:
-            edited_te = await coordinator.api.edit_time_entry(edited_te)
-            # Server returns the updated Time Entry so we can update the entity state directly / immediately
-            coordinator.async_set_updated_data(edited_te)
-        except ClientResponseError as err:
-            # TODO: in lib-toggl catch he various 4XX family and raise a more specific error
-            raise HomeAssistantError(f"Error editing Time Entry: {err}") from err
-        else:
+        edited = []
+        for workspace_id, time_entry_id in targets:
+            try:
+                # Entity state is updated as soon as the write is done; see coordinator
+                edited_te = await coordinator.async_edit_time_entry(
+                    {
+                        **call_data,
+                        ATTR_WORKSPACE_ID: workspace_id,
+                        ATTR_ID: time_entry_id,
+                    }
+                )
+            except (
+                ClientError,
+                CircuitOpenError,
+                DispatcherShutdownError,
+                TimeoutError,
+            ) as err:
+                # TODO: in lib-toggl catch he various 4XX family and raise a more specific error
+                raise HomeAssistantError(f"Error editing Time Entry: {err}") from err
             if edited_te is None:
                 _LOGGER.error("Failed to edit Time Entry")
                 raise HomeAssistantError("Failed to edit Time Entry")
+            edited.append(edited_te)
 
-            if call.return_response:
-                # Pydantic 1.x uses .dict() instead of model_dump()
-                return edited_te.dict()
-            return {}
+        if call.return_response:
+            return _response(edited)
+        return {}
 
-    # Bail if the service has already been registered
-    if not hass.services.has_service(DOMAIN, SERVICE_NEW_TIME_ENTRY):
-        _LOGGER.debug(
-            "Service '%s' not registered, doing so now", SERVICE_NEW_TIME_ENTRY
-        )
+    async def handle_get_summary(call: ServiceCall) -> dict:
+        """Return aggregated totals for a workspace from the Reports API."""
+        _LOGGER.debug("handle_get_summary() called with: %s", call.data)
+        coordinator.async_note_activity()
+        call_data = call.data.copy()
 
-        hass.services.async_register(
-            DOMAIN,
-            SERVICE_NEW_TIME_ENTRY,
-            handle_start_new_time_entry,
-            schema=All(NEW_TIME_ENTRY_SERVICE_SCHEMA, _new_te_xor_validator),
-            supports_response=SupportsResponse.OPTIONAL,
-        )
+        with profiler.span(SPAN_RESOLVE_TARGETS):
+            _handle_workspace_id(hass, coordinator, call, call_data)
 
-    if not hass.services.has_service(DOMAIN, SERVICE_STOP_TIME_ENTRY):
-        _LOGGER.debug(
-            "Service '%s' not registered, doing so now", SERVICE_STOP_TIME_ENTRY
+        try:
+            # User is waiting on this one so it goes ahead of background reads
+            report = await coordinator.async_get_summary(
+                int(call_data[ATTR_WORKSPACE_ID]),
+                call_data[ATTR_PERIOD],
+                call_data[ATTR_GROUPING],
+                priority=Priority.REFRESH,
+            )
+        except (
+            ClientError,
+            CircuitOpenError,
+            DispatcherShutdownError,
+            TimeoutError,
+        ) as err:
+            raise HomeAssistantError(f"Error fetching summary: {err}") from err
+
+        return report.as_dict()
+
+    async def handle_compute_report(call: ServiceCall) -> dict:
+        """Return totals grouped by workspace/project/tag/time bucket, computed from cached time entries."""
+        _LOGGER.debug("handle_compute_report() called with: %s", call.data)
+        coordinator.async_note_activity()
+
+        if ATTR_WORKSPACE_ID in call.data:
+            workspace_ids = [call.data[ATTR_WORKSPACE_ID]]
+        elif _has_target(call.data):
+            with profiler.span(SPAN_RESOLVE_TARGETS):
+                workspace_ids = _resolve_workspace_ids(hass, coordinator, call)
+        else:
+            workspace_ids = coordinator.tracked_workspace_ids
+
+        now = dt_util.utcnow()
+        # Naive datetimes are local time; default is the last 7 days including today
+        end = dt_util.as_utc(call.data.get(ATTR_END, now))
+        start = dt_util.as_utc(
+            call.data.get(ATTR_START)
+            or dt_util.start_of_local_day() - timedelta(days=6)
         )
+        if start >= end:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="start_not_before_end"
+            )
 
-        hass.services.async_register(
-            DOMAIN,
-            SERVICE_STOP_TIME_ENTRY,
-            handle_stop_new_time_entry,
-            schema=STOP_TIME_ENTRY_SERVICE_SCHEMA,
-            supports_response=SupportsResponse.OPTIONAL,
+        try:
+            # Only whatever isn't cached yet costs a request
+            await coordinator.async_get_history(start, end, priority=Priority.REFRESH)
+        except (
+            ClientError,
+            CircuitOpenError,
+            DispatcherShutdownError,
+            TimeoutError,
+        ) as err:
+            raise HomeAssistantError(f"Error fetching time entries: {err}") from err
+
+        return compute_report(
+            history_columns(coordinator.history),
+            start,
+            end,
+            now,
+            workspace_ids,
+            call.data[ATTR_GROUP_BY],
+        ).as_dict()
+
+    async def handle_profile(call: ServiceCall) -> dict:
+        """Time the next few polls and/or service calls; report goes to the config directory.
+
+        Waits until the profile is done, or times out, and returns the same summary that was written.
+        """
+        _LOGGER.debug("handle_profile() called with: %s", call.data)
+        # Polls won't come while polling is paused outside of active hours
+        coordinator.async_note_activity()
+
+        session = ProfileSession(
+            call.data[ATTR_CYCLES],
+            call.data[ATTR_SERVICE_CALLS],
+            call.data[ATTR_CPROFILE],
         )
+        try:
+            profiler.start(session)
+        except ProfileInProgressError as err:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="profile_in_progress"
+            ) from err
+        except ValueError as err:
+            # Something else (HA's profiler integration ...etc) already has cProfile going
+            raise HomeAssistantError(f"Unable to start cProfile: {err}") from err
 
-    if not hass.services.has_service(DOMAIN, SERVICE_EDIT_TIME_ENTRY):
-        _LOGGER.debug(
-            "Service '%s' not registered, doing so now", SERVICE_EDIT_TIME_ENTRY
+        try:
+            await asyncio.wait_for(session.done.wait(), call.data[ATTR_TIMEOUT])
+        except TimeoutError:
+            _LOGGER.info("Profile timed out; reporting what was captured so far")
+        finally:
+            if profiler.session is session:
+                profiler.stop()
+
+        summary = session.summary()
+        if session.profile is not None:
+            summary["top_functions"] = await hass.async_add_executor_job(
+                top_functions, session.profile, PROFILE_TOP_FUNCTIONS
+            )
+        path = hass.config.path(
+            f"{DOMAIN}_profile_{dt_util.as_local(session.started):%Y%m%d_%H%M%S}.json"
         )
+        try:
+            return await hass.async_add_executor_job(
+                write_report, path, summary, session.profile
+            )
+        except OSError as err:
+            # Still worth returning what was captured
+            _LOGGER.error("Unable to write profile report to %s: %s", path, err)
+            return summary
+
+    async def handle_record_traffic(call: ServiceCall) -> dict:
+        """Record every API request, poll and service call for a while; recording goes to the config directory.
+
+        Waits until the recording is done and returns how much was recorded.
+        """
+        _LOGGER.debug("handle_record_traffic() called with: %s", call.data)
+        if coordinator.recorder is not None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="recording_in_progress"
+            )
+        started = dt_util.now()
+        recorder = coordinator.recorder = TrafficRecorder()
+        recorder.start(coordinator.api)
+        try:
+            await asyncio.sleep(call.data[ATTR_DURATION])
+        finally:
+            recorder.stop()
+            coordinator.recorder = None
 
+        path = hass.config.path(f"{DOMAIN}_traffic_{started:%Y%m%d_%H%M%S}.json")
+        try:
+            await hass.async_add_executor_job(write_traffic, path, recorder.as_dict())
+        except OSError as err:
+            raise HomeAssistantError(
+                f"Unable to write recording to {path}: {err}"
+            ) from err
+        return {**recorder.summary(), "recording": path}
+
+    def _recorded(service: str, handler):
+        """Note every call in the traffic recording, if there is one."""
+
+        async def _handler(call: ServiceCall):
+            if coordinator.recorder is not None:
+                coordinator.recorder.note_service(service, call.data)
+            return await handler(call)
+
+        return _handler
+
+    def _register(
+        service: str, handler, schema, supports_response: SupportsResponse
+    ) -> None:
+        """Register a service; timed when profiling and noted when recording."""
+        # Replaces whatever was registered before; that may be bound to a coordinator that has since shut down
+        _LOGGER.debug("Registering service '%s'", service)
         hass.services.async_register(
             DOMAIN,
-            SERVICE_EDIT_TIME_ENTRY,
-            handle_edit_new_time_entry,
-            schema=EDIT_TIME_ENTRY_SERVICE_SCHEMA,
-            supports_response=SupportsResponse.OPTIONAL,
+            service,
+            profiler.wrap_service(service, _recorded(service, handler)),
+            schema=profiler.timed(f"{SPAN_SERVICE}{service}{SPAN_VALIDATE}", schema),
+            supports_response=supports_response,
         )
+
+    _register(
+        SERVICE_NEW_TIME_ENTRY,
+        handle_start_new_time_entry,
+        All(NEW_TIME_ENTRY_SERVICE_SCHEMA, _new_te_xor_validator),
+        SupportsResponse.OPTIONAL,
+    )
+    _register(
+        SERVICE_STOP_TIME_ENTRY,
+        handle_stop_new_time_entry,
+        STOP_TIME_ENTRY_SERVICE_SCHEMA,
+        SupportsResponse.OPTIONAL,
+    )
+    _register(
+        SERVICE_EDIT_TIME_ENTRY,
+        handle_edit_new_time_entry,
+        EDIT_TIME_ENTRY_SERVICE_SCHEMA,
+        SupportsResponse.OPTIONAL,
+    )
+    _register(
+        SERVICE_GET_SUMMARY,
+        handle_get_summary,
+        GET_SUMMARY_SERVICE_SCHEMA,
+        SupportsResponse.ONLY,
+    )
+    _register(
+        SERVICE_COMPUTE_REPORT,
+        handle_compute_report,
+        COMPUTE_REPORT_SERVICE_SCHEMA,
+        SupportsResponse.ONLY,
+    )
+
+    # Neither of these are timed or recorded; they'd never see the end of their own call
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        handle_profile,
+        schema=PROFILE_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRAFFIC,
+        handle_record_traffic,
+        schema=RECORD_TRAFFIC_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Call once a config entry's coordinator is gone from hass.data.
+
+    Services are bound to a single coordinator; they move over to another loaded entry's or, if that was the
+        last one, are removed.
+    """
+    if coordinators := list(hass.data.get(DOMAIN, {}).values()):
+        async_register_services(hass, coordinators[0])
+        return
+    for service in SERVICES:
+        hass.services.async_remove(DOMAIN, service)
@@ -0,0 +1,178 @@
+"""Hours tracked per workspace, project and tag as Home Assistant long-term statistics.
+
+The workspace sensors only show what's running right now. Rather than have the recorder keep every
+state change (and all the attributes that go with it) forever, completed hours are imported as hourly
+external statistics. Those are what the statistics/energy style graphs are built from.
+
+Statistics are only ever appended. An hour is imported once everything in it has stopped; edits made to
+older entries after that are not reflected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+import logging
+from weakref import WeakKeyDictionary
+
+from lib_toggl.time_entries import TimeEntry
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_WORKSPACES, DOMAIN, STATISTICS_BACKFILL_DAYS
+from .coordinator import TogglTrackCoordinator
+from .history import floor_hour, split_by_hour
+
+_LOGGER = logging.getLogger(__name__)
+
+_HOUR = timedelta(hours=1)
+
+# One import at a time per coordinator; each carries on from where the last one's rows ended
+_LOCKS: WeakKeyDictionary[TogglTrackCoordinator, asyncio.Lock] = WeakKeyDictionary()
+
+
+def _statistic_id(workspace_id: int, kind: str | None = None, key: str = "") -> str:
+    """External statistic IDs look like entity IDs but with a ':' after the domain."""
+    if kind is None:
+        return f"{DOMAIN}:workspace_{workspace_id}"
+    return f"{DOMAIN}:workspace_{workspace_id}_{kind}_{key}"
+
+
+def _keys(te: TimeEntry) -> Iterable[str]:
+    """Statistic IDs that an entry counts towards."""
+    yield _statistic_id(te.workspace_id)
+    yield _statistic_id(te.workspace_id, "project", str(te.project_id or "none"))
+    for tag_id in te.tag_ids or []:
+        yield _statistic_id(te.workspace_id, "tag", str(tag_id))
+
+
+def _names(workspace_name: str, entries: Iterable[TimeEntry]) -> dict[str, str]:
+    """Human friendly names for each statistic ID that `entries` count towards."""
+    names = {}
+    for te in entries:
+        names[_statistic_id(te.workspace_id)] = f"{workspace_name} tracked time"
+        project = te.project_id or "none"
+        names[_statistic_id(te.workspace_id, "project", str(project))] = (
+            f"{workspace_name} project {project} tracked time"
+        )
+        # Same note as in sensor.py; tags and tag IDs are assumed to line up
+        for tag_id, tag in zip(te.tag_ids or [], te.tags or [], strict=False):
+            names[_statistic_id(te.workspace_id, "tag", str(tag_id))] = (
+                f"{workspace_name} tag {tag} tracked time"
+            )
+    return names
+
+
+async def _async_last_sum(
+    hass: HomeAssistant, statistic_id: str
+) -> tuple[datetime | None, float]:
+    """Return the start of the last imported hour and the running total at that point."""
+    last = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, statistic_id, True, {"sum"}
+    )
+    if not (rows := last.get(statistic_id)):
+        return None, 0.0
+    return dt_util.utc_from_timestamp(rows[0]["start"]), rows[0].get("sum") or 0.0
+
+
+async def async_import_statistics(
+    hass: HomeAssistant,
+    coordinator: TogglTrackCoordinator,
+    _now: datetime | None = None,
+) -> None:
+    """Import every completed hour that hasn't been imported yet.
+
+    The workspace total gets a row for every hour, tracked or not; that's what marks how far the
+        import has got. Projects and tags only get rows for hours that had time tracked against them.
+    """
+    async with _LOCKS.setdefault(coordinator, asyncio.Lock()):
+        await _async_import(hass, coordinator)
+        # Otherwise the next run could read the last rows from before these were written
+        await get_instance(hass).async_block_till_done()
+
+
+async def _async_import(
+    hass: HomeAssistant, coordinator: TogglTrackCoordinator
+) -> None:
+    """See async_import_statistics()."""
+    now = dt_util.utcnow()
+    workspace_names: dict[str, str] = (
+        coordinator.config_entry.options.get(CONF_WORKSPACES, {})
+        if coordinator.config_entry
+        else {}
+    )
+    for workspace_id in coordinator.tracked_workspace_ids:
+        workspace_name = workspace_names.get(str(workspace_id), str(workspace_id))
+        # Hours that the running entry has touched aren't done yet. Only the API key owner's; that's all
+        #   that's imported and a teammate's all day timer shouldn't hold things up
+        cutoff = floor_hour(now)
+        if (running := coordinator.own_entry(workspace_id)) is not None and (
+            running.start is not None
+        ):
+            cutoff = min(cutoff, floor_hour(running.start))
+        total_id = _statistic_id(workspace_id)
+        last_start, _ = await _async_last_sum(hass, total_id)
+        start = (
+            last_start + _HOUR
+            if last_start is not None
+            else floor_hour(now - timedelta(days=STATISTICS_BACKFILL_DAYS))
+        )
+        if start >= cutoff:
+            continue
+
+        _LOGGER.debug(
+            "Importing statistics for workspace %s from %s to %s",
+            workspace_id,
+            start,
+            cutoff,
+        )
+        try:
+            # Rows are never rewritten so every last bit of the range has to have been fetched
+            entries = await coordinator.async_get_history(
+                start, cutoff, workspace_id, exact=True
+            )
+        # pylint: disable=broad-except
+        except Exception as err:  # noqa: BLE001
+            # Nothing imported; next run picks up from the same place
+            _LOGGER.warning(
+                "Unable to fetch time entries for workspace %s: %s", workspace_id, err
+            )
+            continue
+        per_hour = split_by_hour(entries, start, cutoff, _keys)
+        # Workspace total gets every hour so the next run knows where to pick up from
+        total = per_hour.setdefault(total_id, {})
+        hour = start
+        while hour < cutoff:
+            total.setdefault(hour, 0.0)
+            hour += _HOUR
+
+        names = _names(workspace_name, entries)
+        names.setdefault(total_id, f"{workspace_name} tracked time")
+        for statistic_id, seconds in per_hour.items():
+            _, running_sum = await _async_last_sum(hass, statistic_id)
+            rows: list[StatisticData] = []
+            for hour in sorted(seconds):
+                hours = seconds[hour] / 3600
+                running_sum += hours
+                rows.append(StatisticData(start=hour, state=hours, sum=running_sum))
+            async_add_external_statistics(
+                hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=names.get(statistic_id),
+                    source=DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=UnitOfTime.HOURS,
+                ),
+                rows,
+            )
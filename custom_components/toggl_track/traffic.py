@@ -0,0 +1,423 @@
+"""Record Toggl API traffic and play it back later.
+
+Every lib-toggl call, and the few endpoints this integration calls itself, end up in one of the client's
+do_*_request methods. While recording, those are wrapped so that each request is saved with when it was
+made, how long it took and what came back (or which error), along with every poll and service call. Names,
+descriptions, tags, emails ...etc are replaced with salted hashes; the same value always gets the same hash within
+a recording so grouping by project/tag still works. The API key is never part of a request so never saved.
+
+For playback, the same methods answer from the recording instead of the network while `async_replay()` runs
+the polls and service calls through the coordinator and the registered services, at the original pace or
+faster. Bursts, slow responses and 429 storms from production can then be run offline and two builds can be
+compared on exactly the same traffic. Requests are matched to the recording by method and URL, in order;
+once a URL runs out, its last response is repeated. Anything that wasn't recorded gets a 404.
+
+Only the traffic is sped up; circuit breaker cooldowns and the poll interval still run on the wall clock.
+Retry-After is scaled along with everything else.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Coroutine
+import copy
+import hashlib
+import json
+import logging
+import secrets
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientResponseError, RequestInfo
+from aiohttp.client_exceptions import ClientError
+from lib_toggl.client import Toggl
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from homeassistant.core import HomeAssistant, SupportsResponse
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .profiler import SPAN_POLL, SPAN_SERVICE, SpanStats
+
+if TYPE_CHECKING:
+    # Coordinator holds the recorder
+    from .coordinator import TogglTrackCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+TRAFFIC_VERSION = 1
+
+EVENT_POLL = "poll"
+EVENT_REQUEST = "request"
+EVENT_SERVICE = "service"
+
+# Client method -> HTTP method
+_METHODS = {
+    "do_get_request": "GET",
+    "do_post_request": "POST",
+    "do_patch_request": "PATCH",
+    "do_put_request": "PUT",
+}
+
+# Anywhere in a request, response or service call; IDs, times and durations are kept as is
+REDACT_KEYS = frozenset(
+    {
+        "api_token",
+        "client_name",
+        "description",
+        "email",
+        "fullname",
+        "image_url",
+        "name",
+        "openid_email",
+        "project_name",
+        "title",
+        "user_name",
+    }
+)
+
+# Lists of names; tag names are often client or project names
+REDACT_LIST_KEYS = frozenset({"tags"})
+
+
+def redact(value: Any, salt: str) -> Any:
+    """Replace the values of REDACT_KEYS and the strings in REDACT_LIST_KEYS with a hash, anywhere in `value`."""
+    if isinstance(value, dict):
+        return {k: _redact_value(k, v, salt) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v, salt) for v in value]
+    return value
+
+
+def _redact_value(key: str, value: Any, salt: str) -> Any:
+    if key in REDACT_KEYS and isinstance(value, str | int | float) and value != "":
+        return _hash(value, salt)
+    if key in REDACT_LIST_KEYS and isinstance(value, list):
+        return [
+            _hash(v, salt) if isinstance(v, str) and v != "" else redact(v, salt)
+            for v in value
+        ]
+    return redact(value, salt)
+
+
+def _hash(value: Any, salt: str) -> str:
+    return f"redacted-{hashlib.sha256(f'{salt}{value}'.encode()).hexdigest()[:12]}"
+
+
+def _jsonable(value: Any) -> Any:
+    """Datetimes, enums ...etc as strings; the same as what would be written to the file."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def _request_body(method: str, args: tuple, kwargs: dict[str, Any]) -> Any:
+    """Query parameters for GET, parsed JSON body for everything else."""
+    body = next(iter(kwargs.values()), args[0] if args else None)
+    if method != "GET" and isinstance(body, str):
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return body
+
+
+class _Patched:
+    """Replaces the client's do_*_request methods and puts back whatever was there before."""
+
+    def __init__(self) -> None:
+        self._api: Toggl | None = None
+        self._originals: dict[str, Any] = {}
+
+    def _install(
+        self, api: Toggl, factory: Callable[[str, Any], Callable[..., Any]]
+    ) -> None:
+        self._api = api
+        self._originals = {name: api.__dict__.get(name) for name in _METHODS}
+        for name in _METHODS:
+            setattr(api, name, factory(name, getattr(api, name)))
+
+    def _uninstall(self) -> None:
+        if (api := self._api) is None:
+            return
+        for name, original in self._originals.items():
+            if original is None:
+                api.__dict__.pop(name, None)
+            else:
+                setattr(api, name, original)
+        self._api = None
+
+
+class TrafficRecorder(_Patched):
+    """Saves every request made through an API client, with polls and service calls in between."""
+
+    def __init__(self, salt: str | None = None) -> None:
+        """Each recording gets its own salt unless one is given."""
+        super().__init__()
+        self._salt = salt or secrets.token_hex(8)
+        self._started = 0.0
+        self.recorded: str | None = None
+        self.events: list[dict[str, Any]] = []
+
+    def start(self, api: Toggl) -> None:
+        """Start recording `api`'s requests."""
+        self._install(api, self._wrap)
+        self._started = monotonic()
+        self.recorded = dt_util.utcnow().isoformat()
+
+    def stop(self) -> None:
+        """Stop recording; the client goes back to how it was."""
+        self._uninstall()
+
+    def _offset(self) -> float:
+        return round(monotonic() - self._started, 3)
+
+    def _wrap(
+        self, name: str, func: Callable[..., Coroutine[Any, Any, Any]]
+    ) -> Callable[..., Coroutine[Any, Any, Any]]:
+        method = _METHODS[name]
+
+        async def _request(url: str, *args: Any, **kwargs: Any) -> Any:
+            # Saved when the request is made so that events stay in order
+            event: dict[str, Any] = {
+                "t": self._offset(),
+                "type": EVENT_REQUEST,
+                "method": method,
+                "url": url,
+                "body": redact(
+                    _jsonable(_request_body(method, args, kwargs)), self._salt
+                ),
+            }
+            self.events.append(event)
+            start = monotonic()
+            try:
+                response = await func(url, *args, **kwargs)
+            except ClientResponseError as err:
+                event["status"] = err.status
+                if err.headers and (retry_after := err.headers.get("Retry-After")):
+                    event["retry_after"] = retry_after
+                raise
+            # Timeouts, connection errors and requests cancelled by a deadline or hedge
+            except BaseException as err:
+                event["error"] = type(err).__name__
+                raise
+            finally:
+                event["latency"] = round(monotonic() - start, 3)
+            event["status"] = 200
+            event["response"] = redact(_jsonable(response), self._salt)
+            return response
+
+        return _request
+
+    def note_poll(self) -> None:
+        """Called at the start of every poll."""
+        self.events.append({"t": self._offset(), "type": EVENT_POLL})
+
+    def note_service(self, service: str, data: Any) -> None:
+        """Called with the validated data of every service call."""
+        self.events.append(
+            {
+                "t": self._offset(),
+                "type": EVENT_SERVICE,
+                "service": service,
+                "data": redact(_jsonable(dict(data)), self._salt),
+            }
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Everything there is to write to the file."""
+        return {
+            "version": TRAFFIC_VERSION,
+            "recorded": self.recorded,
+            "duration": self._offset(),
+            "events": self.events,
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """How much was recorded."""
+        counts = {EVENT_POLL: 0, EVENT_REQUEST: 0, EVENT_SERVICE: 0}
+        for event in self.events:
+            counts[event["type"]] += 1
+        return {
+            "recorded": self.recorded,
+            "duration": self._offset(),
+            "polls": counts[EVENT_POLL],
+            "requests": counts[EVENT_REQUEST],
+            "service_calls": counts[EVENT_SERVICE],
+            "errors": sum(
+                1
+                for event in self.events
+                if "error" in event or event.get("status", 200) != 200
+            ),
+        }
+
+
+def write_traffic(path: str, traffic: dict[str, Any]) -> None:
+    """Write a recording. Blocking."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(traffic, file, indent=2)
+
+
+def load_traffic(path: str) -> dict[str, Any]:
+    """Read a recording. Blocking."""
+    with open(path, encoding="utf-8") as file:
+        traffic = json.load(file)
+    if traffic.get("version") != TRAFFIC_VERSION:
+        raise ValueError(f"Unsupported recording version: {traffic.get('version')}")
+    return traffic
+
+
+def _request_info(method: str, url: str) -> RequestInfo:
+    return RequestInfo(URL(url), method, CIMultiDictProxy(CIMultiDict()))
+
+
+class ReplayTransport(_Patched):
+    """Answers an API client's requests from a recording, with the recorded latency."""
+
+    def __init__(self, traffic: dict[str, Any], speed: float = 1.0) -> None:
+        """Latency and Retry-After are divided by `speed`."""
+        super().__init__()
+        self._speed = speed
+        self._responses: dict[tuple[str, str], deque[dict[str, Any]]] = {}
+        self._last: dict[tuple[str, str], dict[str, Any]] = {}
+        for event in traffic["events"]:
+            if event["type"] == EVENT_REQUEST:
+                key = self._key(event["method"], event["url"])
+                self._responses.setdefault(key, deque()).append(event)
+        self.served = 0
+        self.unmatched = 0
+        self.statuses: dict[str, int] = {}
+
+    @staticmethod
+    def _key(method: str, url: str) -> tuple[str, str]:
+        # Query strings carry dates; they won't be the same on another day
+        return method, url.split("?", 1)[0]
+
+    def install(self, api: Toggl) -> None:
+        """Answer `api`'s requests from the recording instead of the network."""
+        self._install(api, lambda name, _: self._responder(_METHODS[name]))
+
+    def uninstall(self) -> None:
+        """Back to the network."""
+        self._uninstall()
+
+    def _responder(self, method: str) -> Callable[..., Coroutine[Any, Any, Any]]:
+        async def _request(url: str, *args: Any, **kwargs: Any) -> Any:
+            return await self.async_request(method, url)
+
+        return _request
+
+    async def async_request(self, method: str, url: str) -> Any:
+        """Wait as long as the recorded request took, then answer the same way it did."""
+        key = self._key(method, url)
+        if queue := self._responses.get(key):
+            event = self._last[key] = queue.popleft()
+        elif (event := self._last.get(key)) is None:
+            self.unmatched += 1
+            _LOGGER.debug("No recorded response for %s %s", method, url)
+            raise ClientResponseError(
+                _request_info(method, url), (), status=404, message="Not recorded"
+            )
+
+        await asyncio.sleep(event.get("latency", 0) / self._speed)
+        self.served += 1
+        if (error := event.get("error")) is not None:
+            self.statuses[error] = self.statuses.get(error, 0) + 1
+            if error in ("CancelledError", "TimeoutError"):
+                # Whoever was waiting gave up; the same deadline will most likely give up again
+                raise TimeoutError
+            raise ClientError(error)
+
+        status = event.get("status", 200)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if status != 200:
+            headers = CIMultiDict()
+            if (retry_after := event.get("retry_after")) is not None:
+                try:
+                    retry_after = str(float(retry_after) / self._speed)
+                except ValueError:
+                    # HTTP date; leave it
+                    pass
+                headers["Retry-After"] = retry_after
+            raise ClientResponseError(
+                _request_info(method, url),
+                (),
+                status=status,
+                headers=CIMultiDictProxy(headers),
+            )
+        # Callers are free to change what they get back
+        return copy.deepcopy(event.get("response"))
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """How the recording held up."""
+        return {
+            "requests": self.served,
+            "unmatched": self.unmatched,
+            "statuses": dict(self.statuses),
+        }
+
+
+async def async_replay(
+    hass: HomeAssistant,
+    coordinator: TogglTrackCoordinator,
+    traffic: dict[str, Any],
+    speed: float = 1.0,
+) -> dict[str, Any]:
+    """Play back the polls and service calls of a recording; requests are answered from it too.
+
+    Polls and service calls start at their recorded time (divided by `speed`) whether or not the previous
+        ones are done, same as they did originally. Returns how long each took and how the requests went.
+    """
+    transport = ReplayTransport(traffic, speed)
+    transport.install(coordinator.api)
+    timings: dict[str, SpanStats] = {}
+    failures: dict[str, int] = {}
+
+    async def _timed(name: str, coro: Coroutine[Any, Any, Any]) -> None:
+        start = perf_counter()
+        try:
+            await coro
+        # pylint: disable=broad-except
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.debug("%s failed during replay: %s", name, err)
+            failures[name] = failures.get(name, 0) + 1
+        finally:
+            timings.setdefault(name, SpanStats()).add(perf_counter() - start)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks: list[asyncio.Task] = []
+    try:
+        for event in traffic["events"]:
+            if event["type"] == EVENT_REQUEST:
+                continue
+            if (delay := started + event["t"] / speed - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            if event["type"] == EVENT_POLL:
+                coro = _timed(SPAN_POLL, coordinator.async_refresh())
+            else:
+                service = event["service"]
+                coro = _timed(
+                    f"{SPAN_SERVICE}{service}",
+                    hass.services.async_call(
+                        DOMAIN,
+                        service,
+                        event["data"],
+                        blocking=True,
+                        return_response=hass.services.supports_response(DOMAIN, service)
+                        is not SupportsResponse.NONE,
+                    ),
+                )
+            tasks.append(hass.async_create_task(coro))
+        await asyncio.gather(*tasks)
+    finally:
+        transport.uninstall()
+
+    return {
+        "speed": speed,
+        "wall_time": round(loop.time() - started, 3),
+        "timings": {name: stats.as_dict() for name, stats in timings.items()},
+        "failures": failures,
+        **transport.metrics,
+    }
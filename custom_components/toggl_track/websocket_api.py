@@ -0,0 +1,210 @@
+"""Websocket commands for dashboard cards.
+
+Cards that want more than what fits in a sensor's state can subscribe to running time entries and query
+history and summaries directly. Everything is answered from what the coordinator already has (or fetches
+once for everybody) so a dozen open browser tabs cost the same number of API requests as one.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from aiohttp.client_exceptions import ClientError
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .breaker import CircuitOpenError
+from .const import (
+    ATTR_GROUPING,
+    ATTR_PERIOD,
+    ATTR_TIME_ENTRIES,
+    ATTR_WORKSPACE_ID,
+    DOMAIN,
+    WS_QUERY_MAX_PAGE_SIZE,
+)
+from .coordinator import TogglTrackCoordinator, coordinator_for_workspace
+from .dispatcher import DispatcherShutdownError, Priority
+from .reports import SummaryGrouping, SummaryPeriod
+
+QUERY_HISTORY = "history"
+QUERY_SUMMARY = "summary"
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Register the websocket commands; once, not per config entry."""
+    websocket_api.async_register_command(hass, ws_subscribe)
+    websocket_api.async_register_command(hass, ws_query)
+
+
+def _coordinators(hass: HomeAssistant) -> list[TogglTrackCoordinator]:
+    """Every loaded config entry's coordinator."""
+    return list(hass.data.get(DOMAIN, {}).values())
+
+
+def _snapshot(
+    coordinator: TogglTrackCoordinator, workspace_ids: list[int]
+) -> dict[int, list[dict[str, Any]]]:
+    """Running entries per workspace, ready to send."""
+    # Pydantic 1.x uses .dict() instead of model_dump()
+    return {
+        workspace_id: [te.dict() for te in coordinator.running_entries(workspace_id)]
+        for workspace_id in workspace_ids
+    }
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+        vol.Optional(ATTR_WORKSPACE_ID): cv.positive_int,
+    }
+)
+@callback
+def ws_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Send the running entries now and then only the workspaces that changed after each poll.
+
+    Without a workspace ID, every tracked workspace of every config entry is included.
+    """
+    if ATTR_WORKSPACE_ID in msg:
+        coordinator = coordinator_for_workspace(hass, msg[ATTR_WORKSPACE_ID])
+        if coordinator is None:
+            connection.send_error(
+                msg["id"], websocket_api.ERR_NOT_FOUND, "Workspace not found"
+            )
+            return
+        targets = [(coordinator, [msg[ATTR_WORKSPACE_ID]])]
+    else:
+        targets = [(c, c.tracked_workspace_ids) for c in _coordinators(hass)]
+
+    unsubs = []
+    for coordinator, workspace_ids in targets:
+        last = _snapshot(coordinator, workspace_ids)
+
+        @callback
+        def _async_push(
+            coordinator: TogglTrackCoordinator = coordinator,
+            workspace_ids: list[int] = workspace_ids,
+            last: dict[int, list[dict[str, Any]]] = last,
+        ) -> None:
+            """Called on every coordinator update; only send what's different."""
+            current = _snapshot(coordinator, workspace_ids)
+            changed = {w: e for w, e in current.items() if last.get(w) != e}
+            if not changed:
+                return
+            last.update(changed)
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"], {"running": changed, "stale": coordinator.stale}
+                )
+            )
+
+        unsubs.append(coordinator.async_add_listener(_async_push))
+
+    @callback
+    def _async_unsub() -> None:
+        for unsub in unsubs:
+            unsub()
+
+    connection.subscriptions[msg["id"]] = _async_unsub
+    connection.send_result(msg["id"])
+    # Full picture first; every event after this is a diff against it
+    initial: dict[int, list[dict[str, Any]]] = {}
+    stale = False
+    for coordinator, workspace_ids in targets:
+        initial.update(_snapshot(coordinator, workspace_ids))
+        stale = stale or coordinator.stale
+    connection.send_message(
+        websocket_api.event_message(msg["id"], {"running": initial, "stale": stale})
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/query",
+        vol.Required("query"): vol.In([QUERY_HISTORY, QUERY_SUMMARY]),
+        vol.Required(ATTR_WORKSPACE_ID): cv.positive_int,
+        # History
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional("limit", default=WS_QUERY_MAX_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=WS_QUERY_MAX_PAGE_SIZE)
+        ),
+        # Summary
+        vol.Optional(ATTR_PERIOD, default=SummaryPeriod.WEEK): vol.Coerce(
+            SummaryPeriod
+        ),
+        vol.Optional(ATTR_GROUPING, default=SummaryGrouping.PROJECTS): vol.Coerce(
+            SummaryGrouping
+        ),
+    }
+)
+@websocket_api.async_response
+async def ws_query(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return a page of time entries or a summary report for a workspace.
+
+    History pages are oldest first; `next_offset` is null on the last page.
+    """
+    workspace_id = msg[ATTR_WORKSPACE_ID]
+    if (coordinator := coordinator_for_workspace(hass, workspace_id)) is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Workspace not found"
+        )
+        return
+
+    try:
+        if msg["query"] == QUERY_SUMMARY:
+            # Somebody is looking at this so it goes ahead of background reads
+            report = await coordinator.async_get_summary(
+                workspace_id, msg[ATTR_PERIOD], msg[ATTR_GROUPING], Priority.REFRESH
+            )
+            connection.send_result(msg["id"], report.as_dict())
+            return
+
+        if "start" not in msg or "end" not in msg:
+            connection.send_error(
+                msg["id"],
+                websocket_api.ERR_INVALID_FORMAT,
+                "History queries need a start and an end",
+            )
+            return
+        entries = await coordinator.async_get_history(
+            dt_util.as_utc(msg["start"]),
+            dt_util.as_utc(msg["end"]),
+            workspace_id,
+            priority=Priority.REFRESH,
+        )
+    except (
+        ClientError,
+        CircuitOpenError,
+        DispatcherShutdownError,
+        TimeoutError,
+    ) as err:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_HOME_ASSISTANT_ERROR, str(err)
+        )
+        return
+
+    offset, limit = msg["offset"], msg["limit"]
+    page = entries[offset : offset + limit]
+    connection.send_result(
+        msg["id"],
+        {
+            # Pydantic 1.x uses .dict() instead of model_dump()
+            ATTR_TIME_ENTRIES: [te.dict() for te in page],
+            "total": len(entries),
+            "next_offset": offset + limit if offset + limit < len(entries) else None,
+        },
+    )
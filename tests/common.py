@@ -0,0 +1,61 @@
+"""Helpers for the tests that set up a config entry in Home Assistant."""
+
+from contextlib import ExitStack
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch
+
+from lib_toggl.account import Account
+from lib_toggl.time_entries import TimeEntry
+from lib_toggl.workspace import Workspace
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.toggl_track.const import DOMAIN
+
+WORKSPACE_ID = 111
+RUNNING = TimeEntry(
+    id=5,
+    workspace_id=WORKSPACE_ID,
+    description="Working",
+    duration=-1,
+    start=datetime(2026, 10, 19, 8, tzinfo=UTC),
+    user_id=9,
+)
+
+
+def patch_toggl(**overrides) -> tuple[ExitStack, dict[str, AsyncMock]]:
+    """Patch lib-toggl's client so that setup and the services never reach the API."""
+    mocks = {
+        "get_current_time_entry": AsyncMock(return_value=RUNNING),
+        "get_workspaces": AsyncMock(
+            return_value=[Workspace.construct(id=WORKSPACE_ID, name="Main")]
+        ),
+        "get_account_details": AsyncMock(
+            return_value=Account.construct(id=9, email="a@b.c")
+        ),
+        "stop_time_entry": AsyncMock(return_value=RUNNING),
+        "create_new_time_entry": AsyncMock(return_value=RUNNING),
+        "get_time_entries": AsyncMock(return_value=[]),
+        "do_get_request": AsyncMock(return_value=[]),
+        "do_post_request": AsyncMock(return_value=[]),
+        **overrides,
+    }
+    stack = ExitStack()
+    for name, mock in mocks.items():
+        stack.enter_context(patch(f"lib_toggl.client.Toggl.{name}", mock))
+    return stack, mocks
+
+
+async def setup_entry(hass, options=None) -> MockConfigEntry:
+    """Add and set up a config entry tracking WORKSPACE_ID."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=1,
+        minor_version=1,
+        unique_id="9",
+        data={"api_key": "x", "scan_interval": 120},
+        options=options or {"workspaces": {str(WORKSPACE_ID): "Main"}},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
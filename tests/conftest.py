@@ -0,0 +1,16 @@
+"""Fixtures for the Toggl Track tests."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(request):
+    """Let Home Assistant load the integration from custom_components.
+
+    Only for tests that use hass; that fixture also sets a time zone the plain tests don't expect.
+    """
+    if "recorder_mock" in request.fixturenames:
+        # Its database has to be set up before hass is
+        request.getfixturevalue("recorder_mock")
+    if "hass" in request.fixturenames:
+        request.getfixturevalue("enable_custom_integrations")
@@ -0,0 +1,29 @@
+"""Test workspace activity parsing."""
+
+from custom_components.toggl_track.activity import _parse_activity
+
+
+def test_only_running_entries_are_kept():
+    """Stopped entries are dropped and the workspace ID is filled in."""
+    entries = _parse_activity(
+        111,
+        [
+            {
+                "time_entry_id": 1,
+                "user_id": 9,
+                "description": "Running",
+                "duration": -1,
+                "start": "2026-10-19T08:00:00Z",
+                "stop": None,
+            },
+            {
+                "time_entry_id": 2,
+                "user_id": 10,
+                "description": "Done",
+                "duration": 60,
+                "start": "2026-10-19T07:00:00Z",
+                "stop": "2026-10-19T07:01:00Z",
+            },
+        ],
+    )
+    assert [(e.id, e.workspace_id, e.user_id) for e in entries] == [(1, 111, 9)]
@@ -0,0 +1,182 @@
+"""Test overtime, idle and daily target alerts."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+
+from aiohttp import ClientError
+from lib_toggl.time_entries import TimeEntry
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.toggl_track.alerts import (
+    AlertKind,
+    AlertState,
+    AlertThresholds,
+    evaluate,
+    tracked_today,
+)
+from custom_components.toggl_track.const import DOMAIN, EVENT_ALERT
+from custom_components.toggl_track.schedule import ActiveHours
+
+from .common import RUNNING, WORKSPACE_ID, patch_toggl, setup_entry
+
+# 2026-10-19 is a Monday; default time zone is UTC
+_NOW = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+_MIDNIGHT = datetime(2026, 10, 20, 0, 0, tzinfo=UTC)
+
+
+def _entry(te_id, start, minutes=None):
+    return TimeEntry(
+        id=te_id,
+        workspace_id=1,
+        start=start,
+        stop=start + timedelta(minutes=minutes) if minutes is not None else None,
+        duration=minutes * 60 if minutes is not None else -1,
+    )
+
+
+def test_thresholds_from_options():
+    """Missing or 0 is off."""
+    thresholds = AlertThresholds.from_options(
+        {"overtime_minutes": 90, "idle_minutes": 0, "daily_target_hours": 7.5}
+    )
+    assert thresholds.overtime == timedelta(minutes=90)
+    assert thresholds.idle is None
+    assert thresholds.daily_target == timedelta(hours=7.5)
+    assert thresholds.enabled == [AlertKind.OVERTIME, AlertKind.DAILY_TARGET]
+    assert AlertThresholds.from_options({}).enabled == []
+
+
+def test_tracked_today_only_counts_today():
+    """Only the part of an entry after midnight counts; the running entry counts up to now."""
+    entries = [
+        _entry(1, datetime(2026, 10, 18, 23, 0, tzinfo=UTC), 120),
+        _entry(2, datetime(2026, 10, 19, 9, 0, tzinfo=UTC), 30),
+    ]
+    running = _entry(3, datetime(2026, 10, 19, 11, 30, tzinfo=UTC))
+    assert tracked_today(entries, None, _NOW) == timedelta(minutes=90)
+    assert tracked_today(entries, running, _NOW) == timedelta(minutes=120)
+
+
+def test_overtime_and_daily_target():
+    """Each alert says when it could next change by itself."""
+    thresholds = AlertThresholds(
+        overtime=timedelta(hours=1), daily_target=timedelta(hours=2)
+    )
+    entries = [_entry(1, datetime(2026, 10, 19, 8, 0, tzinfo=UTC), 60)]
+    running = _entry(2, datetime(2026, 10, 19, 11, 30, tzinfo=UTC))
+    assert evaluate(thresholds, None, entries, running, _NOW) == {
+        AlertKind.OVERTIME: AlertState(False, _NOW.replace(hour=12, minute=30)),
+        # 1.5h so far, running entry will make it 2h at 12:30
+        AlertKind.DAILY_TARGET: AlertState(False, _NOW.replace(minute=30)),
+    }
+
+    later = _NOW.replace(hour=13)
+    assert evaluate(thresholds, None, entries, running, later) == {
+        AlertKind.OVERTIME: AlertState(True),
+        AlertKind.DAILY_TARGET: AlertState(True, _MIDNIGHT),
+    }
+    # Nothing running; nothing to wait for
+    assert evaluate(thresholds, None, entries, None, later) == {
+        AlertKind.OVERTIME: AlertState(False),
+        AlertKind.DAILY_TARGET: AlertState(False),
+    }
+
+
+def test_idle_counts_from_last_stop_or_start_of_active_hours():
+    """Without a schedule idle time counts from midnight; with one, only inside the window."""
+    thresholds = AlertThresholds(idle=timedelta(minutes=30))
+    entries = [_entry(1, datetime(2026, 10, 19, 11, 0, tzinfo=UTC), 45)]
+    assert evaluate(thresholds, None, entries, None, _NOW)[
+        AlertKind.IDLE
+    ] == AlertState(False, _NOW.replace(minute=15))
+    assert evaluate(thresholds, None, entries, None, _NOW.replace(minute=20))[
+        AlertKind.IDLE
+    ] == AlertState(True, _MIDNIGHT)
+    running = _entry(2, _NOW)
+    assert evaluate(thresholds, None, entries, running, _NOW)[
+        AlertKind.IDLE
+    ] == AlertState(False)
+
+    hours = ActiveHours.from_config(
+        {"active_days": ["mon"], "active_start": "11:50:00", "active_end": "17:00:00"}
+    )
+    assert evaluate(thresholds, hours, [], None, _NOW)[AlertKind.IDLE] == AlertState(
+        False, _NOW.replace(minute=20)
+    )
+    # Outside of the window it's off until the next one starts
+    evening = _NOW.replace(hour=18)
+    assert evaluate(thresholds, hours, [], None, evening)[AlertKind.IDLE] == AlertState(
+        False, datetime(2026, 10, 26, 11, 50, tzinfo=UTC)
+    )
+    # Idle since the window opened; stays on until it closes
+    late = _NOW.replace(hour=16, minute=45)
+    assert evaluate(thresholds, hours, entries, None, late)[
+        AlertKind.IDLE
+    ] == AlertState(True, _NOW.replace(hour=17))
+
+
+async def test_entry_stopped_outside_of_ha_is_fetched_before_idle_is_checked(
+    hass, freezer
+):
+    """Idle counts from when it was stopped, not from before it started."""
+    freezer.move_to(RUNNING.start + timedelta(hours=2))
+    fetched = []
+    stack, mocks = patch_toggl(
+        get_time_entries=AsyncMock(side_effect=lambda start, end: list(fetched))
+    )
+    events = async_capture_events(hass, EVENT_ALERT)
+    with stack:
+        entry = await setup_entry(
+            hass,
+            options={"workspaces": {str(WORKSPACE_ID): "Main"}, "idle_minutes": 30},
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        assert coordinator.alerts.is_on(WORKSPACE_ID, AlertKind.IDLE) is False
+
+        # Stopped in the Toggl app; the poll only sees that nothing is running any more
+        stopped_at = dt_util.utcnow()
+        fetched.append(RUNNING.copy(update={"stop": stopped_at, "duration": 7200}))
+        mocks["get_current_time_entry"].return_value = None
+        freezer.tick(timedelta(minutes=1))
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert coordinator.alerts.is_on(WORKSPACE_ID, AlertKind.IDLE) is False
+        assert events == []
+
+        freezer.move_to(stopped_at + timedelta(minutes=31))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert coordinator.alerts.is_on(WORKSPACE_ID, AlertKind.IDLE) is True
+        assert [e.data["alert"] for e in events] == ["idle"]
+
+
+async def test_failed_fetch_leaves_idle_alone_until_the_next_update(hass, freezer):
+    """Idle isn't worked out from a history that's known to be missing an entry."""
+    freezer.move_to(RUNNING.start + timedelta(hours=2))
+    stopped_at = dt_util.utcnow()
+    stopped = RUNNING.copy(update={"stop": stopped_at, "duration": 7200})
+    stack, mocks = patch_toggl()
+    with stack:
+        entry = await setup_entry(
+            hass,
+            options={"workspaces": {str(WORKSPACE_ID): "Main"}, "idle_minutes": 30},
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+
+        mocks["get_time_entries"].side_effect = ClientError("connection reset")
+        mocks["get_current_time_entry"].return_value = None
+        freezer.move_to(stopped_at + timedelta(minutes=31))
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert coordinator.alerts.is_on(WORKSPACE_ID, AlertKind.IDLE) is False
+
+        mocks["get_time_entries"].side_effect = None
+        mocks["get_time_entries"].return_value = [stopped]
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert coordinator.alerts.is_on(WORKSPACE_ID, AlertKind.IDLE) is True
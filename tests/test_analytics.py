@@ -0,0 +1,112 @@
+"""Test computed reports over cached time entries."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from lib_toggl.time_entries import TimeEntry
+
+from custom_components.toggl_track import analytics
+from custom_components.toggl_track.analytics import (
+    EntryColumns,
+    ReportGroup,
+    compute_report,
+    history_columns,
+)
+from custom_components.toggl_track.history import TimeEntryHistory
+
+# 2026-10-19 is a Monday
+_START = datetime(2026, 10, 19, tzinfo=UTC)
+_NOW = _START + timedelta(days=9)
+
+
+def _entry(te_id, days, minutes, project_id=None, tags=(), billable=False, ws=1):
+    start = _START + timedelta(days=days, hours=9)
+    return TimeEntry(
+        id=te_id,
+        workspace_id=ws,
+        project_id=project_id,
+        start=start,
+        stop=start + timedelta(minutes=minutes) if minutes is not None else None,
+        duration=minutes * 60 if minutes is not None else -1,
+        billable=billable,
+        tag_ids=[t for t, _ in tags],
+        tags=[n for _, n in tags],
+    )
+
+
+_ENTRIES = [
+    _entry(1, 0, 60, 7, [(3, "deep"), (4, "client")], billable=True),
+    _entry(2, 1, 30, 7, [(3, "deep")]),
+    _entry(3, 8, 90, None, [(4, "client"), (3, "deep")], billable=True),
+    _entry(4, 2, 15, 8, ws=2),
+    # Still running; counts up to now
+    _entry(5, 8, None, 8),
+]
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    """Run each test with and without NumPy."""
+    if request.param == "array":
+        monkeypatch.setattr(analytics, "np", None)
+    return request.param
+
+
+def _report(group_by, workspace_ids=(1,)):
+    return compute_report(
+        EntryColumns(_ENTRIES),
+        _START,
+        _NOW,
+        _NOW,
+        list(workspace_ids),
+        [ReportGroup(g) for g in group_by],
+    )
+
+
+def test_project_per_week(backend):
+    """Entries count towards the week they started in; billable seconds tracked separately."""
+    rows = _report(["project", "week"]).rows
+    assert [
+        (r["project_id"], r["week"], r["seconds"], r["billable_seconds"]) for r in rows
+    ] == [
+        (None, "2026-10-26", 5400, 5400),
+        (7, "2026-10-19", 5400, 3600),
+        (8, "2026-10-26", 15 * 3600, 0),
+    ]
+
+
+def test_tags_and_pairs(backend):
+    """Untagged entries get a row of their own; pairs only include entries with two or more tags."""
+    tags = {r["tag"]: r["seconds"] for r in _report(["tag"]).rows}
+    assert tags == {"client": 9000, "deep": 10800, None: 15 * 3600}
+    pairs = _report(["tag_pair"]).rows
+    assert [(r["tag_ids"], r["tags"], r["entries"]) for r in pairs] == [
+        ([3, 4], ["deep", "client"], 2)
+    ]
+
+
+def test_workspaces_and_totals(backend):
+    """Only the requested workspaces are included; no grouping is one row."""
+    report = _report([], workspace_ids=(1, 2))
+    assert len(report.rows) == 1
+    assert report.rows[0]["entries"] == 5
+    assert report.rows[0]["share"] == 1.0
+    assert report.as_dict()["backend"] == backend
+
+
+def test_bad_grouping():
+    """Two buckets at once doesn't make sense."""
+    with pytest.raises(ValueError):
+        _report(["day", "week"])
+
+
+def test_history_columns_follow_the_history():
+    """The same columns until the history changes."""
+    history = TimeEntryHistory(max_age=timedelta(hours=1), min_gap=timedelta(0))
+    history.add(_START, _NOW, _ENTRIES[:2], _NOW)
+    columns = history_columns(history)
+    assert len(columns) == 2
+    assert history_columns(history) is columns
+
+    history.upsert(_ENTRIES[2])
+    assert len(history_columns(history)) == 3
@@ -0,0 +1,71 @@
+"""Test the API circuit breaker."""
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.toggl_track.breaker import BreakerState, CircuitBreaker
+
+_NOW = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+
+
+def _breaker():
+    return CircuitBreaker(
+        failure_threshold=3,
+        cooldown=timedelta(seconds=60),
+        max_cooldown=timedelta(seconds=600),
+    )
+
+
+def test_opens_after_threshold():
+    """Plain failures only open the breaker once the threshold is reached."""
+    breaker = _breaker()
+    breaker.record_failure(_NOW)
+    breaker.record_failure(_NOW)
+    assert breaker.state is BreakerState.CLOSED
+    breaker.record_failure(_NOW)
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow_request(_NOW + timedelta(seconds=30))
+
+
+def test_trip_honours_retry_after():
+    """Overload responses open immediately and wait at least as long as asked."""
+    breaker = _breaker()
+    breaker.record_failure(_NOW, retry_after=300, trip=True)
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow_request(_NOW + timedelta(seconds=120))
+    assert breaker.allow_request(_NOW + timedelta(seconds=301))
+    assert breaker.state is BreakerState.HALF_OPEN
+
+
+def test_single_probe_when_half_open():
+    """Only one request is let through as the probe; success closes the breaker."""
+    breaker = _breaker()
+    breaker.record_failure(_NOW, trip=True)
+    later = _NOW + timedelta(seconds=61)
+    assert breaker.allow_request(later)
+    assert not breaker.allow_request(later)
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow_request(later)
+
+
+def test_failed_probe_backs_off():
+    """A failed probe re-opens the breaker with a longer cooldown."""
+    breaker = _breaker()
+    breaker.record_failure(_NOW, trip=True)
+    later = _NOW + timedelta(seconds=61)
+    assert breaker.allow_request(later)
+    breaker.record_failure(later)
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow_request(later + timedelta(seconds=61))
+    assert breaker.allow_request(later + timedelta(seconds=121))
+
+
+def test_released_probe_lets_the_next_one_through():
+    """A probe that never got an answer doesn't leave the breaker stuck half open."""
+    breaker = _breaker()
+    breaker.record_failure(_NOW, trip=True)
+    later = _NOW + timedelta(seconds=61)
+    assert breaker.allow_request(later)
+    breaker.release_probe()
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.allow_request(later)
@@ -0,0 +1,65 @@
+"""Test paging workspaces and projects for the config/options flows."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+
+from lib_toggl.workspace import Workspace
+
+from custom_components.toggl_track.catalog import (
+    CatalogCache,
+    CatalogPage,
+    async_fetch_projects,
+    page_workspaces,
+)
+from custom_components.toggl_track.config_flow import _apply_ticks, _navigate
+
+_NOW = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+
+
+def test_page_workspaces():
+    """Search is case insensitive; results are sorted by name and paged."""
+    workspaces = [Workspace.construct(id=i, name=f"Team {i:03}") for i in range(60)]
+    workspaces.append(Workspace.construct(id=999, name="Personal"))
+    first = page_workspaces(workspaces, "team", 1, 25)
+    assert list(first.items) == [str(i) for i in range(25)]
+    assert first.has_more
+    last = page_workspaces(workspaces, "TEAM", 3, 25)
+    assert len(last.items) == 10
+    assert not last.has_more
+    assert page_workspaces(workspaces, "pers", 1, 25).items == {"999": "Personal"}
+
+
+def test_fetch_projects():
+    """Search and paging are passed through; a full page means there may be more."""
+    api = AsyncMock()
+    api.do_get_request.return_value = [{"id": 1, "name": "A"}, {"id": 2, "name": None}]
+    page = asyncio.run(async_fetch_projects(api, 7, " ops ", 2, 2))
+    assert page == CatalogPage(items={"1": "A", "2": "2"}, page=2, has_more=True)
+    url = api.do_get_request.call_args.args[0]
+    assert url.endswith("/workspaces/7/projects")
+    params = api.do_get_request.call_args.kwargs["data"]
+    assert params["name"] == "ops"
+    assert (params["page"], params["per_page"]) == (2, 2)
+
+
+def test_catalog_cache():
+    """Pages are cached per workspace, search and page until they're too old."""
+    cache = CatalogCache(max_age=timedelta(minutes=10))
+    page = CatalogPage(items={"1": "A"}, page=1)
+    cache.put(7, "Ops", page, _NOW)
+    assert cache.get(7, "ops ", 1, _NOW) is page
+    assert cache.get(7, "ops", 2, _NOW) is None
+    assert cache.get(8, "ops", 1, _NOW) is None
+    assert cache.get(7, "ops", 1, _NOW + timedelta(minutes=11)) is None
+
+
+def test_ticks_and_navigation():
+    """Only what the form showed is updated; a new search goes back to page 1."""
+    selected = {"1": "A", "9": "Z"}
+    _apply_ticks(selected, {"1": "A", "2": "B", "3": "C"}, ["2"])
+    assert selected == {"2": "B", "9": "Z"}
+
+    assert _navigate({"search": "", "page": 1}, "", 1) is None
+    assert _navigate({"search": "", "page": 3}, "", 1) == ("", 3)
+    assert _navigate({"search": "x", "page": 3}, "", 1) == ("x", 1)
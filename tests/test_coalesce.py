@@ -0,0 +1,49 @@
+"""Test coalescing of edits to the same time entry."""
+
+import asyncio
+
+from custom_components.toggl_track.coalesce import EditCoalescer
+
+
+def test_edits_are_merged_in_order():
+    """Edits within the window become one write; later fields win and every caller gets the result."""
+
+    async def _run():
+        writes = []
+
+        async def _flush(time_entry_id, changes):
+            writes.append((time_entry_id, dict(changes)))
+            return changes
+
+        coalescer = EditCoalescer(window=0.05, max_delay=1, flush=_flush)
+        results = await asyncio.gather(
+            coalescer.async_edit(1, {"id": 1, "description": "first", "tags": ["a"]}),
+            coalescer.async_edit(1, {"id": 1, "tags": ["a", "b"]}),
+            coalescer.async_edit(1, {"id": 1, "description": "second"}),
+            coalescer.async_edit(2, {"id": 2, "description": "other"}),
+        )
+        assert sorted(writes, key=lambda w: w[0]) == [
+            (1, {"id": 1, "description": "second", "tags": ["a", "b"]}),
+            (2, {"id": 2, "description": "other"}),
+        ]
+        assert results[0] == results[1] == results[2]
+
+    asyncio.run(_run())
+
+
+def test_failed_write_fails_every_caller():
+    """If the merged write fails, every edit that was part of it fails."""
+
+    async def _run():
+        async def _flush(time_entry_id, changes):
+            raise ValueError("nope")
+
+        coalescer = EditCoalescer(window=0.01, max_delay=1, flush=_flush)
+        results = await asyncio.gather(
+            coalescer.async_edit(1, {"id": 1}),
+            coalescer.async_edit(1, {"id": 1}),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+    asyncio.run(_run())
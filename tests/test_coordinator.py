@@ -0,0 +1,84 @@
+"""Test the coordinator against a config entry set up in Home Assistant."""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.toggl_track.breaker import BreakerState
+from custom_components.toggl_track.const import DOMAIN
+from custom_components.toggl_track.dispatcher import Priority
+
+from .common import patch_toggl, setup_entry
+
+
+async def test_probe_that_fails_on_a_bad_payload_reopens_the_breaker(hass):
+    """Not just API errors count; otherwise the breaker would stay half open for good."""
+    stack, mocks = patch_toggl()
+    with stack:
+        entry = await setup_entry(hass)
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        # Cooldown already over so the next poll is the probe
+        coordinator.breaker.record_failure(
+            dt_util.utcnow() - timedelta(hours=1), trip=True
+        )
+        mocks["get_current_time_entry"].side_effect = ValueError("bad payload")
+        await coordinator.async_refresh()
+        assert coordinator.breaker.state is BreakerState.OPEN
+
+        coordinator.breaker.record_failure(
+            dt_util.utcnow() - timedelta(hours=1), trip=True
+        )
+        mocks["get_current_time_entry"].side_effect = None
+        await coordinator.async_refresh()
+        assert coordinator.breaker.state is BreakerState.CLOSED
+
+
+async def test_cancelled_probe_lets_the_next_poll_probe(hass):
+    """No outcome either way; the next poll gets to be the probe rather than being held off."""
+    stack, mocks = patch_toggl()
+    with stack:
+        entry = await setup_entry(hass)
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        coordinator.breaker.record_failure(
+            dt_util.utcnow() - timedelta(hours=1), trip=True
+        )
+        started = asyncio.Event()
+
+        async def _hang():
+            started.set()
+            await asyncio.sleep(60)
+
+        mocks["get_current_time_entry"].side_effect = _hang
+        task = hass.async_create_task(coordinator.async_refresh())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert coordinator.breaker.state is BreakerState.HALF_OPEN
+
+        mocks["get_current_time_entry"].side_effect = None
+        await coordinator.async_refresh()
+        assert coordinator.breaker.state is BreakerState.CLOSED
+
+
+async def test_cancelled_call_is_not_a_breaker_failure(hass):
+    """A caller going away says nothing about the API."""
+    stack, _ = patch_toggl()
+    with stack:
+        entry = await setup_entry(hass)
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        started = asyncio.Event()
+
+        async def _slow():
+            started.set()
+            await asyncio.sleep(60)
+
+        task = hass.async_create_task(coordinator.async_submit(Priority.WRITE, _slow))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert coordinator.breaker.metrics["consecutive_failures"] == 0
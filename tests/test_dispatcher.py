@@ -0,0 +1,114 @@
+"""Test the API call dispatcher."""
+
+import asyncio
+
+import pytest
+
+from custom_components.toggl_track.dispatcher import (
+    DispatcherShutdownError,
+    Priority,
+    TogglTrackDispatcher,
+)
+
+
+def test_reads_are_serviced_in_priority_order():
+    """Queued refresh jobs should run before queued background jobs."""
+
+    async def _run():
+        order = []
+        gate = asyncio.Event()
+
+        async def _job(name):
+            await gate.wait()
+            order.append(name)
+
+        dispatcher = TogglTrackDispatcher(
+            "test", max_concurrency=1, write_concurrency=1
+        )
+        dispatcher.async_start()
+        # First job occupies the only read worker; the rest queue up behind it
+        tasks = [
+            asyncio.create_task(
+                dispatcher.async_submit(Priority.BACKGROUND, _job, "first")
+            )
+        ]
+        await asyncio.sleep(0)
+        tasks.append(
+            asyncio.create_task(
+                dispatcher.async_submit(Priority.BACKGROUND, _job, "bg")
+            )
+        )
+        tasks.append(
+            asyncio.create_task(dispatcher.async_submit(Priority.REFRESH, _job, "poll"))
+        )
+        await asyncio.sleep(0)
+        assert dispatcher.queue_depth() == {"write": 0, "refresh": 1, "background": 1}
+
+        gate.set()
+        await asyncio.gather(*tasks)
+        await dispatcher.async_stop()
+        return order
+
+    assert asyncio.run(_run()) == ["first", "poll", "bg"]
+
+
+def test_writes_do_not_wait_behind_reads():
+    """A write should complete while a slow read is still in flight."""
+
+    async def _run():
+        gate = asyncio.Event()
+
+        async def _slow_read():
+            await gate.wait()
+
+        async def _write():
+            return "written"
+
+        dispatcher = TogglTrackDispatcher(
+            "test", max_concurrency=1, write_concurrency=1
+        )
+        dispatcher.async_start()
+        read = asyncio.create_task(
+            dispatcher.async_submit(Priority.REFRESH, _slow_read)
+        )
+        await asyncio.sleep(0)
+        result = await asyncio.wait_for(
+            dispatcher.async_submit(Priority.WRITE, _write), timeout=1
+        )
+        gate.set()
+        await read
+        await dispatcher.async_stop()
+        return result
+
+    assert asyncio.run(_run()) == "written"
+
+
+def test_stop_fails_queued_jobs():
+    """Jobs running or still in the queue when the dispatcher stops should raise."""
+
+    async def _run():
+        async def _forever():
+            await asyncio.Event().wait()
+
+        dispatcher = TogglTrackDispatcher(
+            "test", max_concurrency=1, write_concurrency=1
+        )
+        dispatcher.async_start()
+        running = asyncio.create_task(
+            dispatcher.async_submit(Priority.REFRESH, _forever)
+        )
+        queued = asyncio.create_task(
+            dispatcher.async_submit(Priority.BACKGROUND, _forever)
+        )
+        # Let the worker pick up the first job
+        await asyncio.sleep(0.01)
+        await dispatcher.async_stop()
+
+        with pytest.raises(DispatcherShutdownError):
+            await running
+        with pytest.raises(DispatcherShutdownError):
+            await queued
+        with pytest.raises(DispatcherShutdownError):
+            await dispatcher.async_submit(Priority.WRITE, _forever)
+
+    asyncio.run(_run())
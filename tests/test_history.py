@@ -0,0 +1,119 @@
+"""Test the past time entry cache."""
+
+from datetime import UTC, datetime, timedelta
+
+from lib_toggl.time_entries import TimeEntry
+
+from custom_components.toggl_track.history import (
+    IntervalIndex,
+    TimeEntryHistory,
+    split_by_hour,
+)
+
+_NOW = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+
+
+def _entry(te_id, start, minutes, project_id=None, tag_ids=None):
+    return TimeEntry(
+        id=te_id,
+        workspace_id=1,
+        project_id=project_id,
+        start=start,
+        stop=start + timedelta(minutes=minutes) if minutes is not None else None,
+        duration=minutes * 60 if minutes is not None else -1,
+        tag_ids=tag_ids,
+    )
+
+
+def test_split_by_hour():
+    """Entries are split across the hours they span; running entries are not counted."""
+    entries = [
+        _entry(1, datetime(2026, 10, 19, 9, 30, tzinfo=UTC), 60, 7, [3]),
+        _entry(2, datetime(2026, 10, 19, 10, 45, tzinfo=UTC), 15),
+        _entry(3, datetime(2026, 10, 19, 11, 0, tzinfo=UTC), None),
+    ]
+    totals = split_by_hour(
+        entries,
+        datetime(2026, 10, 19, 0, 0, tzinfo=UTC),
+        _NOW,
+        lambda te: (
+            ["all", f"project_{te.project_id}"] + [f"tag_{t}" for t in te.tag_ids or []]
+        ),
+    )
+    nine = datetime(2026, 10, 19, 9, 0, tzinfo=UTC)
+    ten = datetime(2026, 10, 19, 10, 0, tzinfo=UTC)
+    assert totals["all"] == {nine: 1800, ten: 2700}
+    assert totals["project_7"] == {nine: 1800, ten: 1800}
+    assert totals["tag_3"] == totals["project_7"]
+    assert totals["project_None"] == {ten: 900}
+
+
+def test_only_missing_ranges_are_fetched():
+    """Ranges already fetched aren't fetched again until they're too old or invalidated."""
+    history = TimeEntryHistory(
+        max_age=timedelta(hours=6), min_gap=timedelta(minutes=15)
+    )
+    day = _NOW - timedelta(days=1)
+    assert history.missing(day, _NOW, _NOW) == [(day, _NOW)]
+
+    history.add(day, _NOW, [_entry(1, day, 30)], _NOW)
+    later = _NOW + timedelta(minutes=10)
+    # Sliver since the last fetch isn't worth a request, unless every last bit is needed
+    assert history.missing(day, later, later) == []
+    assert history.missing(day, later, later, exact=True) == [(_NOW, later)]
+    assert [te.id for te in history.entries(day, later, later)] == [1]
+
+    week_ago = _NOW - timedelta(days=7)
+    assert history.missing(week_ago, _NOW, _NOW) == [(week_ago, day)]
+
+    history.invalidate(_NOW - timedelta(hours=1))
+    assert history.missing(day, _NOW, _NOW) == [(_NOW - timedelta(hours=1), _NOW)]
+
+    much_later = _NOW + timedelta(hours=7)
+    assert history.missing(day, _NOW, much_later) == [(day, _NOW)]
+
+
+def test_refetch_drops_deleted_entries():
+    """Entries that are no longer returned for a range they're entirely within were deleted."""
+    history = TimeEntryHistory(
+        max_age=timedelta(hours=6), min_gap=timedelta(minutes=15)
+    )
+    day = _NOW - timedelta(days=1)
+    history.add(day, _NOW, [_entry(1, day, 30), _entry(2, day, 60)], _NOW)
+    history.add(day, _NOW, [_entry(2, day, 60)], _NOW)
+    assert [te.id for te in history.entries(day, _NOW, _NOW)] == [2]
+
+
+def test_interval_index_overlap():
+    """Long entries that started well before the range still overlap it; running entries end now."""
+    base = datetime(2026, 10, 1, tzinfo=UTC)
+    long_one = _entry(1, base, 60 * 30)
+    short = [_entry(10 + i, base + timedelta(hours=i), 30) for i in range(48)]
+    running = _entry(99, _NOW - timedelta(minutes=5), None)
+    index = IntervalIndex([long_one, *short, running])
+    assert len(index) == 50
+
+    found = index.overlapping(
+        base + timedelta(hours=29, minutes=45), base + timedelta(hours=31), _NOW
+    )
+    assert [te.id for te in found] == [1, 40]
+    assert [
+        te.id for te in index.overlapping(_NOW - timedelta(hours=1), _NOW, _NOW)
+    ] == [99]
+
+
+def test_fetched_ignores_age():
+    """Old ranges still count as fetched; confirming a range makes it fresh again."""
+    history = TimeEntryHistory(
+        max_age=timedelta(hours=6), min_gap=timedelta(minutes=15)
+    )
+    day = _NOW - timedelta(days=1)
+    history.add(day, _NOW, [], _NOW)
+    much_later = _NOW + timedelta(hours=7)
+    assert history.fetched(day, _NOW)
+    assert not history.fetched(day - timedelta(hours=1), _NOW)
+    assert history.missing(day, _NOW, much_later) == [(day, _NOW)]
+
+    history.confirm(day, day + timedelta(hours=12), much_later)
+    assert history.missing(day, _NOW, much_later) == [(day + timedelta(hours=12), _NOW)]
+    assert history.fetched(day, _NOW)
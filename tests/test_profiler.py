@@ -0,0 +1,102 @@
+"""Test the on demand profiler."""
+
+import asyncio
+import json
+
+import pytest
+
+from custom_components.toggl_track.profiler import (
+    SPAN_POLL,
+    ProfileInProgressError,
+    Profiler,
+    ProfileSession,
+    top_functions,
+    write_report,
+)
+
+
+def test_spans_are_only_recorded_while_profiling():
+    """Nothing is recorded without a session; with one, every span is counted."""
+    profiler = Profiler()
+    with profiler.span("ignored"):
+        pass
+
+    session = ProfileSession(cycles=5, service_calls=0, cprofile=False)
+    profiler.start(session)
+    for _ in range(3):
+        with profiler.span("work"):
+            pass
+    with pytest.raises(ProfileInProgressError):
+        profiler.start(ProfileSession(cycles=1, service_calls=0, cprofile=False))
+    assert profiler.stop() is session
+
+    with profiler.span("after"):
+        pass
+    summary = session.summary()
+    assert list(summary["spans"]) == ["work"]
+    assert summary["spans"]["work"]["count"] == 3
+    assert summary["complete"] is False
+    assert session.done.is_set()
+
+
+def test_session_stops_once_cycles_and_calls_are_seen():
+    """The last cycle's fan out still lands in the session; anything after doesn't."""
+
+    async def _run():
+        profiler = Profiler()
+        session = ProfileSession(cycles=1, service_calls=1, cprofile=False)
+        profiler.start(session)
+
+        async def _handler(call):
+            with profiler.span("inner"):
+                return call
+
+        handler = profiler.wrap_service("demo", _handler)
+        validate = profiler.timed("service.demo.validate", lambda value: value)
+        assert await handler(validate({"a": 1})) == {"a": 1}
+        assert profiler.session is session
+
+        with profiler.span(SPAN_POLL):
+            pass
+        profiler.cycle_done()
+        with profiler.span("poll.fan_out"):
+            pass
+        await asyncio.wait_for(session.done.wait(), 1)
+        assert profiler.session is None
+
+        with profiler.span("late"):
+            pass
+        return session.summary()
+
+    summary = asyncio.run(_run())
+    assert summary["complete"] is True
+    assert (summary["cycles"], summary["service_calls"]) == (1, 1)
+    assert set(summary["spans"]) == {
+        "service.demo",
+        "service.demo.validate",
+        "inner",
+        SPAN_POLL,
+        "poll.fan_out",
+    }
+
+
+def test_report_with_cprofile(tmp_path):
+    """Report is the summary plus where the cProfile stats went."""
+    profiler = Profiler()
+    session = ProfileSession(cycles=1, service_calls=0, cprofile=True)
+    profiler.start(session)
+    with profiler.span(SPAN_POLL):
+        sum(range(1000))
+    profiler.stop()
+
+    top = top_functions(session.profile, 5)
+    assert 0 < len(top) <= 5
+    assert {"function", "calls", "tottime_ms", "cumtime_ms"} <= set(top[0])
+
+    path = str(tmp_path / "profile.json")
+    written = write_report(path, session.summary(), session.profile)
+    assert written["report"] == path
+    assert written["cprofile"] == str(tmp_path / "profile.prof")
+    assert (tmp_path / "profile.prof").exists()
+    with open(path, encoding="utf-8") as report:
+        assert json.load(report) == written
@@ -0,0 +1,68 @@
+"""Test reconciling time entries with the Reports API."""
+
+import asyncio
+from datetime import UTC, date, datetime, timedelta
+import json
+from unittest.mock import AsyncMock
+
+from lib_toggl.time_entries import TimeEntry
+
+from custom_components.toggl_track.reconcile import daily_totals, diff_entries
+from custom_components.toggl_track.reports import async_fetch_daily_totals
+
+_DAY = date(2026, 10, 19)
+_MIDNIGHT = datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def _entry(te_id, start, minutes, project_id=None, description=None):
+    return TimeEntry(
+        id=te_id,
+        workspace_id=1,
+        project_id=project_id,
+        description=description,
+        start=start,
+        stop=start + timedelta(minutes=minutes) if minutes is not None else None,
+        duration=minutes * 60 if minutes is not None else -1,
+    )
+
+
+def test_daily_totals():
+    """Whole entry counts towards the day it started on; running entries don't count."""
+    entries = [
+        _entry(1, _MIDNIGHT + timedelta(hours=23), 120, 7),
+        _entry(2, _MIDNIGHT + timedelta(hours=9), 30),
+        _entry(3, _MIDNIGHT - timedelta(hours=1), 90, 7),
+        _entry(4, _MIDNIGHT + timedelta(hours=10), None, 7),
+    ]
+    assert daily_totals(entries, _DAY) == {"7": 7200, "none": 1800}
+
+
+def test_fetch_daily_totals():
+    """Rows are summed per project per day, starting at start_date."""
+    api = AsyncMock()
+    api.do_post_request.return_value = [
+        {"user_id": 5, "project_id": 7, "seconds": [7200, 0, None]},
+        {"user_id": 5, "project_id": None, "seconds": [1800, 60, 0]},
+    ]
+    totals = asyncio.run(async_fetch_daily_totals(api, 1, 5, _DAY, 3))
+    assert totals == {
+        _DAY: {"7": 7200, "none": 1800},
+        _DAY + timedelta(days=1): {"none": 60},
+        _DAY + timedelta(days=2): {},
+    }
+    body = json.loads(api.do_post_request.call_args.kwargs["data_as_json_str"])
+    assert body == {
+        "start_date": "2026-10-19",
+        "end_date": "2026-10-21",
+        "user_ids": [5],
+    }
+
+
+def test_diff_entries():
+    """Created, changed and deleted entries are all reported."""
+    start = _MIDNIGHT + timedelta(hours=9)
+    before = {1: _entry(1, start, 30), 2: _entry(2, start, 60)}
+    after = {1: _entry(1, start, 45), 3: _entry(3, start, 15)}
+    changes = sorted((change, te.id) for change, te in diff_entries(before, after))
+    assert changes == [("created", 3), ("deleted", 2), ("updated", 1)]
+    assert diff_entries(before, dict(before)) == []
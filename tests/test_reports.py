@@ -0,0 +1,102 @@
+"""Test summary report helpers."""
+
+import asyncio
+from datetime import UTC, date, datetime, timedelta
+import json
+from unittest.mock import AsyncMock
+
+from custom_components.toggl_track.reports import (
+    SummaryCache,
+    SummaryGrouping,
+    SummaryPeriod,
+    SummaryReport,
+    _parse_summary,
+    async_fetch_summary,
+    period_bounds,
+)
+
+# 2026-10-21 is a Wednesday
+_NOW = datetime(2026, 10, 21, 12, 0, tzinfo=UTC)
+
+
+def test_period_bounds():
+    """Weeks start on Monday and months end on their last day."""
+    assert period_bounds(SummaryPeriod.DAY, _NOW) == (_NOW.date(), _NOW.date())
+    assert period_bounds(SummaryPeriod.WEEK, _NOW) == (
+        date(2026, 10, 19),
+        date(2026, 10, 25),
+    )
+    assert period_bounds(SummaryPeriod.MONTH, _NOW) == (
+        date(2026, 10, 1),
+        date(2026, 10, 31),
+    )
+
+
+def test_parse_summary():
+    """Sub groups are summed into their group; null IDs become 'none'."""
+    groups = _parse_summary(
+        {
+            "groups": [
+                {
+                    "id": 42,
+                    "sub_groups": [
+                        {"seconds": 3600, "rates": [{"billable_seconds": 1800}]},
+                        {"seconds": 600},
+                    ],
+                },
+                {"id": None, "sub_groups": [{"seconds": 60}]},
+            ]
+        }
+    )
+    assert groups["42"].seconds == 4200
+    assert groups["42"].billable_seconds == 1800
+    assert groups["none"].seconds == 60
+
+
+def test_tag_summary():
+    """Tags are the sub grouping of projects; the same tag is added up across projects."""
+    api = AsyncMock()
+    api.do_post_request.return_value = {
+        "groups": [
+            {
+                "id": 42,
+                "sub_groups": [
+                    {"id": 3, "seconds": 3600, "rates": [{"billable_seconds": 3600}]},
+                    {"id": None, "seconds": 600},
+                ],
+            },
+            {"id": None, "sub_groups": [{"id": 3, "seconds": 1800}]},
+        ]
+    }
+    report = asyncio.run(
+        async_fetch_summary(api, 1, SummaryPeriod.WEEK, SummaryGrouping.TAGS, _NOW)
+    )
+    assert report.grouping is SummaryGrouping.TAGS
+    assert report.groups["3"].seconds == 5400
+    assert report.groups["3"].billable_seconds == 3600
+    assert report.groups["none"].seconds == 600
+    body = json.loads(api.do_post_request.call_args.kwargs["data_as_json_str"])
+    assert body["grouping"] == "projects"
+    assert body["sub_grouping"] == "tags"
+
+
+def test_cache_invalidation():
+    """Invalidated reports are still available to peek but not to get."""
+    cache = SummaryCache(max_age=timedelta(hours=6))
+    report = SummaryReport(
+        workspace_id=1,
+        period=SummaryPeriod.WEEK,
+        grouping=SummaryGrouping.PROJECTS,
+        start=date(2026, 10, 19),
+        end=date(2026, 10, 25),
+        fetched_at=_NOW,
+        expires_at=datetime(2026, 10, 26, tzinfo=UTC),
+    )
+    cache.put(report)
+    key = (1, SummaryPeriod.WEEK, SummaryGrouping.PROJECTS)
+    assert cache.get(*key, _NOW) is report
+    # Too old
+    assert cache.get(*key, _NOW + timedelta(hours=7)) is None
+    cache.invalidate()
+    assert cache.get(*key, _NOW) is None
+    assert cache.peek(*key) is report
@@ -0,0 +1,128 @@
+"""Test request deadlines, retries and hedging."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from aiohttp.client_exceptions import ClientResponseError
+import pytest
+
+from custom_components.toggl_track.retry import (
+    LatencyTracker,
+    RequestPolicy,
+    async_call,
+)
+
+
+def _tracker():
+    return LatencyTracker(window=10, min_samples=3)
+
+
+def test_transient_errors_are_retried():
+    """A 503 followed by a success should look like a success to the caller."""
+
+    async def _run():
+        calls = []
+
+        async def _request():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ClientResponseError(MagicMock(), (), status=503)
+            return "ok"
+
+        policy = RequestPolicy(deadline=5, attempts=3, backoff=0.01)
+        assert await async_call("op", _request, policy, _tracker()) == "ok"
+        assert len(calls) == 2
+
+    asyncio.run(_run())
+
+
+def test_client_errors_are_not_retried():
+    """A 4XX won't change on a retry."""
+
+    async def _run():
+        calls = []
+
+        async def _request():
+            calls.append(1)
+            raise ClientResponseError(MagicMock(), (), status=400)
+
+        policy = RequestPolicy(deadline=5, attempts=3, backoff=0.01)
+        with pytest.raises(ClientResponseError):
+            await async_call("op", _request, policy, _tracker())
+        assert len(calls) == 1
+
+    asyncio.run(_run())
+
+
+def test_slow_first_attempt_gets_the_whole_deadline():
+    """A healthy but slow read isn't cut short at its share of the deadline and retried."""
+
+    async def _run():
+        calls = []
+
+        async def _request():
+            calls.append(1)
+            await asyncio.sleep(0.3)
+            return "ok"
+
+        policy = RequestPolicy(deadline=0.4, attempts=3, backoff=0.01)
+        assert await async_call("op", _request, policy, _tracker()) == "ok"
+        assert len(calls) == 1
+
+    asyncio.run(_run())
+
+
+def test_hung_retry_only_gets_its_share_of_the_deadline():
+    """Once an attempt has failed, a retry that hangs can't eat the time meant for the next one."""
+
+    async def _run():
+        calls = []
+
+        async def _request():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ClientResponseError(MagicMock(), (), status=503)
+            if len(calls) == 2:
+                await asyncio.sleep(10)
+            return "ok"
+
+        policy = RequestPolicy(deadline=0.4, attempts=3, backoff=0.01)
+        assert await async_call("op", _request, policy, _tracker()) == "ok"
+        assert len(calls) == 3
+
+        async def _always_hangs():
+            await asyncio.sleep(10)
+
+        with pytest.raises(TimeoutError):
+            await async_call("op", _always_hangs, policy, _tracker())
+
+    asyncio.run(_run())
+
+
+def test_slow_request_is_hedged():
+    """Once the p95 is known, a request slower than that is sent again and the first answer wins."""
+
+    async def _run():
+        tracker = _tracker()
+        for _ in range(3):
+            tracker.observe("op", 0.01)
+
+        started = []
+        cancelled = []
+
+        async def _request():
+            started.append(1)
+            if len(started) == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(1)
+                    raise
+            return len(started)
+
+        policy = RequestPolicy(deadline=5, hedge=True)
+        assert await async_call("op", _request, policy, tracker) == 2
+        # Slow original request is not left running
+        assert cancelled == [1]
+
+    asyncio.run(_run())
@@ -0,0 +1,224 @@
+"""Test rules that start/stop time entries from entity state."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+from aiohttp import ClientConnectionError
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+import pytest
+import voluptuous as vol
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import State
+
+from custom_components.toggl_track.rules import RULE_SCHEMA, Rule, async_setup_rules
+
+from .common import RUNNING, patch_toggl, setup_entry
+
+WORKSPACE_ID = 1234
+
+
+def test_state_rule():
+    """Active in any of the listed states; unknown/unavailable say nothing either way."""
+    rule = Rule.from_config(
+        RULE_SCHEMA(
+            {
+                "name": "office",
+                "entity_id": "binary_sensor.office",
+                "state": ["on", "home"],
+                "workspace_id": WORKSPACE_ID,
+                "description": "Office",
+            }
+        )
+    )
+    assert rule.on_for == timedelta(seconds=60)
+    assert rule.is_active(State("binary_sensor.office", "home"), False) is True
+    assert rule.is_active(State("binary_sensor.office", "off"), True) is False
+    assert rule.is_active(State("binary_sensor.office", "unavailable"), True) is None
+    assert rule.is_active(None, False) is None
+
+
+def test_numeric_rule_hysteresis():
+    """Goes active above `above` and stays active until below `below`."""
+    rule = Rule.from_config(
+        RULE_SCHEMA(
+            {
+                "name": "desk",
+                "entity_id": "sensor.desk_power",
+                "above": 50,
+                "below": 20,
+                "workspace_id": WORKSPACE_ID,
+                "description": "Desk",
+            }
+        )
+    )
+    active = False
+    seen = []
+    for value in ("10", "30", "51", "30", "21", "60", "19", "30", "not a number"):
+        if (
+            wanted := rule.is_active(State("sensor.desk_power", value), active)
+        ) is not None:
+            active = wanted
+        seen.append(active)
+    assert seen == [False, False, True, True, True, True, False, False, False]
+
+
+def test_rule_schema():
+    """State and numeric thresholds don't mix; the band can't be inverted."""
+    base = {
+        "name": "x",
+        "entity_id": "sensor.x",
+        "workspace_id": WORKSPACE_ID,
+        "description": "x",
+    }
+    with pytest.raises(vol.Invalid):
+        RULE_SCHEMA({**base, "state": "on", "above": 1})
+    with pytest.raises(vol.Invalid):
+        RULE_SCHEMA({**base, "above": 1, "below": 2})
+    with pytest.raises(vol.Invalid):
+        RULE_SCHEMA(base)
+    assert RULE_SCHEMA({**base, "above": 1})["below"] == 1
+
+
+async def _setup_rule(hass, **config) -> None:
+    """Rule on binary_sensor.office for the workspace that tests/common.py sets up."""
+    hass.states.async_set("binary_sensor.office", "off")
+    await setup_entry(hass)
+    async_setup_rules(
+        hass,
+        [
+            RULE_SCHEMA(
+                {
+                    "name": "office",
+                    "entity_id": "binary_sensor.office",
+                    "state": "on",
+                    "on_for": 60,
+                    "off_for": 300,
+                    "workspace_id": RUNNING.workspace_id,
+                    "description": "Office",
+                    **config,
+                }
+            )
+        ],
+    )
+    await hass.async_block_till_done()
+
+
+async def _set(hass, freezer, state: str | None = None, after: float = 0) -> None:
+    """Let `after` seconds go by, then set the entity's state."""
+    if after:
+        freezer.tick(timedelta(seconds=after))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+    if state is not None:
+        hass.states.async_set("binary_sensor.office", state)
+        await hass.async_block_till_done()
+
+
+async def test_flapping_costs_nothing_and_each_transition_is_one_write(hass, freezer):
+    """Only a state that outlasts on_for/off_for is written, and only once."""
+    stack, mocks = patch_toggl(get_current_time_entry=AsyncMock(return_value=None))
+    with stack:
+        await _setup_rule(hass)
+        for _ in range(3):
+            await _set(hass, freezer, "on")
+            await _set(hass, freezer, "off", after=30)
+        await _set(hass, freezer, after=120)
+        mocks["create_new_time_entry"].assert_not_awaited()
+
+        # Polls see the entry the rule is about to start
+        mocks["get_current_time_entry"].return_value = RUNNING
+        await _set(hass, freezer, "on")
+        # Flaps off for less than off_for while running
+        await _set(hass, freezer, "off", after=90)
+        await _set(hass, freezer, "on", after=200)
+        await _set(hass, freezer, after=600)
+        assert mocks["create_new_time_entry"].await_count == 1
+        assert mocks["create_new_time_entry"].await_args.args[0].description == (
+            "Office"
+        )
+        mocks["stop_time_entry"].assert_not_awaited()
+
+        await _set(hass, freezer, "off")
+        await _set(hass, freezer, after=301)
+        assert mocks["stop_time_entry"].await_count == 1
+        assert mocks["stop_time_entry"].await_args.args[0].id == RUNNING.id
+        assert mocks["create_new_time_entry"].await_count == 1
+
+
+@pytest.mark.parametrize(
+    ("failure", "config"),
+    [
+        ({"side_effect": ClientConnectionError("connection reset")}, {}),
+        ({"return_value": None}, {}),
+        ({}, {"description": "{{ states('sensor.missing') | int }}"}),
+    ],
+    ids=["connection_error", "nothing_returned", "template_error"],
+)
+async def test_failed_start_is_retried(hass, freezer, failure, config):
+    """Until the state changes back; the rule isn't left thinking the entry is running."""
+    stack, mocks = patch_toggl(
+        get_current_time_entry=AsyncMock(return_value=None),
+        create_new_time_entry=AsyncMock(**failure),
+    )
+    with stack:
+        await _setup_rule(hass, **config)
+        await _set(hass, freezer, "on")
+        await _set(hass, freezer, after=61)
+
+        mocks["create_new_time_entry"].side_effect = None
+        mocks["create_new_time_entry"].return_value = RUNNING
+        hass.states.async_set("sensor.missing", "3")
+        await _set(hass, freezer, after=61)
+        assert mocks["create_new_time_entry"].await_count == 2 - bool(config)
+
+        # Started this time; nothing more to retry
+        await _set(hass, freezer, after=61)
+        assert mocks["create_new_time_entry"].await_count == 2 - bool(config)
+
+
+async def test_state_change_during_a_write_is_picked_up_after(hass, freezer):
+    """The entity went off while the entry was being started; it's stopped once off_for is up."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _slow_create(_te):
+        started.set()
+        await release.wait()
+        return RUNNING
+
+    stack, mocks = patch_toggl(
+        get_current_time_entry=AsyncMock(return_value=None),
+        create_new_time_entry=AsyncMock(side_effect=_slow_create),
+    )
+    with stack:
+        await _setup_rule(hass)
+        await _set(hass, freezer, "on")
+        freezer.tick(timedelta(seconds=61))
+        async_fire_time_changed(hass)
+        await started.wait()
+        # Not waiting for the write; it's what's holding things up
+        hass.states.async_set("binary_sensor.office", "off")
+        await asyncio.sleep(0)
+        release.set()
+        await hass.async_block_till_done()
+        mocks["stop_time_entry"].assert_not_awaited()
+
+        await _set(hass, freezer, after=301)
+        assert mocks["create_new_time_entry"].await_count == 1
+        assert mocks["stop_time_entry"].await_count == 1
+
+
+async def test_rules_stop_following_entities_when_home_assistant_stops(hass, freezer):
+    """Nothing is left listening or counting down."""
+    stack, mocks = patch_toggl(get_current_time_entry=AsyncMock(return_value=None))
+    with stack:
+        await _setup_rule(hass)
+        await _set(hass, freezer, "on")
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+        await hass.async_block_till_done()
+        await _set(hass, freezer, "off")
+        await _set(hass, freezer, "on")
+        await _set(hass, freezer, after=61)
+        mocks["create_new_time_entry"].assert_not_awaited()
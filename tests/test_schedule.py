@@ -0,0 +1,66 @@
+"""Test the active hours schedule."""
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.toggl_track.schedule import ActiveHours
+
+# 2026-10-19 is a Monday
+_MON_0900 = datetime(2026, 10, 19, 9, 0, tzinfo=UTC)
+
+
+def _hours(days, start, end):
+    return ActiveHours.from_config(
+        {"active_days": days, "active_start": start, "active_end": end}
+    )
+
+
+def test_no_schedule_configured():
+    """Entries without a schedule don't get one."""
+    assert ActiveHours.from_config({"scan_interval": 120}) is None
+
+
+def test_weekday_window():
+    """Simple 08:00-17:00 on weekdays."""
+    hours = _hours(["mon", "tue", "wed", "thu", "fri"], "08:00:00", "17:00:00")
+    assert hours.is_active(_MON_0900)
+    assert not hours.is_active(_MON_0900.replace(hour=18))
+    # Friday evening -> Monday morning
+    friday_evening = datetime(2026, 10, 23, 18, 0, tzinfo=UTC)
+    assert not hours.is_active(friday_evening.replace(day=24, hour=12))
+    assert hours.next_start(friday_evening) == datetime(2026, 10, 26, 8, 0, tzinfo=UTC)
+
+
+def test_window_past_midnight():
+    """A window that crosses midnight belongs to the day it starts on."""
+    hours = _hours(["mon"], "22:00:00", "02:00:00")
+    assert hours.is_active(_MON_0900.replace(hour=23))
+    assert hours.is_active(datetime(2026, 10, 20, 1, 0, tzinfo=UTC))
+    assert not hours.is_active(datetime(2026, 10, 20, 23, 0, tzinfo=UTC))
+
+
+def test_always_active():
+    """Every day with start == end never throttles."""
+    hours = _hours(
+        ["mon", "tue", "wed", "thu", "fri", "sat", "sun"], "00:00:00", "00:00:00"
+    )
+    assert hours.always_active
+    assert hours.is_active(_MON_0900.replace(hour=3))
+
+
+def test_no_days():
+    """No active days means no next window."""
+    hours = _hours([], "08:00:00", "17:00:00")
+    assert not hours.is_active(_MON_0900)
+    assert hours.next_start(_MON_0900) is None
+
+
+def test_current_window():
+    """The window `now` is in, including one that started the day before."""
+    hours = _hours(["mon"], "22:00:00", "02:00:00")
+    window = (
+        datetime(2026, 10, 19, 22, 0, tzinfo=UTC),
+        datetime(2026, 10, 20, 2, 0, tzinfo=UTC),
+    )
+    assert hours.current_window(_MON_0900.replace(hour=23)) == window
+    assert hours.current_window(window[1] - timedelta(minutes=1)) == window
+    assert hours.current_window(window[1]) is None
@@ -0,0 +1,73 @@
+"""Test the services against a config entry set up in Home Assistant."""
+
+from unittest.mock import AsyncMock
+
+from aiohttp import ClientConnectionError
+import pytest
+import voluptuous as vol
+
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.toggl_track.const import (
+    DOMAIN,
+    SERVICE_GET_SUMMARY,
+    SERVICE_NEW_TIME_ENTRY,
+    SERVICE_STOP_TIME_ENTRY,
+)
+from custom_components.toggl_track.services import COMPUTE_REPORT_SERVICE_SCHEMA
+
+from .common import RUNNING, WORKSPACE_ID, patch_toggl, setup_entry
+
+
+async def test_services_survive_a_reload(hass):
+    """Services go to the coordinator of the reloaded entry, not the one that was shut down."""
+    stack, mocks = patch_toggl()
+    with stack:
+        entry = await setup_entry(hass)
+        assert await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_STOP_TIME_ENTRY, {}, blocking=True, return_response=True
+        )
+        assert response["id"] == RUNNING.id
+        mocks["stop_time_entry"].assert_awaited_once()
+
+        # Nothing left to send them to
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        assert not hass.services.has_service(DOMAIN, SERVICE_NEW_TIME_ENTRY)
+
+
+def test_compute_report_takes_a_target_or_a_workspace_id():
+    """Not both; the target would be ignored. Neither means every tracked workspace."""
+    assert COMPUTE_REPORT_SERVICE_SCHEMA({})
+    assert COMPUTE_REPORT_SERVICE_SCHEMA({"workspace_id": 1})
+    assert COMPUTE_REPORT_SERVICE_SCHEMA({"entity_id": "sensor.main"})
+    with pytest.raises(vol.Invalid):
+        COMPUTE_REPORT_SERVICE_SCHEMA({"workspace_id": 1, "entity_id": "sensor.main"})
+
+
+@pytest.mark.parametrize(
+    ("service", "data", "method"),
+    [
+        (SERVICE_STOP_TIME_ENTRY, {}, "stop_time_entry"),
+        (
+            SERVICE_NEW_TIME_ENTRY,
+            {"workspace_id": WORKSPACE_ID, "description": "x"},
+            "create_new_time_entry",
+        ),
+        (SERVICE_GET_SUMMARY, {"workspace_id": WORKSPACE_ID}, "do_post_request"),
+    ],
+)
+async def test_connection_errors_are_service_errors(hass, service, data, method):
+    """Not a traceback; the connection could still be failing once retries are used up."""
+    stack, _ = patch_toggl(
+        **{method: AsyncMock(side_effect=ClientConnectionError("reset"))}
+    )
+    with stack:
+        await setup_entry(hass)
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, service, data, blocking=True, return_response=True
+            )
@@ -0,0 +1,151 @@
+"""Test importing tracked hours as long-term statistics."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock
+
+from lib_toggl.time_entries import TimeEntry
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+import pytest
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+
+from custom_components.toggl_track.const import DOMAIN
+from custom_components.toggl_track.statistics import async_import_statistics
+
+from .common import RUNNING, WORKSPACE_ID, patch_toggl, setup_entry
+
+_TOTAL = f"{DOMAIN}:workspace_{WORKSPACE_ID}"
+_PROJECT = f"{DOMAIN}:workspace_{WORKSPACE_ID}_project_7"
+_DAY = datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def _entry(te_id, start, stop=None):
+    return TimeEntry(
+        id=te_id,
+        workspace_id=WORKSPACE_ID,
+        project_id=7,
+        user_id=RUNNING.user_id,
+        start=start,
+        stop=stop,
+        duration=(stop - start).total_seconds() if stop else -1,
+    )
+
+
+class _Api:
+    """Answers get_time_entries from a list that the test adds to."""
+
+    def __init__(self) -> None:
+        self.entries: list[TimeEntry] = []
+
+    async def get_time_entries(self, start, end):
+        return [te for te in self.entries if te.start < end and te.stop > start]
+
+
+async def _rows(hass, statistic_id: str) -> list[tuple[datetime, float, float]]:
+    """(start, state, sum) of every hour imported today."""
+    await async_wait_recording_done(hass)
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        _DAY,
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"state", "sum"},
+    )
+    return [
+        (
+            datetime.fromtimestamp(row["start"], UTC),
+            pytest.approx(row["state"]),
+            pytest.approx(row["sum"]),
+        )
+        for row in stats.get(statistic_id, [])
+    ]
+
+
+def _patch(api: _Api, running: TimeEntry | None):
+    return patch_toggl(
+        get_current_time_entry=AsyncMock(return_value=running),
+        get_time_entries=AsyncMock(side_effect=api.get_time_entries),
+    )
+
+
+async def _setup(hass):
+    """Set up with the recorder loaded; that runs the first import."""
+    entry = await setup_entry(hass)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+async def test_each_run_carries_on_from_the_last(recorder_mock, hass, freezer):
+    """The first run backfills, later ones only add hours since; sums carry on across runs."""
+    freezer.move_to(_DAY.replace(hour=12, minute=30))
+    api = _Api()
+    api.entries.append(
+        _entry(1, _DAY.replace(hour=9), _DAY.replace(hour=10, minute=30))
+    )
+    stack, _ = _patch(api, None)
+    with stack:
+        coordinator = await _setup(hass)
+        total = await _rows(hass, _TOTAL)
+        assert total[-3:] == [
+            (_DAY.replace(hour=9), 1.0, 1.0),
+            (_DAY.replace(hour=10), 0.5, 1.5),
+            (_DAY.replace(hour=11), 0.0, 1.5),
+        ]
+        assert await _rows(hass, _PROJECT) == [
+            (_DAY.replace(hour=9), 1.0, 1.0),
+            (_DAY.replace(hour=10), 0.5, 1.5),
+        ]
+
+        freezer.move_to(_DAY.replace(hour=14, minute=30))
+        api.entries.append(
+            _entry(2, _DAY.replace(hour=12, minute=15), _DAY.replace(hour=13))
+        )
+        # The hourly run overlaps with another one; each hour is still only counted once
+        async_fire_time_changed(hass)
+        await async_import_statistics(hass, coordinator)
+        await hass.async_block_till_done()
+        total = await _rows(hass, _TOTAL)
+        assert total[-3:] == [
+            (_DAY.replace(hour=11), 0.0, 1.5),
+            (_DAY.replace(hour=12), 0.75, 2.25),
+            (_DAY.replace(hour=13), 0.0, 2.25),
+        ]
+        assert (await _rows(hass, _PROJECT))[-1] == (_DAY.replace(hour=12), 0.75, 2.25)
+
+        # Nothing new to import
+        await async_import_statistics(hass, coordinator)
+        assert (await _rows(hass, _TOTAL))[-1] == (_DAY.replace(hour=13), 0.0, 2.25)
+
+
+async def test_running_entry_holds_the_import_back(recorder_mock, hass, freezer):
+    """Hours the owner's running entry has touched are imported once it's stopped."""
+    freezer.move_to(_DAY.replace(hour=12, minute=30))
+    api = _Api()
+    api.entries.append(_entry(1, _DAY.replace(hour=9), _DAY.replace(hour=9, minute=30)))
+    running = _entry(2, _DAY.replace(hour=10, minute=15))
+    stack, mocks = _patch(api, running)
+    with stack:
+        coordinator = await _setup(hass)
+        assert (await _rows(hass, _TOTAL))[-1] == (_DAY.replace(hour=9), 0.5, 0.5)
+
+        # Stopped at 12:45
+        freezer.move_to(_DAY.replace(hour=13, minute=30))
+        api.entries.append(_entry(2, running.start, _DAY.replace(hour=12, minute=45)))
+        mocks["get_current_time_entry"].return_value = None
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        await async_import_statistics(hass, coordinator)
+        total = await _rows(hass, _TOTAL)
+    assert total[-4:] == [
+        (_DAY.replace(hour=9), 0.5, 0.5),
+        (_DAY.replace(hour=10), 0.75, 1.25),
+        (_DAY.replace(hour=11), 1.0, 2.25),
+        (_DAY.replace(hour=12), 0.75, 3.0),
+    ]
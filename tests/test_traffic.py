@@ -0,0 +1,286 @@
+"""Test recording and replaying API traffic."""
+
+import asyncio
+import json
+
+from aiohttp import ClientResponseError
+from lib_toggl.time_entries import (
+    CREATE_ENDPOINT as TIME_ENTRY_CREATE_ENDPOINT,
+    ENDPOINT as TIME_ENTRIES_ENDPOINT,
+    STOP_ENDPOINT as TIME_ENTRY_STOP_ENDPOINT,
+)
+from multidict import CIMultiDict, CIMultiDictProxy
+import pytest
+
+from custom_components.toggl_track.breaker import retry_after_from_error
+from custom_components.toggl_track.const import (
+    DOMAIN,
+    SERVICE_NEW_TIME_ENTRY,
+    SERVICE_STOP_TIME_ENTRY,
+)
+from custom_components.toggl_track.traffic import (
+    EVENT_POLL,
+    EVENT_REQUEST,
+    EVENT_SERVICE,
+    ReplayTransport,
+    TrafficRecorder,
+    async_replay,
+    redact,
+)
+
+from .common import RUNNING, WORKSPACE_ID, patch_toggl, setup_entry
+
+
+class _Api:
+    """Just enough of lib-toggl's client."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def do_get_request(self, url, data=None):
+        self.calls.append(url)
+        if url.endswith("/busy"):
+            raise ClientResponseError(
+                None,
+                (),
+                status=429,
+                headers=CIMultiDictProxy(CIMultiDict({"Retry-After": "30"})),
+            )
+        return {"id": 1, "description": "Secret meeting", "project_id": 7}
+
+    async def do_post_request(self, url, data_as_json_str):
+        self.calls.append(url)
+        return [{"name": "Client X", "seconds": 60}]
+
+    async def do_patch_request(self, url, data=None):
+        return None
+
+    async def do_put_request(self, url, data_as_json_str):
+        return None
+
+
+def test_redact_is_consistent_within_a_recording():
+    """Same value, same hash; IDs and numbers are left alone."""
+    data = {"name": "A", "items": [{"name": "A", "id": 3}, {"title": "B"}], "n": 1}
+    redacted = redact(data, "salt")
+    assert redacted["name"] == redacted["items"][0]["name"] != "A"
+    assert redacted["items"][0]["id"] == 3
+    assert redacted["items"][1]["title"].startswith("redacted-")
+    assert redacted["n"] == 1
+    assert redact(data, "other")["name"] != redacted["name"]
+
+
+def test_redact_tags():
+    """Tag names are often client/project names; hashed like any other name."""
+    data = {
+        "tags": ["Client X", "", 3],
+        "tag_ids": [1, 2],
+        "items": [{"tags": ["Client X"]}],
+    }
+    redacted = redact(data, "salt")
+    assert redacted["tags"][0].startswith("redacted-")
+    assert redacted["tags"][1:] == ["", 3]
+    assert redacted["items"][0]["tags"] == [redacted["tags"][0]]
+    assert redacted["tag_ids"] == [1, 2]
+
+
+def test_recording_saves_redacted_requests_and_puts_the_client_back():
+    """Requests, polls and service calls end up in order; errors are saved too."""
+
+    async def _run():
+        api = _Api()
+        recorder = TrafficRecorder(salt="salt")
+        recorder.start(api)
+        recorder.note_poll()
+        assert (await api.do_get_request("https://x/me", data={"since": 1}))["id"] == 1
+        recorder.note_service("new_time_entry", {"description": "Secret", "id": 2})
+        await api.do_post_request("https://x/summary", '{"name": "Client X"}')
+        with pytest.raises(ClientResponseError):
+            await api.do_get_request("https://x/busy")
+        recorder.stop()
+        # Back to the real thing; not recorded
+        await api.do_get_request("https://x/me")
+        return recorder
+
+    recorder = asyncio.run(_run())
+    events = recorder.events
+    assert [e["type"] for e in events] == [
+        EVENT_POLL,
+        EVENT_REQUEST,
+        EVENT_SERVICE,
+        EVENT_REQUEST,
+        EVENT_REQUEST,
+    ]
+    get = events[1]
+    assert (get["method"], get["url"], get["status"], get["body"]) == (
+        "GET",
+        "https://x/me",
+        200,
+        {"since": 1},
+    )
+    assert get["response"]["description"].startswith("redacted-")
+    assert get["response"]["project_id"] == 7
+    assert events[2]["data"]["description"].startswith("redacted-")
+    assert events[3]["body"]["name"] == events[3]["response"][0]["name"]
+    assert (events[4]["status"], events[4]["retry_after"]) == (429, "30")
+    summary = recorder.summary()
+    assert (summary["polls"], summary["requests"], summary["service_calls"]) == (
+        1,
+        3,
+        1,
+    )
+    assert summary["errors"] == 1
+
+
+def test_replay_answers_from_the_recording():
+    """In order per URL, last one repeated, errors and scaled Retry-After; unknown URLs get a 404."""
+    traffic = {
+        "events": [
+            {
+                "type": EVENT_REQUEST,
+                "method": "GET",
+                "url": "https://x/me?since=1",
+                "latency": 0.2,
+                "status": 200,
+                "response": {"n": 1},
+            },
+            {
+                "type": EVENT_REQUEST,
+                "method": "GET",
+                "url": "https://x/me?since=2",
+                "latency": 0.2,
+                "status": 200,
+                "response": {"n": 2},
+            },
+            {
+                "type": EVENT_REQUEST,
+                "method": "POST",
+                "url": "https://x/summary",
+                "latency": 0.2,
+                "status": 429,
+                "retry_after": "30",
+            },
+            {
+                "type": EVENT_REQUEST,
+                "method": "GET",
+                "url": "https://x/slow",
+                "latency": 0.2,
+                "error": "CancelledError",
+            },
+        ]
+    }
+
+    async def _run():
+        api = _Api()
+        transport = ReplayTransport(traffic, speed=100)
+        transport.install(api)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        answers = [
+            await api.do_get_request("https://x/me", data={"since": 5})
+            for _ in range(3)
+        ]
+        with pytest.raises(ClientResponseError) as busy:
+            await api.do_post_request("https://x/summary", "{}")
+        with pytest.raises(TimeoutError):
+            await api.do_get_request("https://x/slow")
+        with pytest.raises(ClientResponseError) as missing:
+            await api.do_get_request("https://x/other")
+        elapsed = loop.time() - start
+        transport.uninstall()
+        assert (await api.do_get_request("https://x/me"))["id"] == 1
+        assert api.calls == ["https://x/me"]
+        return transport, answers, busy.value, missing.value, elapsed
+
+    transport, answers, busy, missing, elapsed = asyncio.run(_run())
+    assert answers == [{"n": 1}, {"n": 2}, {"n": 2}]
+    assert busy.status == 429
+    assert retry_after_from_error(busy, None) == pytest.approx(0.3)
+    assert missing.status == 404
+    # Five recorded answers at 0.2s each, 100x faster
+    assert elapsed < 0.5
+    assert transport.metrics == {
+        "requests": 5,
+        "unmatched": 1,
+        "statuses": {"200": 3, "429": 1, "CancelledError": 1},
+    }
+
+
+async def test_replay_through_the_coordinator_and_services(hass):
+    """Polls and service calls from a recording go through the real coordinator, client and services."""
+    running = json.loads(RUNNING.json())
+    stopped = {**running, "stop": "2026-10-19T09:00:00+00:00", "duration": 3600}
+    current = f"{TIME_ENTRIES_ENDPOINT}/current"
+    traffic = {
+        "events": [
+            {"t": 0.0, "type": EVENT_POLL},
+            {
+                "t": 0.0,
+                "type": EVENT_REQUEST,
+                "method": "GET",
+                "url": current,
+                "latency": 0.1,
+                "status": 200,
+                "response": running,
+            },
+            {
+                "t": 0.2,
+                "type": EVENT_SERVICE,
+                "service": SERVICE_STOP_TIME_ENTRY,
+                "data": {},
+            },
+            {
+                "t": 0.2,
+                "type": EVENT_REQUEST,
+                "method": "PATCH",
+                "url": TIME_ENTRY_STOP_ENDPOINT(WORKSPACE_ID, RUNNING.id),
+                "latency": 0.1,
+                "status": 200,
+                "response": stopped,
+            },
+            {"t": 0.5, "type": EVENT_POLL},
+            {
+                "t": 0.5,
+                "type": EVENT_REQUEST,
+                "method": "GET",
+                "url": current,
+                "latency": 0.1,
+                "status": 200,
+                "response": None,
+            },
+            # Rejected; counted as a failure, the rest of the replay carries on
+            {
+                "t": 0.6,
+                "type": EVENT_SERVICE,
+                "service": SERVICE_NEW_TIME_ENTRY,
+                "data": {"workspace_id": WORKSPACE_ID, "description": "Next"},
+            },
+            {
+                "t": 0.6,
+                "type": EVENT_REQUEST,
+                "method": "POST",
+                "url": TIME_ENTRY_CREATE_ENDPOINT(WORKSPACE_ID),
+                "latency": 0.1,
+                "status": 400,
+                "response": None,
+            },
+        ]
+    }
+
+    stack, _ = patch_toggl()
+    with stack:
+        entry = await setup_entry(hass)
+    # From here on it's lib-toggl's own client, answered from the recording
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    result = await async_replay(hass, coordinator, traffic, speed=10)
+    await hass.async_block_till_done()
+
+    assert result["failures"] == {f"service.{SERVICE_NEW_TIME_ENTRY}": 1}
+    assert result["timings"]["poll"]["count"] == 2
+    assert result["timings"][f"service.{SERVICE_STOP_TIME_ENTRY}"]["count"] == 1
+    assert result["statuses"]["200"] >= 3
+    assert result["statuses"]["400"] == 1
+    # Last poll saw nothing running
+    assert coordinator.own_entry(WORKSPACE_ID) is None
+    # Client is back to the network
+    assert "do_get_request" not in coordinator.api.__dict__
@@ -0,0 +1,162 @@
+"""Test the websocket commands for dashboard cards."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+from aiohttp import ClientConnectionError
+from lib_toggl.time_entries import TimeEntry
+
+from custom_components.toggl_track.const import DOMAIN
+
+from .common import RUNNING, WORKSPACE_ID, patch_toggl, setup_entry
+
+
+async def test_subscribe_sends_a_snapshot_then_only_changes(hass, hass_ws_client):
+    """Workspaces that didn't change since the last event aren't sent again."""
+    stack, mocks = patch_toggl()
+    with stack:
+        entry = await setup_entry(hass)
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        client = await hass_ws_client(hass)
+
+        await client.send_json({"id": 1, "type": f"{DOMAIN}/subscribe"})
+        assert (await client.receive_json())["success"]
+        event = (await client.receive_json())["event"]
+        assert event["stale"] is False
+        assert [te["id"] for te in event["running"][str(WORKSPACE_ID)]] == [RUNNING.id]
+
+        # Same as before; nothing to send
+        await coordinator.async_refresh()
+        mocks["get_current_time_entry"].return_value = None
+        await coordinator.async_refresh()
+        event = (await client.receive_json())["event"]
+        assert event == {"running": {str(WORKSPACE_ID): []}, "stale": False}
+
+        listeners = len(coordinator._listeners)
+        await client.send_json(
+            {"id": 2, "type": "unsubscribe_events", "subscription": 1}
+        )
+        response = await client.receive_json()
+        assert response["id"] == 2
+        assert response["success"]
+        assert len(coordinator._listeners) == listeners - 1
+
+
+async def test_subscribe_to_an_unknown_workspace(hass, hass_ws_client):
+    """Only tracked workspaces can be subscribed to."""
+    stack, _ = patch_toggl()
+    with stack:
+        await setup_entry(hass)
+        client = await hass_ws_client(hass)
+        await client.send_json(
+            {"id": 1, "type": f"{DOMAIN}/subscribe", "workspace_id": 999}
+        )
+        response = await client.receive_json()
+        assert response["error"]["code"] == "not_found"
+
+
+async def test_history_query_pages_from_one_fetch(hass, hass_ws_client):
+    """Pages after the first, and the same range again, come from the cache."""
+    start = RUNNING.start - timedelta(days=1)
+    entries = [
+        TimeEntry(
+            id=100 + i,
+            workspace_id=WORKSPACE_ID,
+            start=start + timedelta(hours=i),
+            stop=start + timedelta(hours=i, minutes=30),
+            duration=1800,
+        )
+        for i in range(5)
+    ]
+    stack, mocks = patch_toggl(get_time_entries=AsyncMock(return_value=entries))
+    with stack:
+        await setup_entry(hass)
+        fetches = mocks["get_time_entries"].await_count
+        client = await hass_ws_client(hass)
+        query = {
+            "type": f"{DOMAIN}/query",
+            "query": "history",
+            "workspace_id": WORKSPACE_ID,
+            "start": start.isoformat(),
+            "end": (start + timedelta(hours=12)).isoformat(),
+            "limit": 2,
+        }
+
+        pages = []
+        offset = 0
+        for msg_id in range(1, 10):
+            await client.send_json({"id": msg_id, **query, "offset": offset})
+            result = (await client.receive_json())["result"]
+            assert result["total"] == 5
+            pages.append([te["id"] for te in result["time_entries"]])
+            if (offset := result["next_offset"]) is None:
+                break
+        assert pages == [[100, 101], [102, 103], [104]]
+        assert mocks["get_time_entries"].await_count == fetches + 1
+
+        await client.send_json({"id": 20, **query})
+        assert (await client.receive_json())["result"]["total"] == 5
+        assert mocks["get_time_entries"].await_count == fetches + 1
+
+
+async def test_history_query_needs_a_range(hass, hass_ws_client):
+    """Start and end are only optional because summaries don't need them."""
+    stack, _ = patch_toggl()
+    with stack:
+        await setup_entry(hass)
+        client = await hass_ws_client(hass)
+        await client.send_json(
+            {
+                "id": 1,
+                "type": f"{DOMAIN}/query",
+                "query": "history",
+                "workspace_id": WORKSPACE_ID,
+            }
+        )
+        response = await client.receive_json()
+        assert response["error"]["code"] == "invalid_format"
+
+
+async def test_summary_query_is_cached(hass, hass_ws_client):
+    """Asking for the same report again costs nothing."""
+    stack, mocks = patch_toggl(
+        do_post_request=AsyncMock(
+            return_value={"groups": [{"id": 42, "sub_groups": [{"seconds": 3600}]}]}
+        )
+    )
+    with stack:
+        await setup_entry(hass)
+        posts = mocks["do_post_request"].await_count
+        client = await hass_ws_client(hass)
+        query = {
+            "type": f"{DOMAIN}/query",
+            "query": "summary",
+            "workspace_id": WORKSPACE_ID,
+            "period": "month",
+        }
+        for msg_id in (1, 2):
+            await client.send_json({"id": msg_id, **query})
+            result = (await client.receive_json())["result"]
+            assert result["groups"]["42"]["seconds"] == 3600
+        assert mocks["do_post_request"].await_count == posts + 1
+
+
+async def test_failed_query_is_an_error(hass, hass_ws_client):
+    """The card gets an error it can show rather than an unknown one."""
+    stack, mocks = patch_toggl()
+    with stack:
+        await setup_entry(hass)
+        mocks["get_time_entries"].side_effect = ClientConnectionError("reset")
+        client = await hass_ws_client(hass)
+        await client.send_json(
+            {
+                "id": 1,
+                "type": f"{DOMAIN}/query",
+                "query": "history",
+                "workspace_id": WORKSPACE_ID,
+                "start": (RUNNING.start - timedelta(days=30)).isoformat(),
+                "end": (RUNNING.start - timedelta(days=29)).isoformat(),
+            }
+        )
+        response = await client.receive_json()
+        assert response["error"]["code"] == "home_assistant_error"